@@ -1,11 +1,16 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 import json
 import re
+import time
 from datetime import datetime
 from openai import OpenAI
 
+import metrics
+from stream_json import PartialJSONObject
+
 #Util
 # Calcular el año actual y las fechas de inicio y fin del año
 anio_actual = datetime.now().year
@@ -144,6 +149,10 @@ SYSTEM_ROLE = SYSTEM_ROLE = (
 )
 
 #Settings 
+MODEL = "google/gemma-3-4b"
+HEALTH_TIMEOUT = 2.0  # segundos
+# campos con los que el retriever ya puede empezar a filtrar (time-to-first-useful-field)
+USEFUL_FIELDS = ("id_resol", "rango_fechas", "tipo_session")
 client = OpenAI(base_url="http://127.0.0.1:1234/v1",api_key="not-needed")
 app = FastAPI(
     title="Query-Filter",
@@ -154,39 +163,145 @@ app = FastAPI(
 class PromtRequest(BaseModel):
     promt: str
     max_tokens: int = 1000 
+    stream: bool = False
+
+def build_messages(promt: str) -> list[dict]:
+    return [
+        {"role": "system", "content": f"{SYSTEM_ROLE}"},
+        {"role": "user", "content": promt}
+    ]
+
+def sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def stream_filters(request: PromtRequest):
+    """
+    Modo streaming de /query-filters (server-sent events). Eventos:
+      delta  {"text"}                    texto parcial del modelo, tal cual llega
+      field  {"field", "value", "t_ms"}  cada campo de primer nivel en cuanto se puede parsear
+      done   {"filters", "ttff_ms", "total_ms"}  objeto completo al terminar
+      error  {"error"}                   sin JSON válido o sin conexión con LM Studio
+    ttff_ms = tiempo hasta el primer campo de USEFUL_FIELDS.
+    """
+    metrics.IN_FLIGHT.labels(model=MODEL).inc()
+    status = "ok"
+    t0 = time.perf_counter()
+    ttff = None
+    parser = PartialJSONObject()
+    try:
+        with metrics.timed("total", MODEL):
+            try:
+                with metrics.timed("llm", MODEL):
+                    stream = client.chat.completions.create(
+                        model= MODEL,
+                        messages=build_messages(request.promt),
+                        temperature=0.7,
+                        max_tokens=request.max_tokens,
+                        stream=True,
+                    )
+                    for chunk in stream:
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if not delta:
+                            continue
+                        # sin usage en streaming: cada fragmento cuenta como un token
+                        metrics.COMPLETION_TOKENS.labels(model=MODEL).inc()
+                        yield sse("delta", {"text": delta})
+                        for field, value in parser.feed(delta):
+                            t = time.perf_counter() - t0
+                            if ttff is None and field in USEFUL_FIELDS:
+                                ttff = t
+                                metrics.TIME_TO_FIELD.labels(model=MODEL, mode="stream").observe(t)
+                            yield sse("field", {"field": field, "value": value, "t_ms": round(t * 1000, 1)})
+            except Exception as e:
+                status = "backend_error"
+                yield sse("error", {"error": f"No se pudo conectar con LM Studio. Asegúrate de que el servidor esté activo. Detalle: {str(e)}"})
+                return
+            with metrics.timed("parse", MODEL):
+                filters = parser.result()
+            total = time.perf_counter() - t0
+            if filters is None:
+                status = "parse_error" if parser.started else "no_json"
+                yield sse("error", {"error": "No se pudo parsear el JSON" if parser.started else "No se encontró un objeto JSON"})
+            else:
+                yield sse("done", {"filters": filters, "ttff_ms": round(ttff * 1000, 1) if ttff is not None else None,
+                                   "total_ms": round(total * 1000, 1)})
+    finally:
+        metrics.REQUESTS.labels(model=MODEL, status=status).inc()
+        metrics.IN_FLIGHT.labels(model=MODEL).dec()
 
 #end-point
 @app.post("/query-filters")
-async def query_filters(request: PromtRequest):
+def query_filters(request: PromtRequest):
     """
-    Recibe un promt y devuelve los filtros que ayudan a buscar mejor
+    Recibe un promt y devuelve los filtros que ayudan a buscar mejor.
+    Con "stream": true responde como text/event-stream (ver stream_filters)
     """
+    if request.stream:
+        return StreamingResponse(stream_filters(request), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    metrics.IN_FLIGHT.labels(model=MODEL).inc()
+    status = "ok"
+    t0 = time.perf_counter()
     try:
-        completion = client.chat.completions.create(
-            model= "google/gemma-3-4b",
-            messages=[
-                {"role": "system", "content": f"{SYSTEM_ROLE}"},
-                {"role": "user", "content": request.promt}
-            ],
-            temperature=0.7,
-            max_tokens=request.max_tokens,
-        )
-        raw_response = completion.choices[0].message.content.strip()
-
-        #Buscar JSON con regex
-        match = re.search(r"\{[\s\S]*\}", raw_response)
-        if match:
+        with metrics.timed("total", MODEL):
             try:
-                response_json = json.loads(match.group(0))
-            except json.JSONDecodeError:
-                response_json = {"error": "No se pudo parsear el JSON"}
-        else:
-            response_json = {"error": "No se encontró un objeto JSON"}
-        print(raw_response)
-        return raw_response
-        return response_json
+                with metrics.timed("llm", MODEL):
+                    completion = client.chat.completions.create(
+                        model= MODEL,
+                        messages=build_messages(request.promt),
+                        temperature=0.7,
+                        max_tokens=request.max_tokens,
+                    )
+                raw_response = completion.choices[0].message.content.strip()
+                if completion.usage:
+                    metrics.COMPLETION_TOKENS.labels(model=MODEL).inc(completion.usage.completion_tokens or 0)
+
+                #Buscar JSON con regex
+                with metrics.timed("parse", MODEL):
+                    match = re.search(r"\{[\s\S]*\}", raw_response)
+                    if match:
+                        try:
+                            response_json = json.loads(match.group(0))
+                        except json.JSONDecodeError:
+                            status = "parse_error"
+                            response_json = {"error": "No se pudo parsear el JSON"}
+                    else:
+                        status = "no_json"
+                        response_json = {"error": "No se encontró un objeto JSON"}
+                print(raw_response)
+                return raw_response
+                return response_json
+            except Exception as e:
+                status = "backend_error"
+                return {"error": f"No se pudo conectar con LM Studio. Asegúrate de que el servidor esté activo. Detalle: {str(e)}"}
+    finally:
+        if status == "ok":
+            # sin streaming, el primer campo útil llega con la respuesta completa
+            metrics.TIME_TO_FIELD.labels(model=MODEL, mode="blocking").observe(time.perf_counter() - t0)
+        metrics.REQUESTS.labels(model=MODEL, status=status).inc()
+        metrics.IN_FLIGHT.labels(model=MODEL).dec()
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Métricas en formato de texto Prometheus
+    """
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/healthz")
+def healthz():
+    """
+    Comprueba que LM Studio responde y tiene el modelo cargado (lista de modelos, sin generar)
+    """
+    try:
+        models = client.with_options(timeout=HEALTH_TIMEOUT, max_retries=0).models.list()
+        ids = [m.id for m in models.data]
     except Exception as e:
-        return {"error": f"No se pudo conectar con LM Studio. Asegúrate de que el servidor esté activo. Detalle: {str(e)}"}
+        return JSONResponse(status_code=503, content={"status": "error", "detail": str(e)})
+    if MODEL not in ids:
+        return JSONResponse(status_code=503, content={"status": "error", "detail": f"Modelo {MODEL} no cargado", "models": ids})
+    return {"status": "ok", "model": MODEL}
 
 if __name__ == "__main__":
     import uvicorn
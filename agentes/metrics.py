@@ -0,0 +1,49 @@
+# metrics.py — métricas Prometheus del servicio Query-Filter
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+# buckets pensados para un modelo local: desde decenas de ms hasta ~1 min
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60)
+
+REQUEST_LATENCY = Histogram(
+    "query_filters_latency_seconds",
+    "Latencia de /query-filters por etapa (total, llm, parse)",
+    ["stage", "model"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS = Counter(
+    "query_filters_requests_total",
+    "Peticiones a /query-filters por resultado",
+    ["model", "status"],  # ok | parse_error | no_json | backend_error
+)
+IN_FLIGHT = Gauge(
+    "query_filters_in_flight",
+    "Peticiones en curso en /query-filters",
+    ["model"],
+)
+COMPLETION_TOKENS = Counter(
+    "query_filters_completion_tokens_total",
+    "Tokens generados por el modelo",
+    ["model"],
+)
+TIME_TO_FIELD = Histogram(
+    "query_filters_time_to_field_seconds",
+    "Tiempo hasta el primer campo útil (id_resol, rango_fechas, tipo_session); en modo blocking es el total",
+    ["model", "mode"],  # blocking | stream
+    buckets=LATENCY_BUCKETS,
+)
+
+
+@contextmanager
+def timed(stage: str, model: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        REQUEST_LATENCY.labels(stage=stage, model=model).observe(time.perf_counter() - t0)
+
+
+def render() -> tuple[bytes, str]:
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,112 @@
+# stream_json.py — lectura incremental del objeto JSON que el modelo genera token a token
+import json
+
+
+class PartialJSONObject:
+    """
+    Recibe el texto del modelo por fragmentos (feed) y devuelve cada campo de primer nivel
+    del objeto JSON en cuanto su valor termina (al llegar "," o la "}" final), sin esperar
+    al resto de la generación:
+        parser = PartialJSONObject()
+        for delta in stream:
+            for campo, valor in parser.feed(delta):
+                ...
+    Se ignora lo que haya antes de la primera "{" (p. ej. ```json). Solo se sigue el estado
+    mínimo: dentro/fuera de string, escape y profundidad; cada valor se parsea con json.loads
+    una sola vez. Un valor que no es JSON válido no se emite; el objeto completo se valida
+    al final con result(), igual que en el modo bloqueante.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.pos = 0          # siguiente carácter por revisar
+        self.start = None     # índice de la "{" de apertura
+        self.end = None       # índice siguiente a la "}" de cierre
+        self.depth = 0
+        self.in_str = False
+        self.esc = False
+        self.expect = "key"   # key | colon | value
+        self.key = None
+        self.tok = None       # inicio de la clave / valor en curso
+        self.fields = {}
+
+    @property
+    def started(self) -> bool:
+        return self.start is not None
+
+    @property
+    def done(self) -> bool:
+        return self.end is not None
+
+    def feed(self, delta: str) -> list[tuple[str, object]]:
+        out = []
+        self.text += delta
+        t = self.text
+        i, n = self.pos, len(t)
+        while i < n and self.end is None:
+            c = t[i]
+            if self.start is None:
+                if c == "{":
+                    self.start, self.depth = i, 1
+            elif self.in_str:
+                if self.esc:
+                    self.esc = False
+                elif c == "\\":
+                    self.esc = True
+                elif c == '"':
+                    self.in_str = False
+                    if self.depth == 1 and self.expect == "key":
+                        self.key = self._loads(t[self.tok:i + 1])
+                        self.expect = "colon"
+            elif c == '"':
+                self.in_str = True
+                if self.depth == 1 and (self.expect == "key" or (self.expect == "value" and self.tok is None)):
+                    self.tok = i
+            elif c in "{[":
+                if self.depth == 1 and self.expect == "value" and self.tok is None:
+                    self.tok = i
+                self.depth += 1
+            elif c in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    out.extend(self._end_value(t, i))
+                    self.end = i + 1
+            elif self.depth == 1:
+                if c == ":" and self.expect == "colon":
+                    self.expect, self.tok = "value", None
+                elif c == ",":
+                    out.extend(self._end_value(t, i))
+                elif self.expect == "value" and self.tok is None and not c.isspace():
+                    self.tok = i
+            i += 1
+        self.pos = i
+        return out
+
+    def _end_value(self, t: str, i: int) -> list[tuple[str, object]]:
+        key, tok = self.key, self.tok
+        ready = self.expect == "value" and tok is not None and isinstance(key, str)
+        self.expect, self.key, self.tok = "key", None, None
+        if not ready:
+            return []
+        try:
+            value = json.loads(t[tok:i])
+        except ValueError:
+            return []
+        self.fields[key] = value
+        return [(key, value)]
+
+    @staticmethod
+    def _loads(s: str):
+        try:
+            return json.loads(s)
+        except ValueError:
+            return None
+
+    def result(self) -> dict | None:
+        """Objeto completo (None si no se cerró o no es JSON válido)."""
+        if self.end is None:
+            return None
+        try:
+            return json.loads(self.text[self.start:self.end])
+        except ValueError:
+            return None
@@ -0,0 +1,194 @@
+# ask_service.py — servicio /ask sobre el corpus NDJSON (puerto 8099, el que usa test_models.py)
+import os
+import re
+import json
+import time
+import threading
+from typing import Optional, Dict, Any
+
+import requests
+from fastapi import FastAPI
+from pydantic import BaseModel
+from openai import OpenAI
+
+from retrieval import ChunkIndex, retrieve, drop_default_range, DEFAULT_K
+from catalog import Catalog, CATALOG_FILE
+
+NDJSON_DIR = os.path.expanduser(
+    os.getenv("NDJSON_DIR", "~/Desktop/Proyecto Resoluciones/Resoluciones_NDJSON")
+)
+CATALOG_DB = os.path.expanduser(
+    os.getenv("CATALOG_DB", f"~/Desktop/Proyecto Resoluciones/{CATALOG_FILE}")
+)
+LIST_LIMIT = 200
+# filtros que el catálogo no conoce: con alguno de ellos un "listar" pasa por la búsqueda de chunks
+TOPIC_FIELDS = ("temas_principales", "nombres_involucrados", "estado_proceso")
+# servicio de agentes/main.py; vacío = no pedir filtros automáticamente
+QUERY_FILTERS_URL = os.getenv("QUERY_FILTERS_URL", "http://127.0.0.1:8020/query-filters")
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "http://127.0.0.1:1234/v1")
+LLM_MODEL = os.getenv("LLM_MODEL", "openai/gpt-oss-20b")
+
+ANSWER_ROLE = (
+    "Eres un asistente que responde preguntas sobre resoluciones del Consejo Universitario. "
+    "Responde únicamente con la información de los fragmentos proporcionados y cita el "
+    "código de la resolución (id_reso) de cada dato que uses. Si los fragmentos no "
+    "contienen la respuesta, dilo explícitamente."
+)
+
+#Settings
+client = OpenAI(base_url=LLM_BASE_URL, api_key="not-needed")
+app = FastAPI(
+    title="Ask",
+    description="Recuperación con citas sobre resoluciones",
+    version="1.0.0"
+)
+
+# El corpus se carga una sola vez (al primer uso) y queda en memoria
+_index: ChunkIndex | None = None
+_index_lock = threading.Lock()
+
+def get_index() -> ChunkIndex:
+    global _index
+    if _index is None:
+        # las primeras consultas concurrentes esperan a una sola carga
+        with _index_lock:
+            if _index is None:
+                t0 = time.perf_counter()
+                _index = ChunkIndex.from_folder(NDJSON_DIR)
+                print(f"Índice cargado: {len(_index)} chunks en {time.perf_counter() - t0:.2f}s")
+    return _index
+
+_catalog: Catalog | None = None
+_catalog_lock = threading.Lock()
+
+def get_catalog() -> Catalog | None:
+    global _catalog
+    if _catalog is None and os.path.exists(CATALOG_DB):
+        with _catalog_lock:  # como get_index: una sola conexión aunque lleguen varias consultas
+            if _catalog is None:
+                _catalog = Catalog(CATALOG_DB)
+    return _catalog
+
+
+class AskRequest(BaseModel):
+    query: str
+    filters: Optional[Dict[str, Any]] = None
+    k: int = DEFAULT_K
+    generate: bool = True
+    max_tokens: int = 1000
+
+
+def fetch_filters(query: str) -> dict | None:
+    """
+    Pide los filtros a /query-filters. Si el servicio no está o la respuesta no es
+    un JSON válido se busca sin filtros.
+    """
+    if not QUERY_FILTERS_URL:
+        return None
+    try:
+        r = requests.post(QUERY_FILTERS_URL, json={"promt": query}, timeout=(2, 30))
+        r.raise_for_status()
+        data = r.json()
+        # el endpoint puede devolver el texto crudo del modelo
+        if isinstance(data, str):
+            m = re.search(r"\{[\s\S]*\}", data)
+            data = json.loads(m.group(0)) if m else None
+        if isinstance(data, dict) and "error" not in data:
+            return data
+    except Exception as e:
+        print(f"Sin filtros para la consulta ({e})")
+    return None
+
+
+def generate_answer(query: str, citations: list[dict], max_tokens: int) -> dict:
+    """Respuesta del LLM con el uso de tokens y el modelo que informa el servidor."""
+    contexto = "\n\n".join(
+        f"[{c['id_reso']} | {c['seccion']} | {c['fecha']}]\n{c['texto']}" for c in citations
+    )
+    completion = client.chat.completions.create(
+        model=LLM_MODEL,
+        messages=[
+            {"role": "system", "content": ANSWER_ROLE},
+            {"role": "user", "content": f"Fragmentos:\n{contexto}\n\nPregunta: {query}"}
+        ],
+        temperature=0.2,
+        max_tokens=max_tokens,
+    )
+    usage = completion.usage
+    return {
+        "answer": completion.choices[0].message.content.strip(),
+        "usage": {k: getattr(usage, k, None) for k in ("prompt_tokens", "completion_tokens", "total_tokens")}
+                 if usage else None,
+        "model": completion.model,
+    }
+
+
+def is_listing(filters: dict | None) -> bool:
+    # "¿Qué resoluciones se aprobaron en marzo de 2025?": solo metadatos de encabezado
+    return bool(filters) and filters.get("intencion_usuario") == "listar" \
+        and not any(filters.get(k) for k in TOPIC_FIELDS)
+
+
+def list_resolutions(catalog: Catalog, filters: dict | None, limit: int = LIST_LIMIT) -> dict:
+    t0 = time.perf_counter()
+    total = catalog.count(filters)
+    rows = catalog.query(filters, limit)
+    elapsed = round((time.perf_counter() - t0) * 1000, 2)
+    lineas = [f"- {r['id_reso']} ({r['fecha'] or r['fecha_iso'] or 'sin fecha'}, sesión {r['tipo'] or '-'}, "
+              f"acta {r['acta'] or '-'})" for r in rows]
+    answer = f"{total} resoluciones encontradas" + (f" (se muestran {len(rows)})" if total > len(rows) else "")
+    return {
+        "resoluciones": rows,
+        "total": total,
+        "citations": [],
+        "used_docs": [r["id_reso"] for r in rows],
+        "retrieval_ms": elapsed,
+        "answer": answer + (":\n" + "\n".join(lineas) if lineas else "."),
+    }
+
+
+#end-point
+@app.post("/resoluciones")
+def resoluciones(filters: Optional[Dict[str, Any]] = None, limit: int = LIST_LIMIT):
+    """
+    Lista resoluciones del catálogo con los mismos campos de /query-filters
+    """
+    catalog = get_catalog()
+    if catalog is None:
+        return {"error": f"No existe el catálogo {CATALOG_DB}"}
+    result = list_resolutions(catalog, filters, limit)
+    result["filters"] = filters
+    return result
+
+@app.post("/ask")
+def ask(request: AskRequest):
+    """
+    Recupera los chunks más relevantes (filtrados por /query-filters) y responde con citas
+    """
+    if request.filters is not None:
+        filters = request.filters
+    else:
+        # el año en curso que /query-filters pone por defecto no restringe una pregunta sin fecha
+        filters = drop_default_range(request.query, fetch_filters(request.query))
+    # listados por fecha/tipo/código: consulta indexada al catálogo, sin chunks ni LLM
+    catalog = get_catalog() if is_listing(filters) else None
+    if catalog is not None:
+        result = list_resolutions(catalog, filters)
+        result["filters"] = filters
+        return result
+
+    result = retrieve(get_index(), request.query, filters, request.k)
+    result["filters"] = filters
+
+    result.update(answer="", usage=None, model=None)
+    if request.generate and result["citations"]:
+        try:
+            result.update(generate_answer(request.query, result["citations"], request.max_tokens))
+        except Exception as e:
+            result["answer"] = f"No se pudo generar la respuesta. Detalle: {str(e)}"
+    return result
+
+if __name__ == "__main__":
+    import uvicorn
+    port = 8099
+    uvicorn.run("ask_service:app", host="0.0.0.0", port=port)
@@ -0,0 +1,88 @@
+# bench_bm25.py — latencia de consulta del índice BM25 a 10k / 100k / 1M chunks
+# Uso: python benchmarks/bench_bm25.py [10000 100000 1000000]
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bm25_index import BM25Index
+
+VOCAB = (
+    "consejo universitario resolución aprobar negar recurso impugnación reposición título "
+    "docente dedicación tiempo completo periodo académico facultad memorando informe "
+    "comisión reglamento artículo estatuto licencia beca maestría doctorado carrera "
+    "vicerrectorado rectorado jurídico procuraduría sesión ordinaria extraordinaria "
+    "convocatoria concurso méritos oposición estudiante matrícula calificación"
+).split()
+NOMBRES = ["Pablo Isaías Lazo Pillaga", "Fernando González Calle", "María Ortiz Vega", "Juan Pérez Mora"]
+
+QUERIES = [
+    "reposición de títulos",
+    "UC-CU-RES-022-2025",
+    "recurso de impugnación Lazo Pillaga",
+    "dedicación tiempo completo periodo académico",
+    "memorando UC-FCH-2025-0053-M",
+]
+
+
+def synthetic_text(rng: random.Random, i: int) -> str:
+    words = rng.choices(VOCAB, k=rng.randint(60, 160))
+    if i % 7 == 0:
+        words.insert(rng.randrange(len(words)), rng.choice(NOMBRES))
+    if i % 5 == 0:
+        words.insert(rng.randrange(len(words)), f"UC-CU-RES-{i % 400:03d}-{2021 + i % 5}")
+    return "Que, " + " ".join(words)
+
+
+def bench(n: int, rng: random.Random, reps: int = 20) -> dict:
+    tmp = tempfile.mkdtemp(prefix="bm25_")
+    try:
+        idx = BM25Index()
+        t0 = time.perf_counter()
+        for i in range(n):
+            idx.add(synthetic_text(rng, i), [None, None, None])
+        t_build = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        idx.save(tmp)
+        t_save = time.perf_counter() - t0
+        idx.close()
+
+        t0 = time.perf_counter()
+        idx = BM25Index.load(tmp)
+        t_load = time.perf_counter() - t0
+
+        lat = []
+        for _ in range(reps):
+            for q in QUERIES:
+                t0 = time.perf_counter()
+                idx.search(q, k=10)
+                lat.append((time.perf_counter() - t0) * 1000)
+        idx.close()
+        lat.sort()
+        size = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+        return {
+            "chunks": n,
+            "build_s": round(t_build, 2),
+            "save_s": round(t_save, 2),
+            "load_ms": round(t_load * 1000, 1),
+            "index_mb": round(size / 1e6, 1),
+            "p50_ms": round(statistics.median(lat), 2),
+            "p95_ms": round(lat[int(len(lat) * 0.95) - 1], 2),
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sizes = [int(x) for x in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    rng = random.Random(42)
+    print(f"{'chunks':>9} {'build_s':>8} {'save_s':>7} {'load_ms':>8} {'index_mb':>9} {'p50_ms':>8} {'p95_ms':>8}")
+    for n in sizes:
+        r = bench(n, rng)
+        print(f"{r['chunks']:>9} {r['build_s']:>8} {r['save_s']:>7} {r['load_ms']:>8} "
+              f"{r['index_mb']:>9} {r['p50_ms']:>8} {r['p95_ms']:>8}")
@@ -0,0 +1,100 @@
+# bench_catalog.py — consultas de "listar" en el catálogo SQLite frente a recorrer todos los NDJSON
+# Uso:
+#   python benchmarks/bench_catalog.py [n_resoluciones]
+#   python benchmarks/bench_catalog.py --input "~/Desktop/Proyecto Resoluciones/Resoluciones_NDJSON"
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from catalog import Catalog, rows_from_ndjson
+from chunk_store import iter_ndjson_records
+from retrieval import normalize_id
+
+QUERIES = {
+    "marzo_2025": {"rango_fechas": {"fecha_inicio": "2025-03-01", "fecha_fin": "2025-03-31"},
+                   "intencion_usuario": "listar"},
+    "extraordinarias_2024": {"rango_fechas": {"fecha_inicio": "2024-01-01", "fecha_fin": "2024-12-31"},
+                             "tipo_session": "extraordinaria", "intencion_usuario": "listar"},
+    "por_codigo": {"id_resol": "uc-cu-res-022-2025", "intencion_usuario": "buscar_especifico"},
+}
+
+
+def write_synthetic_ndjson(folder: str, n_resos: int, per_doc: int = 15, seed: int = 7):
+    """Un NDJSON por resolución en subcarpetas por año, como process_folder_to_ndjson."""
+    rng = random.Random(seed)
+    for i in range(n_resos):
+        year = 2021 + i % 5
+        mes, dia = rng.randint(1, 12), rng.randint(1, 28)
+        id_reso = f"UC-CU-RES-{i // 5 % 1000:03d}-{year}"
+        folder_y = os.path.join(folder, str(year))
+        os.makedirs(folder_y, exist_ok=True)
+        doc = {"id_reso": id_reso, "acta": str(rng.randint(1, 60)),
+               "tipo": "Extraordinaria" if rng.random() < 0.2 else "Ordinaria", "anio": year,
+               "fecha_iso": f"{year}-{mes:02d}-{dia:02d}", "fecha": f"{dia} de mes {mes} de {year}"}
+        with open(os.path.join(folder_y, f"RESOLUCIÓN_{id_reso}-{i}.ndjson"), "w", encoding="utf-8") as fw:
+            for j in range(per_doc):
+                fw.write(json.dumps(dict(doc, seccion="considerando" if j < 10 else "resuelve",
+                                         parrafo_index=j, pagina_inicio=1 + j // 5, pagina_fin=1 + j // 5,
+                                         texto="texto " * 120, fuente_pdf=f"RESOLUCIÓN_{id_reso}.pdf",
+                                         sha1="0" * 40), ensure_ascii=False) + "\n")
+
+
+def scan_listing(folder: str, filters: dict) -> set[str]:
+    """Lo que hay que hacer sin catálogo: leer todos los chunks y agrupar por id_reso."""
+    rango = filters.get("rango_fechas") or {}
+    tipo = (filters.get("tipo_session") or "").lower()
+    want = normalize_id(filters.get("id_resol"))
+    out = set()
+    for ch in iter_ndjson_records(folder):
+        f = ch.get("fecha_iso") or ""
+        if rango.get("fecha_inicio") and not (f and f >= rango["fecha_inicio"]):
+            continue
+        if rango.get("fecha_fin") and not (f and f <= rango["fecha_fin"]):
+            continue
+        if tipo and (ch.get("tipo") or "").lower() != tipo:
+            continue
+        if want and normalize_id(ch.get("id_reso")) != want:
+            continue
+        out.add(ch["id_reso"])
+    return out
+
+
+def timed(fn, reps: int) -> tuple[float, object]:
+    best, res = float("inf"), None
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        res = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, res
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("n", nargs="?", type=int, default=5000)
+    ap.add_argument("--input", help="carpeta NDJSON real")
+    ap.add_argument("--reps", type=int, default=3)
+    args = ap.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    folder = os.path.expanduser(args.input) if args.input else os.path.join(tmp.name, "ndjson")
+    if not args.input:
+        write_synthetic_ndjson(folder, args.n)
+
+    cat = Catalog(os.path.join(tmp.name, "catalogo.sqlite"))
+    t0 = time.perf_counter()
+    cat.upsert_many(rows_from_ndjson(folder))
+    print(f"Catálogo: {len(cat)} resoluciones, construido en {time.perf_counter() - t0:.2f}s")
+
+    print(f"{'consulta':<22} {'filas':>6} {'catálogo ms':>12} {'recorrido ms':>13} {'x':>8}")
+    for nombre, filters in QUERIES.items():
+        t_cat, rows = timed(lambda: cat.query(filters), args.reps * 20)
+        t_scan, ids = timed(lambda: scan_listing(folder, filters), args.reps)
+        assert {r["id_reso"] for r in rows} == ids, nombre
+        print(f"{nombre:<22} {len(rows):>6} {t_cat * 1000:>12.3f} {t_scan * 1000:>13.1f} {t_scan / t_cat:>8.0f}")
+    cat.close()
+    tmp.cleanup()
@@ -0,0 +1,71 @@
+# bench_chunk_store.py — memoria de ChunkStore frente a una lista de dicts
+# Uso:
+#   python benchmarks/bench_chunk_store.py [n_chunks]
+#   python benchmarks/bench_chunk_store.py --input "~/Desktop/Proyecto Resoluciones/Resoluciones_NDJSON"
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from chunk_store import ChunkStore, iter_ndjson_records
+
+
+def synthetic_lines(n: int, seed: int = 42) -> list[str]:
+    # como en disco: líneas JSON, para que ambos cargadores partan del mismo texto
+    rng = random.Random(seed)
+    palabras = "consejo universitario resolución aprobar negar recurso título docente dedicación".split()
+    lines = []
+    per_doc = 15
+    for i in range(n):
+        d = i // per_doc
+        texto = " ".join(rng.choices(palabras, k=rng.randint(40, 140)))
+        lines.append(json.dumps({
+            "id_reso": f"UC-CU-RES-{d % 999:03d}-{2021 + d % 5}", "acta": str(d % 60), "tipo": "Ordinaria",
+            "anio": 2021 + d % 5, "fecha_iso": f"{2021 + d % 5}-03-{1 + d % 28:02d}",
+            "fecha": f"{1 + d % 28} de marzo de {2021 + d % 5}",
+            "seccion": "considerando" if i % per_doc < 10 else "resuelve",
+            "parrafo_index": i % per_doc, "pagina_inicio": 1 + (i % per_doc) // 5,
+            "pagina_fin": 1 + (i % per_doc) // 5, "texto": texto,
+            "fuente_pdf": f"RESOLUCIÓN_UC-CU-RES-{d % 999:03d}-{2021 + d % 5}.pdf",
+            "sha1": "%040x" % rng.getrandbits(160),
+        }, ensure_ascii=False))
+    return lines
+
+
+def measure(build):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    obj = build()
+    elapsed = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current, peak, elapsed
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("n", nargs="?", type=int, default=100_000)
+    ap.add_argument("--input", help="carpeta NDJSON real")
+    args = ap.parse_args()
+
+    if args.input:
+        lines = [json.dumps(r, ensure_ascii=False) for r in iter_ndjson_records(os.path.expanduser(args.input))]
+    else:
+        lines = synthetic_lines(args.n)
+    text_bytes = sum(len(json.loads(l)["texto"].encode("utf-8")) for l in lines)
+
+    dicts, d_cur, d_peak, d_t = measure(lambda: [json.loads(l) for l in lines])
+    store, s_cur, s_peak, s_t = measure(lambda: ChunkStore.from_records(json.loads(l) for l in lines))
+    assert store[len(store) - 1].to_dict() == dicts[-1]
+
+    n = len(lines)
+    print(f"{n} chunks, {text_bytes / 1e6:.1f} MB de texto UTF-8")
+    print(f"{'':<12} {'MB':>8} {'pico MB':>8} {'B/chunk':>8} {'carga s':>8}")
+    print(f"{'dicts':<12} {d_cur / 1e6:>8.1f} {d_peak / 1e6:>8.1f} {d_cur / n:>8.0f} {d_t:>8.2f}")
+    print(f"{'ChunkStore':<12} {s_cur / 1e6:>8.1f} {s_peak / 1e6:>8.1f} {s_cur / n:>8.0f} {s_t:>8.2f}")
+    print(f"Sobrecarga sin texto: dicts {(d_cur - text_bytes) / n:.0f} B/chunk, "
+          f"ChunkStore {(s_cur - text_bytes) / n:.0f} B/chunk ({len(store.docs)} documentos)")
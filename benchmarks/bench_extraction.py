@@ -0,0 +1,120 @@
+# bench_extraction.py — tiempo por etapa de process_pdf_to_ndjson sobre PDFs sintéticos
+# Uso:
+#   python benchmarks/bench_extraction.py --docs 20 --pages 3 10 40
+#   python benchmarks/bench_extraction.py --input "~/Desktop/Proyecto Resoluciones/Resoluciones/2025"
+#   python benchmarks/bench_extraction.py --history 10
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+import pdf_to_ndjson as p2n
+from pipeline_stats import DocStats, RunStats, STAGES
+from synthetic_pdfs import generate_corpus
+
+HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "extraction_history.jsonl")
+
+
+def git_commit() -> str:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return rev + ("+dirty" if dirty else "")
+    except Exception:
+        return "desconocido"
+
+
+def bench_folder(folder: str, reps: int = 1) -> dict:
+    pdfs = sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(".pdf"))
+    run = RunStats()
+    with tempfile.TemporaryDirectory() as out:
+        for _ in range(reps):
+            for pdf in pdfs:
+                st = DocStats(os.path.basename(pdf))
+                p2n.process_pdf_to_ndjson(pdf, os.path.join(out, "out.ndjson"), st)
+                run.add(st)
+    rep = run.report(top_n=0)
+    total = sum(rep["stages_s"].values())
+    return {
+        "docs": rep["docs"],
+        "pages": rep["pages"],
+        "chunks": rep["chunks"],
+        "bytes": rep["bytes"],
+        "total_s": round(total, 4),
+        "pages_s": round(rep["pages"] / total, 1) if total else None,
+        "stages_s": rep["stages_s"],
+    }
+
+
+def print_result(label: str, r: dict):
+    total = r["total_s"] or 1.0
+    print(f"\n== {label}: {r['docs']} docs, {r['pages']} páginas, {r['chunks']} chunks — "
+          f"{r['total_s']:.3f}s ({r['pages_s']} pág/s)")
+    for s in STAGES:
+        v = r["stages_s"][s]
+        print(f"   {s:<10} {v:>9.4f}s  {v / total * 100:5.1f}%")
+
+
+def append_history(entry: dict):
+    os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
+    with open(HISTORY_FILE, "a", encoding="utf-8") as fw:
+        fw.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def show_history(n: int):
+    """Tabla de las últimas n corridas (ms por página y etapa) para ver regresiones entre commits."""
+    if not os.path.exists(HISTORY_FILE):
+        print("Sin historial todavía")
+        return
+    with open(HISTORY_FILE, "r", encoding="utf-8") as fr:
+        rows = [json.loads(l) for l in fr if l.strip()][-n:]
+    print(f"{'fecha':<17} {'commit':<14} {'caso':<12} " + " ".join(f"{s:>9}" for s in STAGES) + "   (ms/página)")
+    for row in rows:
+        for caso, r in row["results"].items():
+            pg = r["pages"] or 1
+            print(f"{row['fecha']:<17} {row['commit']:<14} {caso:<12} "
+                  + " ".join(f"{r['stages_s'][s] * 1000 / pg:>9.3f}" for s in STAGES))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=20)
+    ap.add_argument("--pages", type=int, nargs="+", default=[3, 10, 40])
+    ap.add_argument("--reps", type=int, default=1)
+    ap.add_argument("--input", help="carpeta con PDFs reales en lugar de sintéticos")
+    ap.add_argument("--no-save", action="store_true", help="no agregar al historial")
+    ap.add_argument("--history", type=int, metavar="N", help="mostrar las últimas N corridas y salir")
+    args = ap.parse_args()
+
+    if args.history:
+        show_history(args.history)
+        sys.exit(0)
+
+    results = {}
+    if args.input:
+        results["real"] = bench_folder(os.path.expanduser(args.input), args.reps)
+        print_result("real", results["real"])
+    else:
+        for pg in args.pages:
+            with tempfile.TemporaryDirectory() as tmp:
+                generate_corpus(tmp, args.docs, pg)
+                caso = f"{pg}p"
+                results[caso] = bench_folder(tmp, args.reps)
+                print_result(f"sintético {pg} páginas", results[caso])
+
+    if not args.no_save:
+        append_history({
+            "fecha": datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "commit": git_commit(),
+            "docs": args.docs,
+            "reps": args.reps,
+            "results": results,
+        })
+        print(f"\nHistorial: {HISTORY_FILE}")
@@ -0,0 +1,121 @@
+# bench_layout_clean.py — encabezado/pie: HEADER_FOOTER_PATTERNS vs LayoutCleaner (geometría + boilerplate)
+# Exactitud por línea contra el cuerpo conocido de PDFs sintéticos y tiempo de extracción/limpieza.
+# Uso:
+#   python benchmarks/bench_layout_clean.py --docs 30 --pages 3 10
+#   python benchmarks/bench_layout_clean.py --input "~/Desktop/Proyecto Resoluciones/Resoluciones/2025"
+import os
+import sys
+import time
+import argparse
+import tempfile
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import pdf_to_ndjson as p2n
+from layout_clean import LayoutCleaner, extract_page_blocks
+from synthetic_pdfs import make_resolution_pdf
+
+
+def regex_pages(pdf: str) -> tuple[list[str], float, float]:
+    t0 = time.perf_counter()
+    pages = p2n.extract_pages(pdf)
+    t1 = time.perf_counter()
+    clean = [p2n.clean_page_text(t) for _, t in pages]
+    return clean, t1 - t0, time.perf_counter() - t1
+
+
+def layout_pages(pdf: str, cleaner: LayoutCleaner) -> tuple[list[str], float, float]:
+    t0 = time.perf_counter()
+    pages = extract_page_blocks(pdf)
+    t1 = time.perf_counter()
+    clean = [p2n.normalize_page_text(cleaner.clean_blocks(h, blocks)) for _, h, blocks in pages]
+    return clean, t1 - t0, time.perf_counter() - t1
+
+
+def line_diff(expected: str, got: str) -> tuple[int, int, int]:
+    """(líneas esperadas, boilerplate que quedó, líneas de cuerpo perdidas)"""
+    exp = Counter(ln.strip() for ln in expected.split("\n") if ln.strip())
+    out = Counter(ln.strip() for ln in got.split("\n") if ln.strip())
+    return sum(exp.values()), sum((out - exp).values()), sum((exp - out).values())
+
+
+def synthetic_corpus(folder: str, n_docs: int, pages: list[int], variants: bool) -> list[tuple[str, list]]:
+    docs = []
+    for i in range(n_docs):
+        path = os.path.join(folder, f"RESOLUCIÓN_UC-CU-RES-{i + 1:03d}-2025.pdf")
+        meta = make_resolution_pdf(path, pages[i % len(pages)], seed=1000 + i, numero=i + 1,
+                                   tipo="Extraordinaria" if i % 5 == 0 else "Ordinaria", variants=variants)
+        expected = [p2n.normalize_page_text("\n".join(body)) for body in meta["body"]]
+        docs.append((path, expected))
+    return docs
+
+
+def run_case(label: str, docs: list[tuple[str, list | None]], cleaner: LayoutCleaner):
+    print(f"\n== {label}: {len(docs)} docs, {len(cleaner.boilerplate)} líneas de boilerplate aprendidas, "
+          f"franjas {cleaner.top:.1%} / {cleaner.bottom:.1%}")
+    print(f"{'modo':<8} {'páginas':>8} {'extraer ms/pág':>15} {'limpiar ms/pág':>15} "
+          f"{'exactas %':>10} {'boilerplate':>12} {'perdidas':>9}")
+    for modo in ("regex", "layout"):
+        n_pages = t_ext = t_clean = 0.0
+        exp_lines = leaked = lost = exact = 0
+        for pdf, expected in docs:
+            if modo == "regex":
+                clean, te, tc = regex_pages(pdf)
+            else:
+                clean, te, tc = layout_pages(pdf, cleaner)
+            n_pages += len(clean)
+            t_ext += te
+            t_clean += tc
+            if expected is None:
+                continue
+            for exp, got in zip(expected, clean):
+                e, l, p = line_diff(exp, got)
+                exp_lines += e
+                leaked += l
+                lost += p
+                exact += (l == 0 and p == 0)
+        acc = f"{exact / n_pages * 100:.1f}" if exp_lines else "-"
+        print(f"{modo:<8} {int(n_pages):>8} {t_ext / n_pages * 1000:>15.3f} {t_clean / n_pages * 1000:>15.3f} "
+              f"{acc:>10} {leaked if exp_lines else '-':>12} {lost if exp_lines else '-':>9}")
+
+
+def disagreements(pdfs: list[str], cleaner: LayoutCleaner, top: int = 15):
+    """Sin referencia (PDFs reales): líneas que un modo quita y el otro no."""
+    only_regex, only_layout = Counter(), Counter()
+    for pdf in pdfs:
+        a, _, _ = regex_pages(pdf)
+        b, _, _ = layout_pages(pdf, cleaner)
+        for ra, lb in zip(a, b):
+            ca = Counter(ln.strip() for ln in ra.split("\n") if ln.strip())
+            cb = Counter(ln.strip() for ln in lb.split("\n") if ln.strip())
+            only_layout.update(ca - cb)
+            only_regex.update(cb - ca)
+    for titulo, c in (("Quitadas solo por layout", only_layout), ("Quitadas solo por regex", only_regex)):
+        print(f"\n{titulo} ({sum(c.values())} líneas):")
+        for ln, n in c.most_common(top):
+            print(f"  {n:>5}  {ln[:100]}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=30)
+    ap.add_argument("--pages", type=int, nargs="+", default=[3, 10])
+    ap.add_argument("--input", help="carpeta con PDFs reales (sin referencia: solo tiempos y diferencias)")
+    args = ap.parse_args()
+
+    if args.input:
+        folder = os.path.expanduser(args.input)
+        pdfs = sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(".pdf"))
+        cleaner = LayoutCleaner.learn_folder(folder)
+        run_case("real", [(p, None) for p in pdfs], cleaner)
+        disagreements(pdfs, cleaner)
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for variants in (False, True):
+            folder = os.path.join(tmp, "variantes" if variants else "base")
+            os.makedirs(folder)
+            docs = synthetic_corpus(folder, args.docs, args.pages, variants)
+            # se aprende con la mitad de los documentos y se mide sobre todos
+            cleaner = LayoutCleaner.learn(pdf for pdf, _ in docs[::2])
+            run_case("con variantes" if variants else "formato base", docs, cleaner)
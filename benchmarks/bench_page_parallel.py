@@ -0,0 +1,75 @@
+# bench_page_parallel.py — un PDF grande (anexos) en serie vs repartido por rangos de páginas entre procesos
+# Comprueba que el NDJSON sea idéntico y barre tamaños para ubicar SPLIT_MIN_PAGES.
+# Uso:
+#   python benchmarks/bench_page_parallel.py                    # 500 páginas, 2/4/8 procesos
+#   python benchmarks/bench_page_parallel.py --pages 500 --workers 4 --sweep 40 80 120 250
+#   python benchmarks/bench_page_parallel.py --layout
+import os
+import sys
+import time
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import pdf_to_ndjson as p2n
+from layout_clean import LayoutCleaner
+from pipeline_stats import DocStats
+from synthetic_pdfs import make_resolution_pdf
+
+
+def run(pdf: str, out: str, workers: int, cleaner, pool_cache: dict) -> tuple[float, DocStats]:
+    """workers <= 1: en serie. El pool se reutiliza entre repeticiones, como en process_folder_to_ndjson."""
+    st = DocStats(os.path.basename(pdf))
+    pool = None
+    if workers > 1:
+        pool = pool_cache.get(workers)
+        if pool is None:
+            pool = pool_cache[workers] = ProcessPoolExecutor(workers)
+            pool.submit(int).result()  # arrancar los procesos fuera de la medición
+    t0 = time.perf_counter()
+    p2n.process_pdf_to_ndjson(pdf, out, st, cleaner, pool=pool, split_pages=1 if pool else 0)
+    return time.perf_counter() - t0, st
+
+
+def read(path: str) -> bytes:
+    with open(path, "rb") as fr:
+        return fr.read()
+
+
+def bench_doc(pdf: str, pages: int, workers: list[int], reps: int, cleaner, tmp: str, pools: dict):
+    base_out = os.path.join(tmp, "serie.ndjson")
+    best_serial = min(run(pdf, base_out, 1, cleaner, pools)[0] for _ in range(reps))
+    ref = read(base_out)
+    print(f"{pages:>7} {'serie':>9} {best_serial * 1000:>10.0f} {'1.00':>8} {'-':>10}")
+    for w in workers:
+        out = os.path.join(tmp, f"w{w}.ndjson")
+        best = min(run(pdf, out, w, cleaner, pools)[0] for _ in range(reps))
+        same = "sí" if read(out) == ref else "NO"
+        print(f"{pages:>7} {w:>9} {best * 1000:>10.0f} {best_serial / best:>8.2f} {same:>10}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=500)
+    ap.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    ap.add_argument("--sweep", type=int, nargs="*", default=[40, 120, 250],
+                    help="tamaños adicionales para ubicar el umbral SPLIT_MIN_PAGES")
+    ap.add_argument("--reps", type=int, default=2)
+    ap.add_argument("--layout", action="store_true", help="limpieza con LayoutCleaner en lugar de regex")
+    args = ap.parse_args()
+
+    print(f"CPUs: {os.cpu_count()}, PAGE_RANGE={p2n.PAGE_RANGE}, SPLIT_MIN_PAGES={p2n.SPLIT_MIN_PAGES}")
+    pools = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        sizes = sorted(set(args.sweep + [args.pages]))
+        pdfs = {}
+        for n in sizes:
+            pdfs[n] = os.path.join(tmp, f"RESOLUCIÓN_UC-CU-RES-{n:03d}-2025.pdf")
+            make_resolution_pdf(pdfs[n], n, seed=n, numero=n % 1000)
+        cleaner = LayoutCleaner.learn(pdfs.values()) if args.layout else None
+        print(f"{'páginas':>7} {'procesos':>9} {'ms':>10} {'x':>8} {'idéntico':>10}")
+        for n in sizes:
+            bench_doc(pdfs[n], n, args.workers, args.reps, cleaner, tmp, pools)
+    for pool in pools.values():
+        pool.shutdown()
@@ -0,0 +1,167 @@
+# bench_query_filters_stream.py — /query-filters: tiempo hasta el primer campo útil, bloqueante vs streaming (SSE)
+# Uso:
+#   python benchmarks/bench_query_filters_stream.py                      # LM Studio simulado, en proceso
+#   python benchmarks/bench_query_filters_stream.py --tps 25 --repeat 5
+#   python benchmarks/bench_query_filters_stream.py --url http://localhost:8020/query-filters   # servicio real
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from statistics import median
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agentes"))
+
+PROMPTS = [
+    "¿Qué resoluciones se aprobaron en el mes de marzo de 2025?",
+    "¿Qué resuelve la resolución UC-CU-RES-022-2025?",
+    "Dame un resumen de la sesión extraordinaria de ayer.",
+    "¿Por qué NO se aceptó el recurso de impugnación interpuesto por el Msc. Pablo Isaías Lazo Pillaga?",
+]
+# respuesta típica del modelo, en el orden de campos que pide SYSTEM_ROLE
+STUB_ANSWER = json.dumps({
+    "id_resol": "UC-CU-RES-022-2025",
+    "rango_fechas": {"fecha_inicio": "2025-01-01", "fecha_fin": "2025-12-31"},
+    "temas_principales": ["reposición de títulos", "impugnación"],
+    "nombres_involucrados": ["msc. pablo isaías lazo pillaga"],
+    "numeros_referencia": {"id_resolucion": "UC-CU-RES-022-2025", "articulos": ["artículo 45"]},
+    "tipo_session": "ordinaria",
+    "estado_proceso": "negado",
+    "intencion_usuario": "explicar_motivo",
+}, ensure_ascii=False, indent=2)
+USEFUL_FIELDS = ("id_resol", "rango_fechas", "tipo_session")
+
+
+def start_stub_llm(tps: float, answer: str = STUB_ANSWER) -> ThreadingHTTPServer:
+    """/v1/chat/completions compatible con OpenAI que genera `answer` a `tps` tokens/s (~4 chars/token)."""
+    pieces = [answer[i:i + 4] for i in range(0, len(answer), 4)]
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *a):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            model = body.get("model", "stub")
+            if not body.get("stream"):
+                time.sleep(len(pieces) / tps)
+                out = json.dumps({"id": "stub", "object": "chat.completion", "created": 0, "model": model,
+                                  "choices": [{"index": 0, "finish_reason": "stop",
+                                               "message": {"role": "assistant", "content": answer}}],
+                                  "usage": {"prompt_tokens": 0, "completion_tokens": len(pieces),
+                                            "total_tokens": len(pieces)}}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for p in pieces + [None]:
+                time.sleep(1 / tps if p is not None else 0)
+                chunk = {"id": "stub", "object": "chat.completion.chunk", "created": 0, "model": model,
+                         "choices": [{"index": 0, "delta": {"content": p} if p is not None else {},
+                                      "finish_reason": None if p is not None else "stop"}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+            self.close_connection = True
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_sse(lines):
+    """(evento, datos) de un flujo text/event-stream línea a línea."""
+    event, data = None, []
+    for line in lines:
+        if line:
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:"):
+                data.append(line[5:].strip())
+            continue
+        if data:
+            yield event, json.loads("\n".join(data))
+        event, data = None, []
+
+
+def run_stream(events, t0: float) -> tuple[float | None, float, dict | None]:
+    """(primer campo útil s, total s, filtros) recorriendo los eventos SSE."""
+    ttff, filters = None, None
+    for event, data in events:
+        if event == "field" and ttff is None and data["field"] in USEFUL_FIELDS:
+            ttff = time.perf_counter() - t0
+        elif event == "done":
+            filters = data["filters"]
+    return ttff, time.perf_counter() - t0, filters
+
+
+def measure_local(prompt: str, max_tokens: int) -> dict:
+    """Contra main.py en proceso (sin uvicorn): mismo código del endpoint, sin HTTP hacia el cliente."""
+    import main
+    req = main.PromtRequest(promt=prompt, max_tokens=max_tokens)
+    t0 = time.perf_counter()
+    main.query_filters(req)
+    blocking = time.perf_counter() - t0
+
+    def events():
+        for raw in main.stream_filters(req):
+            yield from parse_sse(raw.split("\n"))
+
+    t0 = time.perf_counter()
+    ttff, total, filters = run_stream(events(), t0)
+    return {"blocking": blocking, "ttff": ttff, "stream_total": total, "ok": filters is not None}
+
+
+def measure_http(url: str, prompt: str, max_tokens: int) -> dict:
+    t0 = time.perf_counter()
+    requests.post(url, json={"promt": prompt, "max_tokens": max_tokens}, timeout=300).raise_for_status()
+    blocking = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with requests.post(url, json={"promt": prompt, "max_tokens": max_tokens, "stream": True},
+                       stream=True, timeout=300) as r:
+        r.raise_for_status()
+        ttff, total, filters = run_stream(parse_sse(r.iter_lines(decode_unicode=True)), t0)
+    return {"blocking": blocking, "ttff": ttff, "stream_total": total, "ok": filters is not None}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", help="endpoint /query-filters de un servicio en marcha (si no, LM Studio simulado)")
+    ap.add_argument("--tps", type=float, default=40.0, help="tokens/s del modelo simulado")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--max-tokens", type=int, default=1000)
+    args = ap.parse_args()
+
+    if args.url:
+        measure = lambda p: measure_http(args.url, p, args.max_tokens)
+        print(f"Servicio: {args.url}")
+    else:
+        from openai import OpenAI
+        import main
+        server = start_stub_llm(args.tps)
+        main.client = OpenAI(base_url=f"http://127.0.0.1:{server.server_address[1]}/v1", api_key="not-needed")
+        measure = lambda p: measure_local(p, args.max_tokens)
+        print(f"LM Studio simulado a {args.tps:.0f} tokens/s, respuesta de {len(STUB_ANSWER)} caracteres")
+
+    rows = [measure(p) for _ in range(args.repeat) for p in PROMPTS]
+    ok = [r for r in rows if r["ok"] and r["ttff"] is not None]
+    print(f"{'modo':<10} {'1er campo útil ms (p50)':>24} {'total ms (p50)':>15}")
+    b = median(r["blocking"] for r in rows)
+    print(f"{'blocking':<10} {b * 1000:>24.0f} {b * 1000:>15.0f}")
+    if ok:
+        f, t = median(r["ttff"] for r in ok), median(r["stream_total"] for r in ok)
+        print(f"{'stream':<10} {f * 1000:>24.0f} {t * 1000:>15.0f}")
+        print(f"Primer campo útil {b / f:.1f}x antes con streaming ({len(ok)}/{len(rows)} respuestas con JSON válido)")
+    else:
+        print("Ninguna respuesta en streaming trajo un campo útil parseable")
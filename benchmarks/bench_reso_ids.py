@@ -0,0 +1,86 @@
+# bench_reso_ids.py — filtro id_resol: recorrido con comparación de strings vs IdIndex (reso_ids.py)
+# Mide tiempo por consulta y aciertos con las formas en que llega un código: exacto, escrito por
+# el usuario ("RES 22 2025"), con errores de OCR ("UC-CU-RES-O22-2O25") y con el prefijo mal escrito.
+# Uso:
+#   python benchmarks/bench_reso_ids.py [n_resoluciones]
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from text_norm import fold
+from reso_ids import IdIndex, canonical_id
+from bench_shards import synthetic_docs
+
+OCR = str.maketrans("0125", "OIZS")
+
+
+def old_normalize(s: str | None) -> str | None:
+    # la normalización anterior de retrieval.normalize_id
+    if not s:
+        return None
+    return re.sub(r"[^A-Z0-9]", "", fold(str(s)).upper()) or None
+
+
+def variants(id_reso: str, rng: random.Random) -> dict[str, str]:
+    pre, num, year = id_reso.rsplit("-", 2)
+    ocr_num = "".join(c.translate(OCR) if rng.random() < 0.5 else c for c in num)
+    return {
+        "exacto": id_reso,
+        "minúsculas": id_reso.lower(),
+        "usuario": f"RES {int(num)} {year}",
+        "ocr": f"{pre}-{ocr_num or num}-{year[:1]}O{year[2:]}",
+        "prefijo": f"{pre.replace('RES', 'RSE')}-{num}-{year}",
+        "archivo": f"RESOLUCIÓN_{id_reso}_download.pdf",
+    }
+
+
+def scan(records: list[dict], q: str) -> list[int]:
+    want = old_normalize(q)
+    return [i for i, r in enumerate(records) if old_normalize(r.get("id_reso")) == want]
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("n", nargs="?", type=int, default=5000)
+    ap.add_argument("--queries", type=int, default=50)
+    args = ap.parse_args()
+
+    rng = random.Random(3)
+    docs = synthetic_docs(args.n)
+    records = [c for chunks in docs.values() for c in chunks]
+    truth = {}
+    for i, r in enumerate(records):
+        truth.setdefault(canonical_id(r["id_reso"]), set()).add(i)
+    print(f"{len(docs)} resoluciones, {len(records)} chunks, {len(truth)} códigos")
+
+    t0 = time.perf_counter()
+    ids = IdIndex()
+    for i, r in enumerate(records):
+        ids.add(r.get("id_reso"), i)
+    print(f"IdIndex: {len(ids)} claves, construido en {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    sample = rng.sample(sorted(truth), min(args.queries, len(truth)))
+    print(f"{'forma':<12} {'recorrido ms':>13} {'aciertos':>9} {'IdIndex µs':>11} {'aciertos':>9}")
+    for forma in variants(sample[0], rng):
+        t_scan = t_idx = 0.0
+        ok_scan = ok_idx = 0
+        for key in sample:
+            q = variants(key, rng)[forma]
+            t0 = time.perf_counter()
+            got = set(scan(records, q))
+            t_scan += time.perf_counter() - t0
+            ok_scan += got == truth[key]
+            t0 = time.perf_counter()
+            got = set(ids.lookup(q))
+            t_idx += time.perf_counter() - t0
+            ok_idx += got == truth[key]
+        n = len(sample)
+        print(f"{forma:<12} {t_scan / n * 1000:>13.2f} {ok_scan:>5}/{n:<3} {t_idx / n * 1e6:>11.1f} {ok_idx:>5}/{n:<3}")
+
+    # un número que no existe no debe caer en uno parecido
+    missing = sum(bool(ids.lookup(f"UC-CU-RES-{999 - i}-2031")) for i in range(20))
+    print(f"Códigos inexistentes que devolvieron algo: {missing}/20")
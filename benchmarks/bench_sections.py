@@ -0,0 +1,57 @@
+# bench_sections.py — split_sections por regex (anterior) vs SectionTokenizer de una pasada
+# Verifica que ambos den los mismos párrafos y compara tiempos según el largo del documento.
+# Uso: python benchmarks/bench_sections.py [--docs 10] [--pages 3 40 200]
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests"))
+import pdf_to_ndjson as p2n
+from synthetic_pdfs import generate_corpus
+from sections_regex import split_sections_regex
+
+
+def best_of(fn, reps: int) -> float:
+    best = float("inf")
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=10)
+    ap.add_argument("--pages", type=int, nargs="+", default=[3, 40, 200])
+    ap.add_argument("--reps", type=int, default=5)
+    ap.add_argument("--input", help="carpeta con PDFs reales")
+    args = ap.parse_args()
+
+    casos = []
+    if args.input:
+        folder = os.path.expanduser(args.input)
+        casos.append(("real", [os.path.join(folder, f) for f in sorted(os.listdir(folder)) if f.lower().endswith(".pdf")]))
+    tmp = tempfile.TemporaryDirectory()
+    if not args.input:
+        for pg in args.pages:
+            folder = os.path.join(tmp.name, str(pg))
+            casos.append((f"{pg}p", generate_corpus(folder, args.docs, pg)))
+
+    print(f"{'caso':<8} {'docs':>5} {'iguales':>8} {'regex ms':>9} {'1 pasada ms':>12} {'x':>6}")
+    for caso, pdfs in casos:
+        docs = [[p2n.clean_page_text(t) for _, t in p2n.extract_pages(pdf)] for pdf in pdfs]
+        iguales = 0
+        for pages in docs:
+            a = split_sections_regex("\n".join(pages).strip())
+            c, r = p2n.split_sections_pages(pages)
+            iguales += a == ([x.texto for x in c], [x.texto for x in r])
+
+        t_old = best_of(lambda: [split_sections_regex("\n".join(pages).strip()) for pages in docs], args.reps)
+        t_new = best_of(lambda: [p2n.split_sections_pages(pages) for pages in docs], args.reps)
+        print(f"{caso:<8} {len(docs):>5} {iguales:>5}/{len(docs):<2} {t_old * 1000:>9.2f} {t_new * 1000:>12.2f} "
+              f"{t_old / t_new:>6.2f}")
+    tmp.cleanup()
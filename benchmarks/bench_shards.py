@@ -0,0 +1,163 @@
+# bench_shards.py — un .ndjson / .json por resolución vs un shard comprimido por año (shards.py)
+# Tamaño en disco, escritura, lectura completa y acceso a una resolución.
+# Uso:
+#   python benchmarks/bench_shards.py [n_resoluciones]
+#   python benchmarks/bench_shards.py --input "~/Desktop/Proyecto Resoluciones/Resoluciones_NDJSON"
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from chunk_store import iter_ndjson_records
+from shards import ShardWriter, ShardReader, INDEX_EXT, _zstd
+from synthetic_pdfs import FRASES, ACCIONES
+
+BLOCK = 4096  # los archivos pequeños ocupan al menos un bloque
+
+
+def synthetic_docs(n_resos: int, seed: int = 7) -> dict[str, list[dict]]:
+    """fuente_pdf -> chunks, con texto variado (no se comprime tan fácil como un texto repetido)."""
+    rng = random.Random(seed)
+    docs = {}
+    for i in range(n_resos):
+        year = 2021 + i % 5
+        mes, dia = rng.randint(1, 12), rng.randint(1, 28)
+        id_reso = f"UC-CU-RES-{i // 5 % 1000:03d}-{year}"
+        fuente = f"RESOLUCIÓN_{id_reso}-{i}.pdf"
+        base = {"id_reso": id_reso, "acta": str(rng.randint(1, 60)), "tipo": "Ordinaria", "anio": year,
+                "fecha_iso": f"{year}-{mes:02d}-{dia:02d}", "fecha": f"{dia} de mes {mes} de {year}"}
+        chunks = []
+        for j in range(rng.randint(6, 30)):
+            cons = j < 10
+            frases = FRASES if cons else ACCIONES
+            texto = ("Que, " if cons else f"{j - 9}. ") + "; ".join(
+                rng.choice(frases).format(y=year, n=rng.randint(10, 99)) for _ in range(rng.randint(2, 6)))
+            chunks.append(dict(base, seccion="considerando" if cons else "resuelve", parrafo_index=j,
+                               pagina_inicio=1 + j // 5, pagina_fin=1 + j // 5, texto=texto,
+                               fuente_pdf=fuente, sha1=f"{rng.getrandbits(160):040x}"))
+        docs[fuente] = chunks
+    return docs
+
+
+def docs_from_folder(folder: str) -> dict[str, list[dict]]:
+    docs = {}
+    for ch in iter_ndjson_records(folder):
+        docs.setdefault(ch.get("fuente_pdf") or "?", []).append(ch)
+    return docs
+
+
+def disk_usage(folder: str) -> tuple[int, int, int]:
+    """(archivos, bytes, bytes en bloques de 4 KiB)"""
+    n = size = blocks = 0
+    for root, _, files in os.walk(folder):
+        for f in files:
+            s = os.path.getsize(os.path.join(root, f))
+            n += 1
+            size += s
+            blocks += -(-s // BLOCK) * BLOCK
+    return n, size, blocks
+
+
+def write_files(folder: str, docs: dict, pretty: bool) -> float:
+    t0 = time.perf_counter()
+    for fuente, chunks in docs.items():
+        y = str(chunks[0]["anio"])
+        os.makedirs(os.path.join(folder, y), exist_ok=True)
+        base = os.path.join(folder, y, os.path.splitext(fuente)[0])
+        if pretty:  # como pdf_to_json: un JSON con indent=4 por resolución
+            with open(base + ".json", "w", encoding="utf-8") as fw:
+                json.dump(chunks, fw, ensure_ascii=False, indent=4)
+        else:
+            with open(base + ".ndjson", "w", encoding="utf-8") as fw:
+                for ch in chunks:
+                    fw.write(json.dumps(ch, ensure_ascii=False) + "\n")
+    return time.perf_counter() - t0
+
+
+def write_shards(folder: str, docs: dict, codec: str, level: int | None) -> float:
+    t0 = time.perf_counter()
+    with ShardWriter(folder, codec, level) as w:
+        for fuente, chunks in docs.items():
+            w.add(fuente, chunks[0]["id_reso"], chunks[0]["anio"],
+                  [json.dumps(ch, ensure_ascii=False) + "\n" for ch in chunks])
+    return time.perf_counter() - t0
+
+
+def read_all(folder: str, pretty: bool) -> tuple[float, int]:
+    t0 = time.perf_counter()
+    n = 0
+    if pretty:
+        for root, _, files in os.walk(folder):
+            for f in sorted(files):
+                with open(os.path.join(root, f), "r", encoding="utf-8") as fr:
+                    n += len(json.load(fr))
+    else:
+        for _ in iter_ndjson_records(folder):
+            n += 1
+    return time.perf_counter() - t0, n
+
+
+def random_access(folder: str, keys: list[str], shard: bool) -> float:
+    """ms por resolución leída al azar (ya con el índice cargado en el caso del shard)."""
+    if shard:
+        r = ShardReader(folder)
+        t0 = time.perf_counter()
+        for k in keys:
+            r.read(k)
+        dt = time.perf_counter() - t0
+        r.close()
+    else:
+        paths = {}
+        for root, _, files in os.walk(folder):
+            for f in files:
+                paths[os.path.splitext(f)[0] + ".pdf"] = os.path.join(root, f)
+        t0 = time.perf_counter()
+        for k in keys:
+            with open(paths[k], "r", encoding="utf-8") as fr:
+                [json.loads(line) for line in fr if line.strip()]
+        dt = time.perf_counter() - t0
+    return dt / len(keys) * 1000
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("n", nargs="?", type=int, default=5000)
+    ap.add_argument("--input", help="carpeta NDJSON real (salida de process_folder_to_ndjson)")
+    ap.add_argument("--samples", type=int, default=500, help="lecturas de una resolución al azar")
+    args = ap.parse_args()
+
+    docs = docs_from_folder(os.path.expanduser(args.input)) if args.input else synthetic_docs(args.n)
+    n_chunks = sum(len(c) for c in docs.values())
+    keys = random.Random(1).choices(list(docs), k=args.samples)
+    print(f"{len(docs)} resoluciones, {n_chunks} chunks")
+
+    cases = [("ndjson por PDF", "files", None, None), ("json indent=4", "pretty", None, None),
+             ("shard gzip-1", "shard", "gzip", 1), ("shard gzip-6", "shard", "gzip", 6)]
+    if _zstd() is not None:
+        cases += [("shard zstd-3", "shard", "zstd", 3), ("shard zstd-10", "shard", "zstd", 10)]
+    else:
+        print("(zstandard no está instalado: sin casos zstd)")
+
+    print(f"{'formato':<16} {'archivos':>9} {'MB':>8} {'MB disco':>9} {'escribir s':>11} "
+          f"{'leer todo s':>12} {'chunks/s':>10} {'1 reso ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, kind, codec, level in cases:
+            folder = os.path.join(tmp, label.replace(" ", "_"))
+            os.makedirs(folder)
+            if kind == "shard":
+                t_write = write_shards(folder, docs, codec, level)
+            else:
+                t_write = write_files(folder, docs, kind == "pretty")
+            n_files, size, on_disk = disk_usage(folder)
+            t_read, n = read_all(folder, kind == "pretty")
+            assert n == n_chunks, (label, n)
+            ms = "-" if kind == "pretty" else f"{random_access(folder, keys, kind == 'shard'):.3f}"
+            print(f"{label:<16} {n_files:>9} {size / 1e6:>8.2f} {on_disk / 1e6:>9.2f} {t_write:>11.2f} "
+                  f"{t_read:>12.2f} {n / t_read:>10.0f} {ms:>10}")
+        idx = sum(os.path.getsize(os.path.join(r, f)) for r, _, fs in os.walk(tmp) for f in fs
+                  if f.endswith(INDEX_EXT) and "gzip-6" in r)
+        print(f"Índice del shard gzip-6: {idx / 1e3:.0f} KB ({idx / len(docs):.0f} B por resolución)")
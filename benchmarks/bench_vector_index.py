@@ -0,0 +1,65 @@
+# bench_vector_index.py — consultas/s de VectorIndex según tamaño del corpus (float32 vs int8)
+# Uso: python benchmarks/bench_vector_index.py [10000 100000 500000] [--dim 1024]
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from vector_index import VectorIndex
+
+FILTRO_MES = {"rango_fechas": {"fecha_inicio": "2025-03-01", "fecha_fin": "2025-03-31"}}
+FILTRO_ANIO = {"rango_fechas": {"fecha_inicio": "2025-01-01", "fecha_fin": "2025-12-31"}}
+
+
+def synthetic_records(n: int, rng: np.random.Generator) -> list[dict]:
+    anios = rng.integers(2021, 2026, n)
+    meses = rng.integers(1, 13, n)
+    dias = rng.integers(1, 29, n)
+    return [{
+        "id_reso": f"UC-CU-RES-{i % 400:03d}-{anios[i]}",
+        "anio": int(anios[i]),
+        "fecha_iso": f"{anios[i]}-{meses[i]:02d}-{dias[i]:02d}",
+        "seccion": "resuelve" if i % 3 == 0 else "considerando",
+        "tipo": "Extraordinaria" if i % 10 == 0 else "Ordinaria",
+    } for i in range(n)]
+
+
+def qps(index: VectorIndex, queries: np.ndarray, filters: dict | None) -> float:
+    t0 = time.perf_counter()
+    for q in queries:
+        index.search(q, k=8, filters=filters)
+    return len(queries) / (time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("sizes", nargs="*", type=int, default=[10_000, 100_000, 500_000])
+    ap.add_argument("--dim", type=int, default=1024)  # bge-m3
+    ap.add_argument("--queries", type=int, default=50)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(42)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    print(f"{'chunks':>8} {'modo':>7} {'MB':>8} {'qps':>8} {'qps_mes':>8} {'qps_anio':>9} {'recall@8':>9}")
+    for n in args.sizes:
+        vectors = rng.standard_normal((n, args.dim), dtype=np.float32)
+        records = synthetic_records(n, rng)
+        exact = VectorIndex(vectors, records)
+        quant = VectorIndex(vectors, records, quantize=True)
+        del vectors
+
+        # recall de int8 frente a float32 sin filtros
+        hits = 0
+        for q in queries[:10]:
+            a = {id(r) for _, r in exact.search(q, k=8)}
+            b = {id(r) for _, r in quant.search(q, k=8)}
+            hits += len(a & b)
+        recall = hits / (10 * 8)
+
+        for modo, idx in (("float32", exact), ("int8", quant)):
+            print(f"{n:>8} {modo:>7} {idx.nbytes / 1e6:>8.1f} {qps(idx, queries, None):>8.1f} "
+                  f"{qps(idx, queries, FILTRO_MES):>8.1f} {qps(idx, queries, FILTRO_ANIO):>9.1f} "
+                  f"{(1.0 if modo == 'float32' else recall):>9.2f}")
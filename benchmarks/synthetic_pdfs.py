@@ -0,0 +1,174 @@
+# synthetic_pdfs.py — genera resoluciones PDF sintéticas con el formato real del Consejo Universitario
+# Uso: python benchmarks/synthetic_pdfs.py <carpeta_salida> [n_docs] [paginas]
+import os
+import sys
+import random
+import textwrap
+
+import fitz  # PyMuPDF
+
+PAGE_W, PAGE_H = 595, 842  # A4 en puntos
+MARGIN = 56
+FONT_SIZE = 10
+LINE_H = 13
+WRAP = 95
+
+MESES = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio",
+         "agosto", "septiembre", "octubre", "noviembre", "diciembre"]
+
+FRASES = [
+    "mediante memorando UC-FCH-{y}-00{n}-M la Facultad solicita al Consejo Universitario",
+    "el artículo {n} del Estatuto de la Universidad de Cuenca establece que",
+    "la Ley Orgánica de Educación Superior dispone en su artículo {n} que",
+    "el Reglamento de Carrera y Escalafón del Profesor e Investigador prevé",
+    "la Procuraduría emitió informe jurídico favorable respecto del pedido",
+    "el Msc. Pablo Isaías Lazo Pillaga interpuso recurso de impugnación",
+    "el Dr. Fernando González Calle solicita el cambio de dedicación a tiempo completo",
+    "la Comisión Académica recomienda aprobar la reposición del título",
+    "el Vicerrectorado Académico remitió el expediente con la documentación de respaldo",
+    "corresponde al Consejo Universitario conocer y resolver sobre la petición",
+]
+ACCIONES = [
+    "Aprobar la solicitud presentada conforme al informe de la Comisión Académica",
+    "Negar el recurso de impugnación por improcedente",
+    "Disponer a la Dirección de Talento Humano la ejecución de la presente resolución",
+    "Notificar con el contenido de la presente resolución a las partes interesadas",
+    "Aprobar el cambio de dedicación a partir del periodo académico marzo-agosto {y}",
+    "Archivar el expediente por no cumplir los requisitos reglamentarios",
+]
+# variants=True: párrafos ya cortados en líneas que empiezan como boilerplate (fecha, "Vigencia",
+# "Versión") y que HEADER_FOOTER_PATTERNS descarta por error
+VARIANT_PARAS = [
+    ["Que, la Comisión Académica emitió su informe favorable con fecha", "{fecha} según consta en el expediente;"],
+    ["Que, el Reglamento de Régimen Académico regula la", "Vigencia de los nombramientos ocasionales por un año;"],
+    ["Que, el Consejo Universitario aprobó la", "Versión actualizada del instructivo de titulación;"],
+]
+
+
+def header_lines(id_reso: str, acta: str, tipo: str, fecha_iso: str, page: int, total: int,
+                 variants: bool = False) -> list[str]:
+    # mismo boilerplate que HEADER_FOOTER_PATTERNS debe quitar; con variants, además una
+    # línea que los patrones no contemplan
+    return (["UNIVERSIDAD DE CUENCA"] if variants else []) + [
+        "SECRETARÍA GENERAL",
+        "PROCESO DE GESTIÓN DE SECRETARÍA DEL CU",
+        f"RESOLUCIÓN SESIÓN {tipo.upper()}",
+        f"Código: {id_reso}",
+        "Versión: 1",
+        f"Vigencia: {fecha_iso}",
+        f"Acta: {acta}",
+        f"Página: {page} de {total}",
+    ]
+
+
+def footer_lines(fecha_iso: str, page: int = 1, total: int = 1, variants: bool = False) -> list[str]:
+    return [
+        "Elaborado por: Secretaría General",
+        "Aprobado por: Consejo Universitario",
+        f"{fecha_iso} Documento generado electrónicamente",
+    ] + ([f"Av. 12 de Abril y Av. Loja · Telf. 405 1000 · Pág. {page} / {total}"] if variants else [])
+
+
+def body_paragraphs(rng: random.Random, year: int, n_cons: int, n_res: int,
+                    variants: bool = False, fecha_iso: str = "") -> list:
+    """Párrafos como texto (se cortan con textwrap) o como lista de líneas ya cortadas."""
+    paras = []
+    for i in range(n_cons):
+        if variants and i % 7 == 3:
+            paras.append([ln.format(fecha=fecha_iso) for ln in rng.choice(VARIANT_PARAS)])
+            continue
+        frases = [rng.choice(FRASES).format(y=year, n=rng.randint(10, 99)) for _ in range(rng.randint(2, 6))]
+        paras.append("Que, " + "; ".join(frases) + ";")
+    paras.append("RESUELVE:")
+    for i in range(1, n_res + 1):
+        acc = [rng.choice(ACCIONES).format(y=year) for _ in range(rng.randint(1, 3))]
+        paras.append(f"{i}. " + ". ".join(acc) + ".")
+    return paras
+
+
+def make_resolution_pdf(path: str, pages: int = 3, seed: int = 0, numero: int = 22, year: int = 2025,
+                        tipo: str = "Ordinaria", variants: bool = False) -> dict:
+    """
+    Escribe un PDF de `pages` páginas con encabezado/pie por página, CONSIDERANDO
+    con párrafos "Que, ..." y RESUELVE con ítems numerados. Devuelve sus metadatos
+    y, en "body", las líneas de cuerpo de cada página (la referencia para medir limpieza).
+    """
+    rng = random.Random(seed)
+    id_reso = f"UC-CU-RES-{numero:03d}-{year}"
+    acta = str(rng.randint(1, 60))
+    dia, mes = rng.randint(1, 28), rng.randint(1, 12)
+    fecha_iso = f"{year}-{mes:02d}-{dia:02d}"
+    fecha_txt = f"{dia} de {MESES[mes - 1]} de {year}"
+
+    head_h = len(header_lines(id_reso, acta, tipo, fecha_iso, 1, 1, variants)) * LINE_H + LINE_H
+    foot_h = len(footer_lines(fecha_iso, 1, 1, variants)) * LINE_H + LINE_H
+    per_page = (PAGE_H - 2 * MARGIN - head_h - foot_h) // LINE_H
+
+    # ~55% de las líneas en considerandos; párrafos de ~4 líneas
+    n_cons = max(1, int(pages * per_page * 0.55 / 5))
+    n_res = max(1, int(pages * per_page * 0.35 / 3))
+    paras = [p if isinstance(p, list) else textwrap.wrap(p, WRAP) or [""]
+             for p in body_paragraphs(rng, year, n_cons, n_res, variants, fecha_iso)]
+    # la estimación de arriba puede pasarse: se quitan párrafos enteros del final de cada
+    # sección (nunca líneas sueltas, que dejarían el RESUELVE cortado o sin ítems)
+    res_at = paras.index(["RESUELVE:"])
+    capacity = pages * per_page - 6
+    while sum(len(p) + 1 for p in paras) > capacity:
+        if res_at > 1:
+            del paras[res_at - 1]
+            res_at -= 1
+        elif len(paras) - res_at > 2:
+            del paras[-1]
+        else:
+            raise ValueError(f"Un considerando y un ítem no entran en {pages} página(s)")
+    lines = [f"Cuenca, {fecha_txt}", "", "EL CONSEJO UNIVERSITARIO", "", "CONSIDERANDO:", ""]
+    for p in paras:
+        lines.extend(p)
+        lines.append("")
+
+    doc = fitz.open()
+    chunks = [lines[i:i + per_page] for i in range(0, len(lines), per_page)]
+    assert len(chunks) <= pages
+    while len(chunks) < pages:
+        chunks.append([])
+    for pno, body in enumerate(chunks, start=1):
+        page = doc.new_page(width=PAGE_W, height=PAGE_H)
+        y = MARGIN
+        for ln in header_lines(id_reso, acta, tipo, fecha_iso, pno, pages, variants):
+            page.insert_text((MARGIN, y), ln, fontsize=FONT_SIZE - 2)
+            y += LINE_H
+        y += LINE_H
+        for ln in body:
+            page.insert_text((MARGIN, y), ln, fontsize=FONT_SIZE)
+            y += LINE_H
+        y = PAGE_H - MARGIN - foot_h + LINE_H
+        for ln in footer_lines(fecha_iso, pno, pages, variants):
+            page.insert_text((MARGIN, y), ln, fontsize=FONT_SIZE - 2)
+            y += LINE_H
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+    return {"id_reso": id_reso, "acta": acta, "tipo": tipo, "fecha_iso": fecha_iso, "pages": pages,
+            "body": [[ln for ln in body if ln] for body in chunks]}
+
+
+def generate_corpus(folder: str, n_docs: int = 20, pages: int | list[int] = 3, seed: int = 42,
+                    variants: bool = False) -> list[str]:
+    """Genera n_docs PDFs en folder; `pages` puede ser un entero o una lista para variar tamaños."""
+    os.makedirs(folder, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(n_docs):
+        n_pages = pages if isinstance(pages, int) else pages[i % len(pages)]
+        tipo = "Extraordinaria" if i % 5 == 0 else "Ordinaria"
+        path = os.path.join(folder, f"RESOLUCIÓN_UC-CU-RES-{i + 1:03d}-2025.pdf")
+        make_resolution_pdf(path, n_pages, seed=rng.randint(0, 10**9), numero=i + 1, tipo=tipo, variants=variants)
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    out = sys.argv[1]
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    pg = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    generate_corpus(out, n, pg)
+    print(f"{n} PDFs sintéticos de {pg} páginas en {out}")
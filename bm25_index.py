@@ -0,0 +1,389 @@
+# bm25_index.py — índice invertido BM25 persistente sobre el campo "texto" de los NDJSON
+import os
+import re
+import sys
+import json
+import math
+import mmap
+from array import array
+from collections import defaultdict
+
+from text_norm import fold
+from shards import SHARD_EXTS, load_index, parse_lines, decompress, codec_of
+
+K1 = 1.2
+B = 0.75
+
+# Códigos completos como un solo token: UC-CU-RES-022-2025, UC-FCH-2025-0053-M
+ID_TOKEN_RE = re.compile(r"\b[a-z0-9]+(?:-[a-z0-9]+){2,}\b")
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a al algo algunas algunos ante antes como con contra cual cuales cuando de del desde
+donde dos e el ella ellas ellos en entre era eran es esa esas ese eso esos esta estas
+este esto estos fue fueron ha han hasta hay la las le les lo los mas me mi muy nada ni
+no nos o otra otras otro otros para pero por porque que quien quienes se segun ser si
+sin sobre su sus tambien te tiene tienen todo todos tu un una unas uno unos y ya
+""".split())
+
+# archivos del índice; salvo docs.json llevan el número de generación ("vocab.3.json"),
+# así save() escribe los nuevos al lado de los vigentes y docs.json, reemplazado al final,
+# decide qué generación se lee
+VOCAB_FILE = "vocab.json"
+DOCS_FILE = "docs.json"
+IDS_FILE = "postings_ids.u32"
+TFS_FILE = "postings_tf.u16"
+LENS_FILE = "doclens.u32"
+COMPACT_RATIO = 0.2  # save() saca los chunks borrados de disco cuando pasan esta fracción
+
+
+def tokenize(s: str) -> list[str]:
+    """
+    Normaliza (tildes, mayúsculas), conserva los códigos con guiones como un token
+    y descarta stopwords en español.
+    """
+    s = fold(s or "")
+    toks = ID_TOKEN_RE.findall(s)
+    s = ID_TOKEN_RE.sub(" ", s)
+    toks.extend(t for t in WORD_RE.findall(s) if t not in STOPWORDS)
+    return toks
+
+
+def bm25_idf(n_docs: int, df: int) -> float:
+    return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+
+def _gen_path(path: str, name: str, gen: int) -> str:
+    # generación 0: nombres sin número (índices guardados antes de las generaciones)
+    if gen:
+        stem, ext = os.path.splitext(name)
+        name = f"{stem}.{gen}{ext}"
+    return os.path.join(path, name)
+
+
+def _mmap_array(path: str, typecode: str):
+    # memoryview tipado sobre el archivo (vacío si no existe o no tiene datos)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return array(typecode), None
+    f = open(path, "rb")
+    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    f.close()
+    return memoryview(mm).cast(typecode), mm
+
+
+class BM25Index:
+    """
+    Índice BM25 con postings compactos:
+      - postings_ids.u32: ids de chunk (uint32) de todos los términos, concatenados
+      - postings_tf.u16:  frecuencias (uint16) alineadas con los ids
+      - vocab.json:       término -> [inicio, cantidad]
+      - doclens.u32:      longitud en tokens de cada chunk
+      - docs.json:        clave de cada chunk (sha1, id_reso, archivo) y manifiesto de archivos
+    Al cargar se mapean en memoria (mmap); lo nuevo se acumula en arrays en RAM
+    hasta save(), que fusiona y reescribe los archivos.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.vocab = {}            # término persistido -> (inicio, cantidad)
+        self.ids = array("I")
+        self.tfs = array("H")
+        self.lens = array("I")
+        self.docs = []             # [sha1, id_reso, archivo] por chunk
+        self.files = {}            # archivo ndjson -> [tamaño, mtime, primer_id, cantidad]
+        self.deleted = set()       # chunks de archivos reemplazados o que ya no están
+        self.generation = 0        # generación de los archivos en disco
+        self.total_len = 0         # tokens de los chunks vigentes (sin los borrados)
+        self._mmaps = []
+        # pendiente de guardar
+        self.delta = defaultdict(lambda: (array("I"), array("H")))
+
+    # ----- construcción
+    def add(self, texto: str, key: list) -> int:
+        cid = len(self.docs)
+        counts = defaultdict(int)
+        toks = tokenize(texto)
+        for t in toks:
+            counts[t] += 1
+        for t, tf in counts.items():
+            ids, tfs = self.delta[t]
+            ids.append(cid)
+            tfs.append(min(tf, 0xFFFF))
+        self.docs.append(key)
+        self.lens.append(len(toks))
+        self.total_len += len(toks)
+        return cid
+
+    def add_ndjson_file(self, path: str) -> int:
+        """
+        Indexa un .ndjson de process_folder_to_ndjson. Si el archivo ya estaba
+        indexado y no cambió (tamaño + mtime) no hace nada; si cambió, los chunks
+        anteriores quedan marcados como borrados.
+        """
+        st = os.stat(path)
+        sig = [st.st_size, int(st.st_mtime)]
+        prev = self.files.get(path)
+        if prev and prev[:2] == sig:
+            return 0
+        if prev:
+            self._delete(prev[2], prev[3])
+        first = len(self.docs)
+        with open(path, "r", encoding="utf-8") as fr:
+            for line in fr:
+                line = line.strip()
+                if not line:
+                    continue
+                ch = json.loads(line)
+                self.add(ch.get("texto", ""), [ch.get("sha1"), ch.get("id_reso"), os.path.basename(path)])
+        self.files[path] = sig + [first, len(self.docs) - first]
+        return len(self.docs) - first
+
+    def add_shard_file(self, path: str, seen: set | None = None) -> int:
+        """
+        Indexa un shard consolidado (shards.py) resolución por resolución: cada entrada
+        del índice del shard cuenta como un archivo "<shard>#<fuente_pdf>" con firma
+        (offset, length), así al agregar resoluciones solo se indexan las nuevas.
+        Las claves del shard se agregan a seen.
+        """
+        added = 0
+        for fuente, e in load_index(path).items():
+            key = f"{path}#{fuente}"
+            if seen is not None:
+                seen.add(key)
+            sig = [e["offset"], e["length"]]
+            prev = self.files.get(key)
+            if prev and prev[:2] == sig:
+                continue
+            if prev:
+                self._delete(prev[2], prev[3])
+            first = len(self.docs)
+            with open(path, "rb") as fr:
+                fr.seek(e["offset"])
+                records = parse_lines(decompress(fr.read(e["length"]), codec_of(path)))
+            archivo = os.path.splitext(fuente)[0] + ".ndjson"
+            for ch in records:
+                self.add(ch.get("texto", ""), [ch.get("sha1"), ch.get("id_reso"), archivo])
+            self.files[key] = sig + [first, len(self.docs) - first]
+            added += len(self.docs) - first
+        return added
+
+    def _delete(self, first: int, count: int):
+        self.deleted.update(range(first, first + count))
+        self.total_len -= sum(self.lens[first:first + count])
+
+    def remove_missing(self, seen: set) -> int:
+        """Marca como borrados los chunks de los archivos que no están en seen. Devuelve cuántos."""
+        removed = 0
+        for key in [k for k in self.files if k not in seen]:
+            _, _, first, count = self.files.pop(key)
+            self._delete(first, count)
+            removed += count
+        return removed
+
+    def update_from_folder(self, folder: str) -> tuple[int, int]:
+        """
+        Agrega los NDJSON y shards nuevos o modificados y borra los chunks de los archivos
+        (o resoluciones de un shard) que ya no están. Devuelve (agregados, borrados).
+        """
+        added = 0
+        seen = set()
+        for root, _, files in os.walk(folder):
+            for filename in sorted(files):
+                path = os.path.join(root, filename)
+                if filename.lower().endswith(".ndjson"):
+                    seen.add(path)
+                    added += self.add_ndjson_file(path)
+                elif filename.endswith(SHARD_EXTS):
+                    added += self.add_shard_file(path, seen)
+        return added, self.remove_missing(seen)
+
+    # ----- consulta
+    def __len__(self):
+        return len(self.docs) - len(self.deleted)
+
+    def postings(self, term: str):
+        """Devuelve los pares (ids, tfs) persistidos y pendientes del término."""
+        out = []
+        span = self.vocab.get(term)
+        if span:
+            start, count = span
+            out.append((self.ids[start:start + count], self.tfs[start:start + count]))
+        if term in self.delta:
+            out.append(self.delta[term])
+        return out
+
+    def _df(self, plist) -> int:
+        # solo chunks vigentes: los borrados no cuentan para n, avgdl ni idf
+        if not self.deleted:
+            return sum(len(ids) for ids, _ in plist)
+        deleted = self.deleted
+        return sum(1 for ids, _ in plist for cid in ids if cid not in deleted)
+
+    def df(self, term: str) -> int:
+        return self._df(self.postings(term))
+
+    def search(self, query: str, k: int = 10, allowed: set[int] | None = None) -> list[tuple[int, float]]:
+        n = len(self)
+        if not n:
+            return []
+        avgdl = self.total_len / n or 1.0
+        lens = self.lens
+        deleted = self.deleted
+        scores = defaultdict(float)
+        for t in set(tokenize(query)):
+            plist = self.postings(t)
+            df = self._df(plist)
+            if not df:
+                continue
+            idf = bm25_idf(n, df)
+            for ids, tfs in plist:
+                for cid, tf in zip(ids, tfs):
+                    if allowed is not None and cid not in allowed:
+                        continue
+                    if cid in deleted:
+                        continue
+                    norm = K1 * (1 - B + B * lens[cid] / avgdl)
+                    scores[cid] += idf * tf * (K1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:k]
+
+    # ----- persistencia
+    def compact(self):
+        """
+        Quita los chunks borrados: renumera los ids y deja todos los postings en delta
+        (en RAM) para que save() los escriba. Los ids devueltos antes por search() cambian.
+        """
+        remap = [-1] * len(self.docs)
+        new = 0
+        for cid in range(len(self.docs)):
+            if cid not in self.deleted:
+                remap[cid] = new
+                new += 1
+        delta = defaultdict(lambda: (array("I"), array("H")))
+        for t in sorted(set(self.vocab) | set(self.delta)):
+            new_ids, new_tfs = array("I"), array("H")
+            for ids, tfs in self.postings(t):
+                for cid, tf in zip(ids, tfs):
+                    if remap[cid] >= 0:
+                        new_ids.append(remap[cid])
+                        new_tfs.append(tf)
+            if new_ids:
+                delta[t] = (new_ids, new_tfs)
+            ids = tfs = None  # soltar las vistas antes de cerrar el mmap
+        self.close()
+        self.vocab = {}
+        self.delta = delta
+        self.docs = [d for cid, d in enumerate(self.docs) if remap[cid] >= 0]
+        self.lens = array("I", (ln for cid, ln in enumerate(self.lens) if remap[cid] >= 0))
+        for f in self.files.values():
+            # los rangos vigentes de cada archivo nunca están borrados
+            f[2] = remap[f[2]] if f[3] else 0
+        self.deleted = set()
+
+    def save(self, path: str | None = None):
+        """
+        Escribe una generación nueva de archivos y al final reemplaza docs.json, que apunta
+        a ella: si el proceso se corta antes, el índice en disco sigue siendo el anterior.
+        """
+        path = path or self.path
+        os.makedirs(path, exist_ok=True)
+        if len(self.deleted) > COMPACT_RATIO * len(self.docs):
+            self.compact()
+        old_gen = self.generation if path == self.path else None
+        gen = self.generation + 1
+        terms = sorted(set(self.vocab) | set(self.delta))
+        vocab = {}
+        pos = 0
+        with open(_gen_path(path, IDS_FILE, gen), "wb") as fi, open(_gen_path(path, TFS_FILE, gen), "wb") as ft:
+            for t in terms:
+                count = 0
+                plist = self.postings(t)
+                for ids, tfs in plist:
+                    fi.write(ids)
+                    ft.write(tfs)
+                    count += len(ids)
+                vocab[t] = [pos, count]
+                pos += count
+                plist = ids = tfs = None  # soltar las vistas antes de cerrar el mmap
+        with open(_gen_path(path, LENS_FILE, gen), "wb") as fl:
+            self.lens.tofile(fl)
+        with open(_gen_path(path, VOCAB_FILE, gen), "w", encoding="utf-8") as fw:
+            json.dump(vocab, fw, ensure_ascii=False)
+
+        tmp = os.path.join(path, DOCS_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as fw:
+            json.dump({
+                "byteorder": sys.byteorder,
+                "generation": gen,
+                "total_len": self.total_len,
+                "docs": self.docs,
+                "files": self.files,
+                "deleted": sorted(self.deleted),
+            }, fw, ensure_ascii=False)
+        os.replace(tmp, os.path.join(path, DOCS_FILE))
+        self.close()
+        if old_gen is not None:
+            for name in (IDS_FILE, TFS_FILE, LENS_FILE, VOCAB_FILE):
+                try:
+                    os.remove(_gen_path(path, name, old_gen))
+                except FileNotFoundError:
+                    pass
+        self.path = path
+        self._open(path)
+
+    def _open(self, path: str):
+        with open(os.path.join(path, DOCS_FILE), "r", encoding="utf-8") as fr:
+            meta = json.load(fr)
+        if meta["byteorder"] != sys.byteorder:
+            raise ValueError(f"Índice creado con byteorder {meta['byteorder']}, reconstruirlo en esta máquina")
+        gen = self.generation = meta.get("generation", 0)
+        with open(_gen_path(path, VOCAB_FILE, gen), "r", encoding="utf-8") as fr:
+            self.vocab = {t: tuple(v) for t, v in json.load(fr).items()}
+        self.docs = meta["docs"]
+        self.files = meta["files"]
+        self.deleted = set(meta["deleted"])
+        self.ids, m1 = _mmap_array(_gen_path(path, IDS_FILE, gen), "I")
+        self.tfs, m2 = _mmap_array(_gen_path(path, TFS_FILE, gen), "H")
+        lens, m3 = _mmap_array(_gen_path(path, LENS_FILE, gen), "I")
+        # doclens crece con add(): copia en RAM (4 bytes por chunk)
+        self.lens = array("I", lens)
+        if m3:
+            lens.release()
+            m3.close()
+        # índices guardados antes de descontar los borrados de total_len
+        self.total_len = sum(self.lens) - sum(self.lens[cid] for cid in self.deleted)
+        self._mmaps = [(self.ids, m1), (self.tfs, m2)]
+        self.delta = defaultdict(lambda: (array("I"), array("H")))
+
+    def close(self):
+        for view, mm in self._mmaps:
+            if mm is not None:
+                view.release()
+                mm.close()
+        self._mmaps = []
+        self.ids, self.tfs = array("I"), array("H")
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        idx = cls(path)
+        if os.path.exists(os.path.join(path, DOCS_FILE)):
+            idx._open(path)
+        return idx
+
+
+def build_index(ndjson_dir: str, index_dir: str) -> BM25Index:
+    """
+    Carga (o crea) el índice en index_dir, agrega solo los NDJSON nuevos o modificados
+    y borra los que ya no están en ndjson_dir.
+    """
+    idx = BM25Index.load(index_dir)
+    added, removed = idx.update_from_folder(ndjson_dir)
+    if added or removed or not os.path.exists(os.path.join(index_dir, DOCS_FILE)):
+        idx.save(index_dir)
+    print(f"Índice BM25: {len(idx)} chunks ({added} nuevos, {removed} borrados) en {index_dir}")
+    return idx
+
+
+if __name__ == "__main__":
+    ndjson_path = os.path.expanduser("~/Desktop/Proyecto Resoluciones/Resoluciones_NDJSON")
+    index_path = os.path.expanduser("~/Desktop/Proyecto Resoluciones/Indice_BM25")
+    build_index(ndjson_path, index_path)
@@ -0,0 +1,180 @@
+# catalog.py — catálogo SQLite de resoluciones (una fila por PDF) para consultas de metadatos
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from chunk_store import iter_ndjson_records
+from reso_ids import IdIndex, canonical_id
+
+CATALOG_FILE = "catalogo.sqlite"
+COLUMNS = ["fuente_pdf", "id_reso", "id_norm", "acta", "tipo", "anio", "fecha_iso", "fecha",
+           "paginas", "chunks", "considerandos", "resuelve", "actualizado"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resoluciones (
+    fuente_pdf    TEXT PRIMARY KEY, -- un escaneo duplicado o un anexo con el mismo id_reso es otra fila
+    id_reso       TEXT,
+    id_norm       TEXT NOT NULL,   -- canonical_id(id_reso): "UC-CU-RES-022-2025"
+    acta          TEXT,
+    tipo          TEXT,            -- Ordinaria / Extraordinaria
+    anio          INTEGER,
+    fecha_iso     TEXT,            -- YYYY-MM-DD, se compara como texto
+    fecha         TEXT,
+    paginas       INTEGER,
+    chunks        INTEGER,
+    considerandos INTEGER,
+    resuelve      INTEGER,
+    actualizado   TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_resoluciones_fecha ON resoluciones(fecha_iso);
+CREATE INDEX IF NOT EXISTS ix_resoluciones_acta ON resoluciones(acta);
+CREATE INDEX IF NOT EXISTS ix_resoluciones_tipo ON resoluciones(tipo COLLATE NOCASE, fecha_iso);
+CREATE INDEX IF NOT EXISTS ix_resoluciones_id ON resoluciones(id_norm);
+CREATE INDEX IF NOT EXISTS ix_resoluciones_id_reso ON resoluciones(id_reso);
+"""
+
+UPSERT_SQL = (
+    f"INSERT INTO resoluciones ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))}) "
+    "ON CONFLICT(fuente_pdf) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in COLUMNS[1:])
+)
+
+
+class Catalog:
+    """
+    Metadatos de encabezado de cada PDF de resolución (fuente_pdf, id_reso, acta, tipo,
+    fecha) más páginas y chunks. Las columnas corresponden a los campos de /query-filters:
+      rango_fechas -> fecha_iso
+      id_resol     -> id_norm (canonical_id; variantes y errores de OCR con IdIndex)
+      tipo_session -> tipo
+    Una conexión compartida entre hilos (servicio FastAPI) protegida con un lock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.Lock()
+        self._ids = None  # IdIndex de id_norm, se arma en la primera consulta por id
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM resoluciones").fetchone()[0]
+
+    def upsert_many(self, rows):
+        now = datetime.now().isoformat(timespec="seconds")
+        values = []
+        for r in rows:
+            r = dict(r, id_norm=canonical_id(r.get("id_reso")) or "", actualizado=now)
+            r["fuente_pdf"] = r.get("fuente_pdf") or r.get("id_reso")
+            values.append(tuple(r.get(c) for c in COLUMNS))
+        with self._lock, self.conn:
+            self.conn.executemany(UPSERT_SQL, values)
+            self._ids = None
+        return len(values)
+
+    def upsert(self, row: dict):
+        self.upsert_many([row])
+
+    def resolve_ids(self, id_resol: str) -> list[str]:
+        """id_norm del catálogo que corresponden a un id_resol (exacto en O(1), si no aproximado)."""
+        with self._lock:
+            if self._ids is None:
+                self._ids = IdIndex()
+                for (id_norm,) in self.conn.execute("SELECT DISTINCT id_norm FROM resoluciones"):
+                    self._ids.add(id_norm, id_norm)
+            return self._ids.resolve(id_resol)
+
+    def where(self, filters: dict | None) -> tuple[str, list]:
+        """Traduce la salida de /query-filters (y "acta"/"anio" directos) a un WHERE."""
+        clauses, args = [], []
+        filters = filters or {}
+        if filters.get("id_resol"):
+            keys = self.resolve_ids(filters["id_resol"]) or [canonical_id(filters["id_resol"])]
+            clauses.append(f"id_norm IN ({', '.join('?' * len(keys))})")
+            args.extend(keys)
+        if filters.get("tipo_session"):
+            clauses.append("tipo = ? COLLATE NOCASE")
+            args.append(str(filters["tipo_session"]).strip())
+        if filters.get("acta"):
+            clauses.append("acta = ?")
+            args.append(str(filters["acta"]).strip())
+        anio = str(filters.get("anio") or "").strip()
+        if anio.isdigit():  # "2025 " sirve; "dos mil" se ignora como cualquier filtro no reconocido
+            clauses.append("anio = ?")
+            args.append(int(anio))
+        rango = filters.get("rango_fechas")
+        if isinstance(rango, dict):
+            # a diferencia de la búsqueda de chunks, un listado por fechas omite las resoluciones sin fecha
+            if rango.get("fecha_inicio"):
+                clauses.append("fecha_iso >= ?")
+                args.append(rango["fecha_inicio"])
+            if rango.get("fecha_fin"):
+                clauses.append("fecha_iso <= ?")
+                args.append(rango["fecha_fin"])
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def query(self, filters: dict | None = None, limit: int | None = None) -> list[dict]:
+        where, args = self.where(filters)
+        sql = f"SELECT * FROM resoluciones{where} ORDER BY fecha_iso, id_reso, fuente_pdf"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            return [dict(r) for r in self.conn.execute(sql, args)]
+
+    def count(self, filters: dict | None = None) -> int:
+        where, args = self.where(filters)
+        with self._lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM resoluciones{where}", args).fetchone()[0]
+
+    def get(self, id_reso: str) -> dict | None:
+        rows = self.query({"id_resol": id_reso}, limit=1)
+        return rows[0] if rows else None
+
+
+def rows_from_ndjson(folder: str):
+    """
+    Una fila por fuente_pdf a partir de NDJSON ya generados (para poblar el catálogo sin
+    volver a extraer los PDF). Sin el PDF, "paginas" es la última página citada.
+    """
+    docs = {}
+    for ch in iter_ndjson_records(folder):
+        key = ch.get("fuente_pdf") or ch.get("id_reso")
+        if not key:
+            continue
+        d = docs.get(key)
+        if d is None:
+            d = docs[key] = {k: ch.get(k) for k in ("id_reso", "acta", "tipo", "anio", "fecha_iso", "fecha")}
+            d["fuente_pdf"] = key
+            d.update(paginas=0, chunks=0, _parrafos={"considerando": set(), "resuelve": set()})
+        d["chunks"] += 1
+        d["paginas"] = max(d["paginas"], ch.get("pagina_fin") or 0)
+        if ch.get("seccion") in d["_parrafos"]:
+            d["_parrafos"][ch["seccion"]].add(ch.get("parrafo_index"))
+    for d in docs.values():
+        parrafos = d.pop("_parrafos")
+        d["considerandos"] = len(parrafos["considerando"])
+        d["resuelve"] = len(parrafos["resuelve"])
+        d["paginas"] = d["paginas"] or None
+        yield d
+
+
+def build_from_ndjson(ndjson_dir: str, catalog_path: str) -> Catalog:
+    cat = Catalog(catalog_path)
+    n = cat.upsert_many(rows_from_ndjson(ndjson_dir))
+    print(f"Catálogo {catalog_path}: {n} resoluciones actualizadas, {len(cat)} en total")
+    return cat
+
+
+if __name__ == "__main__":
+    ndjson_path = os.path.expanduser("~/Desktop/Proyecto Resoluciones/Resoluciones_NDJSON")
+    catalog_path = os.path.expanduser(f"~/Desktop/Proyecto Resoluciones/{CATALOG_FILE}")
+    build_from_ndjson(ndjson_path, catalog_path)
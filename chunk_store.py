@@ -0,0 +1,184 @@
+# chunk_store.py — almacén compacto en memoria de los chunks NDJSON
+import json
+import os
+from array import array
+
+from shards import SHARD_EXTS, iter_shard_file
+
+SECCIONES = ["considerando", "resuelve"]
+DOC_FIELDS = ["id_reso", "acta", "tipo", "anio", "fecha_iso", "fecha", "fuente_pdf"]
+SIN_PAGINA = 0  # las páginas son 1-index; 0 = None
+
+
+def iter_ndjson_records(folder: str):
+    """
+    Recorre recursivamente la carpeta de salida de process_folder_to_ndjson
+    (una subcarpeta por año) y devuelve cada línea como dict. Lee tanto los
+    .ndjson por PDF como los shards consolidados por año (.ndjson.gz / .ndjson.zst).
+    """
+    for root, _, files in os.walk(folder):
+        for filename in sorted(files):
+            if filename.endswith(SHARD_EXTS):
+                yield from iter_shard_file(os.path.join(root, filename))
+                continue
+            if not filename.lower().endswith(".ndjson"):
+                continue
+            with open(os.path.join(root, filename), "r", encoding="utf-8") as fr:
+                for line in fr:
+                    line = line.strip()
+                    if line:
+                        yield json.loads(line)
+
+
+class ChunkView:
+    """
+    Vista de solo lectura de un chunk. Se comporta como el dict del NDJSON
+    (get, [], in, iter, keys, to_dict) pero no guarda nada propio salvo el índice.
+    """
+    __slots__ = ("_store", "_i")
+
+    def __init__(self, store: "ChunkStore", i: int):
+        self._store = store
+        self._i = i
+
+    @property
+    def doc(self) -> tuple:
+        return self._store.docs[self._store.doc_idx[self._i]]
+
+    @property
+    def texto(self) -> str:
+        s = self._store
+        return s.text[s.text_off[self._i]:s.text_off[self._i + 1]].decode("utf-8")
+
+    @property
+    def seccion(self) -> str | None:
+        code = self._store.seccion[self._i]
+        return SECCIONES[code] if code >= 0 else None
+
+    @property
+    def sha1(self) -> str:
+        return self._store.sha1[self._i * 20:(self._i + 1) * 20].hex()
+
+    def get(self, key: str, default=None):
+        s, i = self._store, self._i
+        if key in s.doc_pos:
+            v = self.doc[s.doc_pos[key]]
+        elif key == "texto":
+            v = self.texto
+        elif key == "seccion":
+            v = self.seccion
+        elif key == "parrafo_index":
+            v = s.parrafo_index[i]
+        elif key == "pagina_inicio":
+            v = s.pagina_inicio[i] or None
+        elif key == "pagina_fin":
+            v = s.pagina_fin[i] or None
+        elif key == "sha1":
+            v = self.sha1
+        else:
+            return default
+        return default if v is None else v
+
+    def __getitem__(self, key: str):
+        if key not in self._store.keys:
+            raise KeyError(key)
+        return self.get(key)
+
+    def __contains__(self, key) -> bool:
+        # como en el dict: la clave existe aunque su valor sea None
+        return key in self._store.keys
+
+    def __iter__(self):
+        return iter(self._store.keys)
+
+    def __len__(self):
+        return len(self._store.keys)
+
+    def keys(self):
+        return self._store.keys
+
+    def to_dict(self) -> dict:
+        return {k: self.get(k) for k in self._store.keys}
+
+    def __repr__(self):
+        return f"ChunkView({self.get('id_reso')!r}, {self.seccion!r}, {self.get('parrafo_index')})"
+
+
+class ChunkStore:
+    """
+    Chunks en columnas:
+      - docs: una tupla por documento con los campos repetidos (id_reso, fecha, fuente_pdf, ...)
+      - arrays tipados por chunk: doc_idx, seccion, parrafo_index, pagina_inicio/fin
+      - text: un único buffer UTF-8 con todos los textos; text_off[i]..text_off[i+1] es el chunk i
+      - sha1: 20 bytes por chunk
+    Un chunk cuesta ~40 bytes de metadatos + su texto, en lugar de un dict con 13 claves.
+    """
+
+    keys = ["id_reso", "acta", "tipo", "anio", "fecha_iso", "fecha", "seccion",
+            "parrafo_index", "pagina_inicio", "pagina_fin", "texto", "fuente_pdf", "sha1"]
+    doc_pos = {k: i for i, k in enumerate(DOC_FIELDS)}
+
+    def __init__(self):
+        self.docs: list[tuple] = []
+        self._doc_ids: dict[tuple, int] = {}
+        self.doc_idx = array("I")
+        self.seccion = array("b")
+        self.parrafo_index = array("H")
+        self.pagina_inicio = array("H")
+        self.pagina_fin = array("H")
+        self.text = bytearray()
+        self.text_off = array("Q", [0])
+        self.sha1 = bytearray()
+
+    def append(self, ch: dict):
+        doc = tuple(ch.get(k) for k in DOC_FIELDS)
+        di = self._doc_ids.get(doc)
+        if di is None:
+            di = self._doc_ids[doc] = len(self.docs)
+            self.docs.append(doc)
+        self.doc_idx.append(di)
+        sec = ch.get("seccion")
+        self.seccion.append(SECCIONES.index(sec) if sec in SECCIONES else -1)
+        self.parrafo_index.append(ch.get("parrafo_index") or 0)
+        self.pagina_inicio.append(ch.get("pagina_inicio") or SIN_PAGINA)
+        self.pagina_fin.append(ch.get("pagina_fin") or SIN_PAGINA)
+        self.text += (ch.get("texto") or "").encode("utf-8")
+        self.text_off.append(len(self.text))
+        self.sha1 += bytes.fromhex(ch["sha1"]) if ch.get("sha1") else bytes(20)
+
+    @classmethod
+    def from_records(cls, records) -> "ChunkStore":
+        store = cls()
+        for ch in records:
+            store.append(ch)
+        return store
+
+    @classmethod
+    def from_folder(cls, folder: str) -> "ChunkStore":
+        return cls.from_records(iter_ndjson_records(folder))
+
+    def __len__(self):
+        return len(self.doc_idx)
+
+    def __getitem__(self, i: int) -> ChunkView:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return ChunkView(self, i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield ChunkView(self, i)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes de los arrays y buffers (sin contar las tuplas de documentos)."""
+        arrays = (self.doc_idx, self.seccion, self.parrafo_index, self.pagina_inicio,
+                  self.pagina_fin, self.text_off)
+        return sum(a.itemsize * len(a) for a in arrays) + len(self.text) + len(self.sha1)
+
+    def to_ndjson(self, path: str):
+        with open(path, "w", encoding="utf-8") as fw:
+            for ch in self:
+                fw.write(json.dumps(ch.to_dict(), ensure_ascii=False) + "\n")
@@ -0,0 +1,213 @@
+# embeddings.py — etapa de embeddings por lotes con caché por contenido (sha1 + modelo)
+import os
+import re
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from chunk_store import iter_ndjson_records
+
+EMBED_URL = os.getenv("EMBED_URL", "http://127.0.0.1:1234/v1/embeddings")
+EMBED_MODEL = os.getenv("EMBED_MODEL", "littlejohn-ai/bge-m3-spa-law-qa")
+BATCH_SIZE = 32
+CONCURRENCY = 4
+MAX_RETRIES = 3
+REQUEST_TIMEOUT = (10, 120)  # connect, read
+
+KEYS_FILE = "keys.txt"
+META_FILE = "meta.json"
+
+
+def model_slug(model: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._\-]", "_", model)
+
+
+class EmbeddingStore:
+    """
+    Caché de vectores direccionada por contenido. Hay una carpeta por modelo con:
+      - keys.txt:           sha1 del chunk, una por línea (línea i = fila i)
+      - vectors.f32 / .f16: matriz float contigua (filas x dim), se lee con np.memmap
+      - meta.json:          modelo, dim y dtype
+    Solo se agregan filas; un chunk cuyo texto cambia tiene otro sha1 y se embebe de nuevo.
+    """
+
+    def __init__(self, root: str, model: str = EMBED_MODEL, dtype: str = "float32"):
+        self.model = model
+        self.dir = os.path.join(root, model_slug(model))
+        os.makedirs(self.dir, exist_ok=True)
+        self.dtype = np.dtype(dtype)
+        self.dim = None
+        self.keys = {}   # sha1 -> fila
+        self._lines = []
+        self._lock = threading.Lock()
+
+        meta_path = os.path.join(self.dir, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as fr:
+                meta = json.load(fr)
+            self.dim = meta["dim"]
+            self.dtype = np.dtype(meta["dtype"])
+        self.rows = 0    # filas escritas (= líneas de keys.txt)
+        keys_path = os.path.join(self.dir, KEYS_FILE)
+        if os.path.exists(keys_path):
+            with open(keys_path, "r", encoding="utf-8") as fr:
+                lines = fr.read().split("\n")
+            # la última línea sin "\n" quedó cortada por una escritura interrumpida
+            self._load_keys(lines[:-1])
+            if lines[-1]:
+                self._rewrite_keys()
+        self._repair()
+
+    def _load_keys(self, lines: list[str]):
+        self.keys = {}
+        for i, line in enumerate(lines):
+            self.keys[line.strip()] = i
+        self.rows = len(lines)
+        self._lines = lines
+
+    def _rewrite_keys(self):
+        keys_path = os.path.join(self.dir, KEYS_FILE)
+        with open(keys_path + ".tmp", "w", encoding="utf-8") as fw:
+            fw.writelines(k + "\n" for k in self._lines)
+        os.replace(keys_path + ".tmp", keys_path)
+
+    def _repair(self):
+        """
+        Deja vectors.* y keys.txt con la misma cantidad de filas. Si el proceso se cortó
+        entre las dos escrituras de append() sobran filas de vectores sin clave (se truncan;
+        si no, la siguiente clave apuntaría a la fila de otro chunk) o, si se perdió parte
+        de los vectores, sobran claves al final (se descartan y se vuelven a embeber).
+        """
+        if self.dim is None or not os.path.exists(self.vectors_path):
+            if self.rows:
+                self._load_keys([])
+                self._rewrite_keys()
+            return
+        row_bytes = self.dim * self.dtype.itemsize
+        size = os.path.getsize(self.vectors_path)
+        rows = size // row_bytes
+        if rows > self.rows or size % row_bytes:
+            rows = min(rows, self.rows)
+            with open(self.vectors_path, "r+b") as fv:
+                fv.truncate(rows * row_bytes)
+            print(f"{self.vectors_path}: truncado a {rows} filas (escritura interrumpida)")
+        if rows < self.rows:
+            print(f"{KEYS_FILE}: {self.rows - rows} claves sin vector descartadas (escritura interrumpida)")
+            self._load_keys(self._lines[:rows])
+            self._rewrite_keys()
+
+    @property
+    def vectors_path(self) -> str:
+        ext = "f16" if self.dtype == np.float16 else "f32"
+        return os.path.join(self.dir, f"vectors.{ext}")
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key: str):
+        return key in self.keys
+
+    def append(self, keys: list[str], vectors: np.ndarray):
+        vectors = np.ascontiguousarray(vectors, dtype=self.dtype)
+        if vectors.ndim != 2 or len(keys) != vectors.shape[0]:
+            raise ValueError(f"{len(keys)} claves para {vectors.shape[0] if vectors.ndim else 0} vectores")
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                with open(os.path.join(self.dir, META_FILE), "w", encoding="utf-8") as fw:
+                    json.dump({"model": self.model, "dim": self.dim, "dtype": self.dtype.name}, fw)
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"Dimensión {vectors.shape[1]} distinta a la del almacén ({self.dim})")
+            # vectores primero y claves después; si el proceso se corta entre las dos
+            # escrituras, _repair() iguala las filas al volver a abrir el almacén
+            with open(self.vectors_path, "ab") as fv:
+                fv.write(vectors.tobytes())
+            with open(os.path.join(self.dir, KEYS_FILE), "a", encoding="utf-8") as fk:
+                for k in keys:
+                    self.keys[k] = self.rows
+                    self.rows += 1
+                    self._lines.append(k)
+                    fk.write(k + "\n")
+
+    def matrix(self) -> np.ndarray:
+        """Matriz (n, dim) mapeada en memoria, de solo lectura."""
+        if not self.rows:
+            return np.zeros((0, self.dim or 0), dtype=self.dtype)
+        return np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(self.rows, self.dim))
+
+    def get(self, sha1_list: list[str]) -> np.ndarray:
+        m = self.matrix()
+        return m[[self.keys[k] for k in sha1_list]]
+
+
+def embed_batch(texts: list[str], model: str = EMBED_MODEL, url: str = EMBED_URL,
+                session: requests.Session | None = None) -> np.ndarray:
+    """Llama al endpoint /v1/embeddings (compatible OpenAI) con reintentos."""
+    http = session or requests
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            r = http.post(url, json={"model": model, "input": texts}, timeout=REQUEST_TIMEOUT)
+            r.raise_for_status()
+            data = sorted(r.json()["data"], key=lambda d: d["index"])
+            if len(data) != len(texts):
+                raise ValueError(f"El servidor devolvió {len(data)} embeddings para {len(texts)} textos")
+            return np.asarray([d["embedding"] for d in data], dtype=np.float32)
+        except Exception as e:
+            if attempt == MAX_RETRIES:
+                raise
+            print(f"Reintento {attempt} de lote ({len(texts)} textos): {e}")
+            time.sleep(2 ** attempt)
+
+
+def embed_records(records, store: EmbeddingStore, batch_size: int = BATCH_SIZE,
+                  concurrency: int = CONCURRENCY, url: str = EMBED_URL) -> int:
+    """
+    Embebe solo los chunks cuyo sha1 no está en el almacén. Devuelve cuántos se agregaron.
+    """
+    pending = {}
+    for ch in records:
+        key = ch.get("sha1")
+        if key and key not in store and key not in pending:
+            pending[key] = ch.get("texto", "")
+    if not pending:
+        return 0
+
+    items = list(pending.items())
+    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+    local = threading.local()  # requests.Session no es thread-safe: una por hilo
+    done = 0
+
+    def run(batch):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        vecs = embed_batch([t for _, t in batch], store.model, url, session)
+        store.append([k for k, _ in batch], vecs)
+        return len(batch)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        for n in ex.map(run, batches):
+            done += n
+            print(f"Embebidos {done}/{len(items)}", end="\r")
+    elapsed = time.perf_counter() - t0
+    print(f"\nEmbebidos {done} chunks en {elapsed:.1f}s ({done / elapsed:.1f} chunks/s)")
+    return done
+
+
+def embed_folder(ndjson_dir: str, store_dir: str, model: str = EMBED_MODEL, dtype: str = "float32", **kw) -> EmbeddingStore:
+    store = EmbeddingStore(store_dir, model, dtype)
+    before = len(store)
+    embed_records(iter_ndjson_records(ndjson_dir), store, **kw)
+    print(f"Almacén {store.dir}: {len(store)} vectores ({len(store) - before} nuevos)")
+    return store
+
+
+if __name__ == "__main__":
+    ndjson_path = os.path.expanduser("~/Desktop/Proyecto Resoluciones/Resoluciones_NDJSON")
+    store_path = os.path.expanduser("~/Desktop/Proyecto Resoluciones/Embeddings")
+    embed_folder(ndjson_path, store_path)
@@ -0,0 +1,163 @@
+# layout_clean.py — quitar encabezado/pie por geometría (bloques de PyMuPDF) y boilerplate aprendido
+import os
+import json
+from collections import Counter
+
+import fitz  # PyMuPDF
+
+TOP_BAND = 0.07      # fracción de la altura de página que se descarta arriba
+BOTTOM_BAND = 0.07   # y abajo
+MIN_DOCS = 3         # boilerplate: repetido en casi todas las páginas de al menos N documentos
+MAX_BAND = 0.3       # las franjas aprendidas no pasan del 30% superior / inferior
+BAND_MARGIN = 0.002  # holgura de la franja aprendida (~2 pt en A4)
+Y_SLOTS = 100        # resolución de "misma altura" al aprender (1% de la página)
+LEARN_SAMPLE = 40    # PDFs usados para aprender el boilerplate
+MODEL_FILE = "boilerplate.json"
+
+# sin tildes y sin dígitos, en una sola pasada de str.translate
+KEY_TABLE = str.maketrans("áéíóúüñ", "aeiouun", "0123456789")
+
+
+def line_key(line: str) -> str:
+    """
+    Forma normalizada de una línea para comparar boilerplate: minúsculas, sin tildes,
+    sin números y con espacios simples. "Página: 3 de 12" y "Página: 1 de 4" comparten clave.
+    """
+    return " ".join(line.casefold().translate(KEY_TABLE).split())
+
+
+def page_blocks(page) -> tuple[float, list[tuple]]:
+    """(alto de página, bloques de texto (y0, y1, texto)) en el orden de get_text("text")."""
+    blocks = [(b[1], b[3], b[4]) for b in page.get_text("blocks") if b[6] == 0]
+    return page.rect.height, blocks
+
+
+def extract_page_blocks(pdf_path: str, doc: fitz.Document | None = None) -> list[tuple[int, float, list[tuple]]]:
+    # con doc, usa el documento ya abierto (y no lo cierra)
+    own = doc is None
+    if own:
+        doc = fitz.open(pdf_path)
+    pages = []
+    for i, page in enumerate(doc):
+        h, blocks = page_blocks(page)
+        pages.append((i + 1, h, blocks))  # 1-index
+    if own:
+        doc.close()
+    return pages
+
+
+def blocks_text(blocks: list[tuple]) -> str:
+    # mismo texto que page.get_text("text"): sirve para leer el encabezado (código, acta, fecha)
+    return "".join(b[2] for b in blocks)
+
+
+def block_lines(y0: float, y1: float, text: str):
+    """Líneas del bloque con su franja vertical aproximada (alto repartido en partes iguales)."""
+    lines = text.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    n = len(lines) or 1
+    step = (y1 - y0) / n
+    for i, ln in enumerate(lines):
+        yield y0 + i * step, y0 + (i + 1) * step, ln
+
+
+class LayoutCleaner:
+    """
+    Limpieza de página sin HEADER_FOOTER_PATTERNS:
+      - se descarta lo que cae entero en la franja superior (top) o inferior (bottom) de la página
+      - del resto, cada línea cuya clave (line_key) está en el conjunto de boilerplate se descarta:
+        una búsqueda en un set por línea en lugar de probar 11 regex
+    El conjunto se aprende del propio corpus con learn(): líneas que se repiten en la
+    mayoría de las páginas de un documento, en al menos MIN_DOCS documentos.
+    """
+
+    def __init__(self, boilerplate=(), top: float = TOP_BAND, bottom: float = BOTTOM_BAND):
+        self.boilerplate = set(boilerplate)
+        self.top = top
+        self.bottom = bottom
+
+    @classmethod
+    def learn(cls, pdf_paths, min_docs: int = MIN_DOCS, **kw) -> "LayoutCleaner":
+        """
+        Boilerplate = líneas que en un mismo documento aparecen a la misma altura en al
+        menos la mitad de las páginas, en min_docs documentos o más. La posición fija
+        evita aprender párrafos de cuerpo que se repiten. Las franjas top/bottom se
+        amplían hasta cubrir el boilerplate aprendido (así caen también las variantes
+        de esas líneas que no se vieron al aprender).
+        """
+        docs = Counter()   # clave -> documentos donde se repite
+        spans = {}         # clave -> [(y0, y1)] relativos a la altura de página
+        n_docs = 0
+        for path in pdf_paths:
+            pages = extract_page_blocks(path)
+            if len(pages) < 2:
+                continue  # en una sola página todo "se repite"
+            n_docs += 1
+            per_page = Counter()
+            pos = {}
+            for _, h, blocks in pages:
+                seen = set()
+                for y0, y1, text in blocks:
+                    for l0, l1, ln in block_lines(y0, y1, text):
+                        k = line_key(ln)
+                        slot = (k, round((l0 + l1) / 2 / h * Y_SLOTS))
+                        if k and slot not in seen:
+                            seen.add(slot)
+                            pos.setdefault(slot, (l0 / h, l1 / h))
+                per_page.update(seen)
+            need = max(2, (len(pages) + 1) // 2)
+            repeated = {slot for slot, c in per_page.items() if c >= need}
+            docs.update({k for k, _ in repeated})
+            for slot in repeated:
+                spans.setdefault(slot[0], []).append(pos[slot])
+        min_docs = max(1, min(min_docs, n_docs))
+        boiler = {k for k, c in docs.items() if c >= min_docs}
+
+        top, bottom = kw.pop("top", TOP_BAND), kw.pop("bottom", BOTTOM_BAND)
+        for k in boiler:
+            ys = sorted(spans[k])
+            y0, y1 = ys[len(ys) // 2]  # mediana
+            if y1 <= MAX_BAND:
+                top = max(top, y1 + BAND_MARGIN)
+            elif y0 >= 1 - MAX_BAND:
+                bottom = max(bottom, 1 - y0 + BAND_MARGIN)
+        return cls(boiler, round(top, 4), round(bottom, 4), **kw)
+
+    @classmethod
+    def learn_folder(cls, folder: str, sample: int = LEARN_SAMPLE, **kw) -> "LayoutCleaner":
+        pdfs = sorted(f for f in os.listdir(folder) if f.lower().endswith(".pdf"))
+        step = max(1, len(pdfs) // sample) if sample else 1
+        return cls.learn((os.path.join(folder, f) for f in pdfs[::step][:sample or None]), **kw)
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as fw:
+            json.dump({"top": self.top, "bottom": self.bottom,
+                       "boilerplate": sorted(self.boilerplate)}, fw, ensure_ascii=False, indent=1)
+
+    @classmethod
+    def load(cls, path: str) -> "LayoutCleaner":
+        with open(path, "r", encoding="utf-8") as fr:
+            d = json.load(fr)
+        return cls(d["boilerplate"], d["top"], d["bottom"])
+
+    def clean_blocks(self, height: float, blocks: list[tuple]) -> str:
+        """Texto de la página sin franjas ni boilerplate (sin normalizar espacios)."""
+        y_top = height * self.top
+        y_bottom = height * (1 - self.bottom)
+        boiler = self.boilerplate
+        out = []
+        for y0, y1, text in blocks:
+            if y1 <= y_top or y0 >= y_bottom:
+                continue
+            if y0 >= y_top and y1 <= y_bottom:
+                lines = text.split("\n")
+                if lines[-1] == "":
+                    lines.pop()
+            else:
+                # el bloque cruza el borde de una franja: se decide por línea
+                lines = [ln for l0, l1, ln in block_lines(y0, y1, text) if l1 > y_top and l0 < y_bottom]
+            if boiler:
+                lines = [ln for ln in lines if line_key(ln) not in boiler]
+            out.extend(lines)
+        return "\n".join(out)
@@ -5,6 +5,8 @@ import os
 import traceback
 from datetime import datetime
 
+from shards import ShardWriter
+
 
 def extract_text_from_pdf(pdf_path):
     try:
@@ -148,6 +150,8 @@ def process_resolution(pdf_path,filename):
 # ----- Procesar PDF y guardar JSON
 input_path = os.path.expanduser("~/Desktop/Proyecto Resoluciones/Resoluciones/2024")
 output_path = os.path.expanduser("~/Desktop/Proyecto Resoluciones/Resoluciones_JSON/2024")
+# None: un .json por resolución; "gzip" / "zstd": un shard comprimido por año con índice (shards.py)
+CONSOLIDATE = None
 
 os.makedirs(output_path, exist_ok=True) #Crear carpetas si no existen
 
@@ -157,6 +161,7 @@ with open(log_path, "w", encoding="utf-8") as log_file:
     log_file.write("Log de errores al procesar resoluciones\n")
     log_file.write("=====================================\n\n")
 
+shards = ShardWriter(output_path, CONSOLIDATE) if CONSOLIDATE else None
 
 for filename in os.listdir(input_path):
     if filename.lower().endswith(".pdf"):
@@ -169,6 +174,13 @@ for filename in os.listdir(input_path):
                 with open(log_path, "a", encoding="utf-8") as log_file:
                     log_file.write(f"No se pudo procesar {filename} (sin texto o corrupto)\n\n")
                 continue  # saltar a siguiente archivo
+            if shards is not None:
+                # una línea JSON por resolución en el shard de su año
+                anio = (resolution_json["fecha"] or "")[:4]
+                shards.add(filename, resolution_json["id_reso"], anio if anio.isdigit() else None,
+                           [json.dumps(resolution_json, ensure_ascii=False) + "\n"])
+                print(f"Procesado y agregado al shard: {filename}")
+                continue
             # Archivo JSON
             base_name = os.path.splitext(filename)[0]
             json_filename = f"{base_name}.json"
@@ -184,6 +196,5 @@ for filename in os.listdir(input_path):
                 log_file.write(error_msg)
                 log_file.write(traceback.format_exc() + "\n")
 
-
-
-
+if shards is not None:
+    shards.close()
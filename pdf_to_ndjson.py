@@ -4,10 +4,22 @@ import re
 import json
 import os
 import traceback
+import bisect
 import hashlib
 from datetime import datetime
+from typing import NamedTuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from pipeline_stats import DocStats, RunStats, profile_call
+from layout_clean import LayoutCleaner, MODEL_FILE, extract_page_blocks, blocks_text, page_blocks
+from catalog import Catalog
+from shards import ShardWriter
 
 CHUNK_CHAR_LIMIT = 1000  # ~700–1000 recomendado
+SPLIT_MIN_PAGES = 120    # desde este tamaño, extracción + limpieza en paralelo por rangos de páginas (0 = nunca)
+PAGE_RANGE = 32          # páginas por tarea
+PAGE_WORKERS = min(8, os.cpu_count() or 1)
 
 HEADER_FOOTER_PATTERNS = [
     r"SECRETAR[ÍI]A GENERAL.*",
@@ -29,7 +41,18 @@ ID_RESO_RE = re.compile(r"C[oó]digo:\s*([A-Z0-9\-]+)", re.IGNORECASE)
 ACTA_RE = re.compile(r"Acta:\s*(\d+)", re.IGNORECASE)
 TIPO_RE = re.compile(r"RESOLUCI[ÓO]N\s+SESI[ÓO]N\s+([A-ZÁÉÍÓÚÑ ]+)", re.IGNORECASE)
 FECHA_TXT_RE = re.compile(r"(\d{1,2}\s+de\s+[a-záéíóú]+?\s+de\s+\d{4})", re.IGNORECASE)
-ENUM_ITEM_RE = re.compile(r"^\s*\d+\.\s+", re.MULTILINE)
+# tokenizador de secciones (por línea)
+QUE_LINE_RE = re.compile(r"\s*Que")                # línea que abre un considerando
+QUE_NORM_RE = re.compile(r"Que\s*,?\s*")            # "Que" / "Que ," / "Queel" -> "Que, " (con \b, ver _norm_que)
+QUE_GLUE_RE = re.compile(r"\bQue\s*(,?)\s*$")        # línea que termina en "Que": se une a la siguiente
+ENUM_LINE_RE = re.compile(r"\s*\d+\.(?:\s|$)")      # línea de ítem "1. ..."
+# las mismas condiciones buscadas sobre la página entera; empiezan por "\n" para que la
+# búsqueda avance rápido hasta el próximo salto de línea candidato
+HEAD_SCAN_RE = re.compile(r"\bCONSIDERANDO:?\b|\bRESUEL(?:VE|VO):?\b", re.IGNORECASE)
+QUE_SCAN_RE = re.compile(r"\n[^\S\n]*Que")
+QUE_START_RE = re.compile(r"[^\S\n]*Que")                       # ídem, al inicio de la página
+ENUM_SCAN_RE = re.compile(r"\n[^\S\n]*\d+\.(?:[^\S\n]|$)", re.MULTILINE)
+ENUM_START_RE = re.compile(r"[^\S\n]*\d+\.(?:[^\S\n]|$)", re.MULTILINE)
 
 MESES = {
     "enero": "01", "febrero": "02", "marzo": "03", "abril": "04", "mayo": "05",
@@ -64,18 +87,57 @@ def clean_page_text(txt: str) -> str:
                 break
         if not skip:
             out.append(ln)
-    cleaned = "\n".join(out)
-    cleaned = normalize_spaces(cleaned)
+    return normalize_page_text("\n".join(out))
+
+def normalize_page_text(txt: str) -> str:
+    # espacios y OCR; en modo layout el texto ya llega sin encabezado/pie
+    cleaned = normalize_spaces(txt)
     cleaned = tiny_ocr_fixes(cleaned)
     return cleaned
 
-def extract_pages(pdf_path: str):
-    doc = fitz.open(pdf_path)
+def extract_pages(pdf_path: str, doc: fitz.Document | None = None):
+    # con doc, usa el documento ya abierto (y no lo cierra)
+    own = doc is None
+    if own:
+        doc = fitz.open(pdf_path)
     pages = []
     for i, page in enumerate(doc):
         t = page.get_text("text")
         pages.append((i+1, t))  # 1-index
-    doc.close()
+    if own:
+        doc.close()
+    return pages
+
+def page_ranges(n_pages: int, size: int = PAGE_RANGE) -> list[tuple[int, int]]:
+    return [(a, min(a + size, n_pages)) for a in range(0, n_pages, size)]
+
+def extract_page_range(pdf_path: str, start: int, end: int, cleaner: LayoutCleaner | None = None):
+    """
+    Páginas [start, end) (0-index) como (página 1-index, texto crudo, texto limpio).
+    Corre en un proceso del pool: abre su propio fitz.Document y limpia ahí mismo,
+    así al proceso principal solo vuelve texto.
+    """
+    out = []
+    with fitz.open(pdf_path) as doc:
+        for i in range(start, min(end, doc.page_count)):
+            page = doc[i]
+            if cleaner is None:
+                raw = page.get_text("text")
+                clean = clean_page_text(raw)
+            else:
+                height, blocks = page_blocks(page)
+                raw = blocks_text(blocks)
+                clean = normalize_page_text(cleaner.clean_blocks(height, blocks))
+            out.append((i + 1, raw, clean))
+    return out
+
+def extract_pages_parallel(pdf_path: str, n_pages: int, pool: ProcessPoolExecutor,
+                           cleaner: LayoutCleaner | None = None, size: int = PAGE_RANGE):
+    """Reparte los rangos de páginas en el pool y los une en orden de página."""
+    futures = [pool.submit(extract_page_range, pdf_path, a, b, cleaner) for a, b in page_ranges(n_pages, size)]
+    pages = []
+    for f in futures:
+        pages.extend(f.result())
     return pages
 
 def guess_id_from_filename(filename: str) -> str:
@@ -103,64 +165,331 @@ def normalize_tipo(raw: str | None) -> str | None:
         return None
     x = re.sub(r"\s+", " ", raw.strip()).lower()
     x = x.replace("ó", "o").replace("í", "i").strip()
-    if "ordinaria" in x:
-        return "Ordinaria"
+    # "extraordinaria" contiene "ordinaria": comprobarla primero
     if "extraordinaria" in x:
         return "Extraordinaria"
+    if "ordinaria" in x:
+        return "Ordinaria"
     return raw.title()
 
-def split_sections(full_text: str):
-    # hallar offsets de encabezados
-    cons = CONSIDERANDO_RE.search(full_text)
-    resv = RESUELVE_RE.search(full_text)
-    considering_text, resolving_text = "", ""
-    if cons and resv and cons.start() < resv.start():
-        considering_text = full_text[cons.end():resv.start()].strip()
-        resolving_text = full_text[resv.end():].strip()
-    elif resv:
-        resolving_text = full_text[resv.end():].strip()
-    elif cons:
-        considering_text = full_text[cons.end():].strip()
-
-    # CONSIDERANDO: separar por líneas que comienzan con "Que"
-    considering_parts = []
-    if considering_text:
-        # normalizar "Que," y variantes pegadas
-        considering_text = re.sub(r"\bQue\s*,?\s*", "Que, ", considering_text)
-        parts = re.split(r"(?:\n|^)\s*Que,\s*", considering_text)
-        # re.split deja el primer trozo antes del primer "Que,"; limpiamos
-        for p in parts:
-            p = p.strip()
-            if not p:
-                continue
-            # vuelve a anteponer "Que, "
-            considering_parts.append("Que, " + p)
-
-    # RESUELVE: dividir por enumeración 1./2./3.
-    resolving_parts = []
-    if resolving_text:
-        items = ENUM_ITEM_RE.split(resolving_text)
-        # ENUM_ITEM_RE split devuelve primer elemento antes del 1.; descartarlo si es ruido
-        # reconstruimos detectando líneas que realmente eran ítems
-        # alternativa más simple: usar finditer y slices
-        matches = list(ENUM_ITEM_RE.finditer(resolving_text))
-        if matches:
-            # tomar cada bloque desde match[i].end() a match[i+1].start()
-            for i, m in enumerate(matches):
-                start = m.end()
-                end = matches[i+1].start() if i+1 < len(matches) else len(resolving_text)
-                chunk = resolving_text[start:end].strip()
-                if chunk:
-                    resolving_parts.append(chunk)
+def _norm_que(m: re.Match) -> str:
+    # equivale a r"\bQue..." pero deja buscar el literal "Que" sin probar \b en cada posición.
+    # Como antes, solo se come "Que", espacios y una coma: "Que: ..." queda "Que, : ..." y
+    # "Queel" queda "Que, el" (se conserva para no cambiar los textos ni sus sha1)
+    i = m.start()
+    if i and (m.string[i - 1].isalnum() or m.string[i - 1] == "_"):
+        return m.group(0)
+    return "Que, "
+
+def _has_resuelve(text: str) -> bool:
+    # Filtro previo barato antes de RESUELVE_RE. Con IGNORECASE, re trata la "ſ" (s larga,
+    # U+017F) como una "s", así que "REſUELVE" es un encabezado válido para RESUELVE_RE
+    # pero no contiene "resuel": si aparece una "ſ" hay que probar el regex igual.
+    return "resuel" in text.lower() or "ſ" in text
+
+class Paragraph(NamedTuple):
+    seccion: str
+    texto: str
+    pagina_inicio: int | None
+    pagina_fin: int | None
+    char_inicio: int | None  # offsets en "\n".join(páginas limpias)
+    char_fin: int | None
+
+class SectionTokenizer:
+    """
+    Separa CONSIDERANDO / RESUELVE en una sola pasada recibiendo las páginas limpias
+    de a una (feed_page, o feed_line línea por línea). Produce los mismos párrafos que la
+    versión anterior basada en re.sub/re.split sobre el texto completo:
+      - considerando: un párrafo por línea que empieza con "Que" (normalizado a "Que, ")
+      - resuelve: un ítem por línea numerada "1." "2." ...; sin numeración, un solo ítem
+    y además la página y los offsets de inicio/fin de cada párrafo, con los que
+    process_pdf_to_ndjson asigna pagina_inicio/pagina_fin a cada chunk (chunk_pages).
+    Peculiaridades de la versión anterior que se mantienen a propósito:
+      - "Que: ..." -> "Que, : ..." y "Queel" -> "Que, el" (ver _norm_que)
+      - en "CONSIDERANDO:" al final de línea, el ":?\\b" de CONSIDERANDO_RE no puede
+        tomar los dos puntos (no hay límite de palabra después), así que ":" queda como
+        primer párrafo "Que, :"; el mínimo de 30 caracteres lo descarta al armar chunks
+      - una línea que termina en "Que" / "Que," se une con la siguiente (_glue), porque
+        la normalización se comía el salto de línea
+      - "N." solo en su línea es ítem únicamente si después queda texto (_held)
+      - "REſUELVE" también abre el resuelve (ver _has_resuelve)
+    tests/test_sections.py lo compara con la implementación anterior.
+    """
+    PRE, CONS, RES = 0, 1, 2
+
+    def __init__(self):
+        self.state = self.PRE
+        self.pos = 0                 # offset de la línea actual en el texto unido
+        self.considering = []        # Paragraph
+        self.resolving = []
+        self._cur = None             # párrafo en curso: [líneas, pág_ini, off_ini, pág_fin, off_fin]
+        self._cur_is_item = False    # en resuelve: ítem numerado (True) o preámbulo (False)
+        self._items = False          # hubo ítems numerados en resuelve
+        self._glue = 0               # la línea siguiente se une a la anterior ("Que" al final): 2 admite aún una ",", 1 no
+        self._held = None            # párrafo anterior a un "N." sin texto, pendiente de confirmar
+        self.page_starts = []        # offset de inicio de cada página recibida con feed_page
+        self.page_nums = []
+
+    # ----- párrafo en curso
+    def _open(self):
+        self._cur = [[], None, None, None, None]
+        self._glue = 0
+
+    def _add(self, page: int, seg: str, off: int):
+        cur = self._cur
+        cur[0].append(seg)
+        if seg.strip():
+            lead = len(seg) - len(seg.lstrip())
+            if cur[1] is None:
+                cur[1], cur[2] = page, off + lead
+            cur[3], cur[4] = page, off + len(seg.rstrip())
+            if self._glue == 2 and seg.strip() == ",":
+                self._glue = 1
+            else:
+                m = QUE_GLUE_RE.search(seg)
+                self._glue = 0 if not m else (1 if m.group(1) else 2)
+
+    def _add_block(self, page: int, block: str, off: int):
+        # equivale a _add línea por línea sobre varias líneas sin candidatos
+        cur = self._cur
+        cur[0].append(block)
+        body = block.rstrip()
+        if not body:
+            return
+        if cur[1] is None:
+            cur[1], cur[2] = page, off + len(block) - len(block.lstrip())
+        cur[3], cur[4] = page, off + len(body)
+        # la unión solo depende de las dos últimas líneas con texto
+        cut = body.rfind("\n")
+        last = body[cut + 1:]
+        if cut >= 0 and last.strip() == ",":
+            prev = body[:cut].rstrip()
+            if prev:
+                m = QUE_GLUE_RE.search(prev[prev.rfind("\n") + 1:])
+                self._glue = 1 if m and not m.group(1) else 0
+                return
+        if self._glue == 2 and last.strip() == ",":
+            self._glue = 1
+        elif last[-1] not in "e,":  # QUE_GLUE_RE exige terminar en "Que" o ","
+            self._glue = 0
         else:
-            # sin numeración, dejar un único ítem
-            resolving_parts = [resolving_text.strip()]
+            m = QUE_GLUE_RE.search(last)
+            self._glue = 0 if not m else (1 if m.group(1) else 2)
+
+    def _close_considering(self):
+        lines, p_ini, c_ini, p_fin, c_fin = self._cur
+        txt = QUE_NORM_RE.sub(_norm_que, "\n".join(lines)).strip()
+        if txt.startswith("Que,"):
+            txt = txt[4:].strip()
+        if txt:
+            self.considering.append(Paragraph("considerando", "Que, " + txt, p_ini, p_fin, c_ini, c_fin))
+
+    def _close_resolving(self, cur: list):
+        lines, p_ini, c_ini, p_fin, c_fin = cur
+        txt = "\n".join(lines).strip()
+        if txt:
+            self.resolving.append(Paragraph("resuelve", txt, p_ini, p_fin, c_ini, c_fin))
+
+    # ----- estados
+    def _enter_considering(self, page: int, seg: str, off: int):
+        self.state = self.CONS
+        self._open()
+        self._considering_line(page, seg, off)
 
-    return considering_parts, resolving_parts
+    def _enter_resolving(self, page: int, seg: str, off: int):
+        if self.state == self.CONS:
+            self._close_considering()
+        self.state = self.RES
+        self._open()  # preámbulo antes del primer ítem
+        self._resolving_line(page, seg, off)
+
+    def _considering_line(self, page: int, seg: str, off: int):
+        # una línea que empieza con "Que" abre párrafo, salvo que la anterior termine en
+        # "Que" / "Que," (la normalización "Que\s*,?\s*" se come el salto de línea y las une)
+        if QUE_LINE_RE.match(seg) and not self._glue:
+            self._close_considering()
+            self._open()
+        self._add(page, seg, off)
+
+    def _resolving_line(self, page: int, seg: str, off: int):
+        can_open = True
+        if self._held is not None and seg.strip():
+            # hay texto después del "N." pendiente: era un ítem
+            held_cur, held_is_item = self._held[:2]
+            if held_is_item:
+                self._close_resolving(held_cur)
+            self._held = None
+            # el "\s+" del "N." se come también la sangría de esta línea, que ya no
+            # empieza al inicio de línea y no puede abrir otro ítem
+            can_open = not seg[:1].isspace()
+        m = ENUM_LINE_RE.match(seg) if can_open else None
+        if not m:
+            self._add(page, seg, off)
+            return
+        rest = seg[m.end():]
+        if rest.strip():
+            if self._cur_is_item:
+                self._close_resolving(self._cur)
+        else:
+            # "N." solo en la línea: es ítem únicamente si queda texto después
+            self._held = (self._cur, self._cur_is_item, page, seg, off)
+        self._open()
+        self._cur_is_item = True
+        self._items = True
+        self._add(page, rest, off + m.end())
+
+    # ----- entrada
+    def feed_line(self, page: int, line: str):
+        off = self.pos
+        self.pos += len(line) + 1
+        if self.state == self.PRE:
+            mc = CONSIDERANDO_RE.search(line)
+            mr = RESUELVE_RE.search(line)
+            if mr and not (mc and mc.start() < mr.start()):
+                self._enter_resolving(page, line[mr.end():], off + mr.end())
+            elif mc:
+                rest = line[mc.end():]
+                mr = RESUELVE_RE.search(rest)
+                if mr:
+                    self._enter_considering(page, rest[:mr.start()], off + mc.end())
+                    self._enter_resolving(page, rest[mr.end():], off + mc.end() + mr.end())
+                else:
+                    self._enter_considering(page, rest, off + mc.end())
+        elif self.state == self.CONS:
+            mr = RESUELVE_RE.search(line)
+            if mr:
+                self._considering_line(page, line[:mr.start()], off)
+                self._enter_resolving(page, line[mr.end():], off + mr.end())
+            else:
+                self._considering_line(page, line, off)
+        else:
+            self._resolving_line(page, line, off)
+
+    def _block(self, page: int, text: str, a: int, b: int, base: int):
+        # text[a:b] no tiene líneas candidatas: se agrega de una vez (en PRE se descarta)
+        if b >= a and self.state != self.PRE:
+            self._add_block(page, text[a:b], base + a)
+
+    @staticmethod
+    def _next_line(scan_re, start_re, text: str, sp: int):
+        # (inicio de línea, match) de la próxima línea candidata a partir de sp
+        if sp == 0:
+            m = start_re.match(text)
+            if m:
+                return 0, m
+        m = scan_re.search(text, sp - 1 if sp else 0)
+        return (m.start() + 1, m) if m else (None, None)
+
+    def feed_page(self, page: int, text: str):
+        # Equivale a feed_line sobre cada línea, pero busca la próxima línea candidata
+        # del estado actual y agrega lo anterior en bloque. "Que ..." en considerando y
+        # "N. texto" en resuelve se resuelven aquí; el resto de candidatas (encabezados,
+        # "N." sin texto) pasa por feed_line.
+        base = self.pos
+        self.page_starts.append(base)
+        self.page_nums.append(page)
+        pos = sp = 0  # pos: inicio de lo aún no agregado; sp: desde dónde buscar
+        res = None    # RESUELVE de esta página; se busca una sola vez
+        while True:
+            if self._held is not None:
+                ls = pos
+            elif self.state == self.PRE:
+                m = HEAD_SCAN_RE.search(text, sp)
+                if m is None:
+                    break
+                ls = text.rfind("\n", 0, m.start()) + 1
+            elif self.state == self.CONS:
+                if res is None:
+                    res = _has_resuelve(text) and RESUELVE_RE.search(text, pos) or False
+                ls, m = self._next_line(QUE_SCAN_RE, QUE_START_RE, text, sp)
+                if m and (not res or ls <= res.start()):
+                    self._block(page, text, pos, ls - 1, base)
+                    if not self._glue:
+                        self._close_considering()
+                        self._open()
+                    pos, sp = ls, m.end()
+                    continue
+                if not res:
+                    self._block(page, text, pos, len(text), base)
+                    break
+                ls = text.rfind("\n", 0, res.start()) + 1
+            else:
+                ls, m = self._next_line(ENUM_SCAN_RE, ENUM_START_RE, text, sp)
+                if m is None:
+                    self._block(page, text, pos, len(text), base)
+                    break
+                le = text.find("\n", m.end())
+                if text[m.end():le if le >= 0 else len(text)].strip():
+                    self._block(page, text, pos, ls - 1, base)
+                    if self._cur_is_item:
+                        self._close_resolving(self._cur)
+                    self._open()
+                    self._cur_is_item = self._items = True
+                    pos = sp = m.end()
+                    continue
+            self._block(page, text, pos, ls - 1, base)
+            self.pos = base + ls
+            le = text.find("\n", ls)
+            if le < 0:
+                self.feed_line(page, text[ls:])
+                break
+            self.feed_line(page, text[ls:le])
+            pos = sp = le + 1
+        self.pos = base + len(text) + 1
+
+    def page_at(self, off: int) -> int | None:
+        """Página que contiene el offset off del texto unido (None sin feed_page)."""
+        i = bisect.bisect_right(self.page_starts, off) - 1
+        return self.page_nums[i] if i >= 0 else None
+
+    def close(self) -> tuple[list[Paragraph], list[Paragraph]]:
+        if self.state == self.CONS:
+            self._close_considering()
+        elif self.state == self.RES:
+            if self._held is not None:
+                # "N." al final del texto: no era ítem, vuelve al párrafo anterior
+                held_cur, held_is_item, page, seg, off = self._held
+                self._cur, self._cur_is_item, self._items = held_cur, held_is_item, held_is_item
+                self._add(page, seg, off)
+                self._held = None
+            # sin numeración, todo el resuelve (preámbulo) es un único ítem
+            if self._cur_is_item or not self._items:
+                self._close_resolving(self._cur)
+        self.state = None
+        return self.considering, self.resolving
+
+def split_sections_pages(pages_clean: list[str]) -> tuple[list[Paragraph], list[Paragraph]]:
+    tok = SectionTokenizer()
+    for i, txt in enumerate(pages_clean, start=1):
+        tok.feed_page(i, txt)
+    return tok.close()
+
+def split_sections(full_text: str):
+    considering, resolving = split_sections_pages([full_text])
+    return [p.texto for p in considering], [p.texto for p in resolving]
+
+def chunk_pages(p: Paragraph, chunks: list[str], tok: SectionTokenizer) -> list[tuple[int | None, int | None]]:
+    """
+    (pagina_inicio, pagina_fin) de cada trozo de chunk_long(p.texto). Si el párrafo cruza
+    páginas, sus offsets se reparten en proporción al largo de los trozos (el texto ya
+    está normalizado, así que el corte de página de un trozo es aproximado).
+    """
+    if len(chunks) == 1 or p.pagina_inicio == p.pagina_fin or p.char_inicio is None:
+        return [(p.pagina_inicio, p.pagina_fin)] * len(chunks)
+    total = sum(len(c) for c in chunks) or 1
+    span = p.char_fin - p.char_inicio
+    out, acc = [], 0
+    for c in chunks:
+        a = p.char_inicio + span * acc // total
+        acc += len(c)
+        b = p.char_inicio + max(span * acc // total - 1, 0)
+        out.append((tok.page_at(a) or p.pagina_inicio, tok.page_at(b) or p.pagina_fin))
+    return out
 
 def best_effort_pages_map(pages_cleaned: list[str], snippet: str) -> tuple[int|None, int|None]:
     """
     Busca un fragmento corto en las páginas para asignar pagina_inicio/fin (heurística).
+    process_pdf_to_ndjson ya no la usa: las páginas salen de los offsets de SectionTokenizer.
     """
     if not snippet:
         return None, None
@@ -186,120 +515,258 @@ def chunk_long(text: str, limit: int = CHUNK_CHAR_LIMIT):
         i += limit
     return out
 
-def process_pdf_to_ndjson(pdf_path: str, out_path: str):
+def process_pdf_to_ndjson(pdf_path: str, out_path: str, stats: DocStats | None = None,
+                          cleaner: LayoutCleaner | None = None, catalog: Catalog | None = None,
+                          pool: ProcessPoolExecutor | None = None, split_pages: int = SPLIT_MIN_PAGES,
+                          shards: ShardWriter | None = None):
+    """
+    Sin cleaner, el encabezado/pie se quita con HEADER_FOOTER_PATTERNS; con un
+    LayoutCleaner, por la posición de los bloques y el boilerplate aprendido.
+    Con catalog, además actualiza la fila de la resolución en el catálogo SQLite.
+    Un PDF de split_pages páginas o más se extrae y limpia por rangos en procesos
+    aparte (pool; si no se pasa, se crea uno solo para este documento). El
+    resultado es el mismo; en los tiempos, la limpieza queda dentro de "extract".
+    Con shards, las líneas van al shard comprimido del año en lugar de out_path.
+    """
     filename = os.path.basename(pdf_path)
-    pages_raw = extract_pages(pdf_path)
+    st = stats or DocStats(filename)
 
-    # Limpieza por página y unión
-    pages_clean = []
-    for pg, txt in pages_raw:
-        pages_clean.append(clean_page_text(txt))
-    full_text = "\n".join(pages_clean).strip()
+    pages_clean_par = None
+    if pool is None and PAGE_WORKERS < 2:
+        split_pages = 0  # con un solo CPU el pool solo agrega costo
+    with st.stage("extract"):
+        # se abre una sola vez: el número de páginas decide si se reparte en el pool
+        with fitz.open(pdf_path) as doc:
+            n_pages = doc.page_count
+            split = bool(split_pages) and n_pages >= split_pages
+            if not split and cleaner is None:
+                pages_raw = extract_pages(pdf_path, doc)
+            elif not split:
+                pages_blocks = extract_page_blocks(pdf_path, doc)
+                pages_raw = [(pg, blocks_text(blocks)) for pg, _, blocks in pages_blocks]
+        if split:
+            own_pool = pool is None
+            if own_pool:
+                pool = ProcessPoolExecutor(PAGE_WORKERS)
+            try:
+                pages = extract_pages_parallel(pdf_path, n_pages, pool, cleaner)
+            except BrokenProcessPool as e:
+                # murió un proceso del pool (p. ej. sin memoria): este PDF sigue en serie y
+                # process_folder_to_ndjson reemplaza el pool para los siguientes
+                print(f"Pool de páginas roto ({e}); {filename} se extrae en serie")
+                st.count("page_pool_errors")
+                pages = extract_page_range(pdf_path, 0, n_pages, cleaner)
+            finally:
+                if own_pool:
+                    pool.shutdown()
+            pages_raw = [(pg, raw) for pg, raw, _ in pages]
+            pages_clean_par = [clean for _, _, clean in pages]
+    st.count("pages", len(pages_raw))
+
+    # Limpieza por página; cada página limpia pasa directo al tokenizador de secciones
+    tok = SectionTokenizer()
+    for i, (pg, txt) in enumerate(pages_raw):
+        with st.stage("clean"):
+            if pages_clean_par is not None:
+                clean = pages_clean_par[i]
+            elif cleaner is None:
+                clean = clean_page_text(txt)
+            else:
+                _, height, blocks = pages_blocks[i]
+                clean = normalize_page_text(cleaner.clean_blocks(height, blocks))
+        with st.stage("split"):
+            tok.feed_page(pg, clean)
+        st.count("chars", len(clean))
 
     # Encabezado
-    id_reso = None
-    m = ID_RESO_RE.search("\n".join([p for _, p in pages_raw]))
-    if m:
-        id_reso = m.group(1).strip()
-    else:
-        id_reso = guess_id_from_filename(filename)
-
-    acta = None
-    m = ACTA_RE.search("\n".join([p for _, p in pages_raw]))
-    if m:
-        acta = m.group(1).strip()
-
-    tipo = None
-    m = TIPO_RE.search("\n".join([p for _, p in pages_raw]))
-    if m:
-        tipo = normalize_tipo(m.group(1))
-
-    # fecha legible (primera que aparezca) y derivar ISO + año
-    fecha_txt = None
-    m = FECHA_TXT_RE.search("\n".join([p for _, p in pages_raw]))
-    if m:
-        fecha_txt = m.group(1)
-    fecha_iso = to_iso(fecha_txt) if fecha_txt else None
-    anio = int(fecha_iso[:4]) if fecha_iso else None
+    with st.stage("header"):
+        raw_text = "\n".join([p for _, p in pages_raw])
+        id_reso = None
+        m = ID_RESO_RE.search(raw_text)
+        if m:
+            id_reso = m.group(1).strip()
+        else:
+            id_reso = guess_id_from_filename(filename)
+
+        acta = None
+        m = ACTA_RE.search(raw_text)
+        if m:
+            acta = m.group(1).strip()
+
+        tipo = None
+        m = TIPO_RE.search(raw_text)
+        if m:
+            tipo = normalize_tipo(m.group(1))
+
+        # fecha legible (primera que aparezca) y derivar ISO + año
+        fecha_txt = None
+        m = FECHA_TXT_RE.search(raw_text)
+        if m:
+            fecha_txt = m.group(1)
+        fecha_iso = to_iso(fecha_txt) if fecha_txt else None
+        anio = int(fecha_iso[:4]) if fecha_iso else None
 
     # Secciones
-    considering_parts, resolving_parts = split_sections(full_text)
+    with st.stage("split"):
+        considering, resolving = tok.close()
+
+    # CONSIDERANDO (mín. 30 chars) y RESUELVE (mín. 10 chars); cortar si es muy largo
+    # manteniendo parrafo_index
+    with st.stage("chunk"):
+        parts = []
+        for seccion, paragraphs, min_len in (("considerando", considering, 30),
+                                             ("resuelve", resolving, 10)):
+            for pi, p in enumerate(paragraphs):
+                ptxt = p.texto.strip()
+                if not ptxt or len(ptxt) < min_len:
+                    continue
+                parts.append((seccion, pi, p, chunk_long(ptxt, CHUNK_CHAR_LIMIT)))
+    st.count("chunks", sum(len(chunks) for *_, chunks in parts))
+
+    # Páginas de cada chunk a partir de los offsets del tokenizador
+    with st.stage("pages_map"):
+        items = []
+        for seccion, pi, p, chunks in parts:
+            for ctxt, (p_ini, p_fin) in zip(chunks, chunk_pages(p, chunks, tok)):
+                items.append((seccion, pi, ctxt, p_ini, p_fin))
 
     # Preparar NDJSON
-    with open(out_path, "w", encoding="utf-8") as fw:
-        # CONSIDERANDO
-        for pi, ptxt in enumerate(considering_parts):
-            ptxt = ptxt.strip()
-            if not ptxt or len(ptxt) < 30:
-                continue
-            # cortar si es muy largo (manteniendo parrafo_index y variando chunk_index)
-            chunks = chunk_long(ptxt, CHUNK_CHAR_LIMIT)
-            for ci, ctxt in enumerate(chunks):
-                p_ini, p_fin = best_effort_pages_map(pages_clean, ctxt)
-                obj = {
-                    "id_reso": id_reso,
-                    "acta": acta,
-                    "anio": anio,
-                    "fecha_iso": fecha_iso,
-                    "fecha": fecha_txt,
-                    "seccion": "considerando",
-                    "parrafo_index": pi,
-                    "pagina_inicio": p_ini,
-                    "pagina_fin": p_fin,
-                    "texto": ctxt,
-                    "fuente_pdf": filename,
-                    "sha1": sha1(ctxt)
-                }
-                fw.write(json.dumps(obj, ensure_ascii=False) + "\n")
-
-        # RESUELVE
-        for pi, ptxt in enumerate(resolving_parts):
-            ptxt = ptxt.strip()
-            if not ptxt or len(ptxt) < 10:
-                continue
-            chunks = chunk_long(ptxt, CHUNK_CHAR_LIMIT)
-            for ci, ctxt in enumerate(chunks):
-                p_ini, p_fin = best_effort_pages_map(pages_clean, ctxt)
-                obj = {
-                    "id_reso": id_reso,
-                    "acta": acta,
-                    "anio": anio,
-                    "fecha_iso": fecha_iso,
-                    "fecha": fecha_txt,
-                    "seccion": "resuelve",
-                    "parrafo_index": pi,
-                    "pagina_inicio": p_ini,
-                    "pagina_fin": p_fin,
-                    "texto": ctxt,
-                    "fuente_pdf": filename,
-                    "sha1": sha1(ctxt)
-                }
-                fw.write(json.dumps(obj, ensure_ascii=False) + "\n")
-
-def process_folder_to_ndjson(input_dir: str, output_dir: str):
+    lines = []
+    for seccion, pi, ctxt, p_ini, p_fin in items:
+        with st.stage("write"):
+            obj = {
+                "id_reso": id_reso,
+                "acta": acta,
+                "tipo": tipo,
+                "anio": anio,
+                "fecha_iso": fecha_iso,
+                "fecha": fecha_txt,
+                "seccion": seccion,
+                "parrafo_index": pi,
+                "pagina_inicio": p_ini,
+                "pagina_fin": p_fin,
+                "texto": ctxt,
+                "fuente_pdf": filename,
+                "sha1": sha1(ctxt)
+            }
+            line = json.dumps(obj, ensure_ascii=False) + "\n"
+            lines.append(line)
+    # bytes escritos: el NDJSON tal cual o, con shards, la resolución ya comprimida
+    with st.stage("write"):
+        if shards is None:
+            with open(out_path, "w", encoding="utf-8") as fw:
+                fw.writelines(lines)
+            st.count("bytes", sum(len(line.encode("utf-8")) for line in lines))
+        else:
+            st.count("bytes", shards.add(filename, id_reso, anio, lines))
+
+    if catalog is not None:
+        with st.stage("write"):
+            catalog.upsert({
+                "id_reso": id_reso,
+                "acta": acta,
+                "tipo": tipo,
+                "anio": anio,
+                "fecha_iso": fecha_iso,
+                "fecha": fecha_txt,
+                "fuente_pdf": filename,
+                "paginas": len(pages_raw),
+                "chunks": len(items),
+                "considerandos": len({pi for s, pi, *_ in items if s == "considerando"}),
+                "resuelve": len({pi for s, pi, *_ in items if s == "resuelve"}),
+            })
+    return st
+
+def process_folder_to_ndjson(input_dir: str, output_dir: str, report_top: int = 10,
+                             profile_top: int = 0, profiler: str = "cprofile", layout: bool = False,
+                             catalog_path: str | None = None, page_workers: int = PAGE_WORKERS,
+                             split_pages: int = SPLIT_MIN_PAGES, consolidate: str | None = None):
+    """
+    Procesa todos los PDF de input_dir y deja en output_dir un .ndjson por PDF,
+    el log de errores y run_report.json (tiempos por etapa, contadores y los
+    documentos más lentos). Con profile_top > 0 vuelve a procesar los N más
+    lentos bajo cProfile/pyinstrument y guarda los perfiles en output_dir/perfiles.
+    Con layout=True el encabezado/pie se quita con LayoutCleaner; el boilerplate se
+    aprende de input_dir la primera vez y queda en output_dir/boilerplate.json.
+    Con catalog_path, cada resolución procesada se inserta/actualiza en ese catálogo SQLite.
+    Los PDF de split_pages páginas o más (anexos largos) se reparten por rangos de
+    páginas entre page_workers procesos; page_workers <= 1 los procesa en serie.
+    Con consolidate="gzip" o "zstd" no se escribe un .ndjson por PDF sino un shard
+    comprimido por año (<anio>.ndjson.gz + índice .idx, ver shards.py).
+    """
     os.makedirs(output_dir, exist_ok=True)
+    cleaner = None
+    if layout:
+        model_path = os.path.join(output_dir, MODEL_FILE)
+        if os.path.exists(model_path):
+            cleaner = LayoutCleaner.load(model_path)
+        else:
+            cleaner = LayoutCleaner.learn_folder(input_dir)
+            cleaner.save(model_path)
+        print(f"Limpieza por layout: {len(cleaner.boilerplate)} líneas de boilerplate ({model_path})")
+    catalog = Catalog(catalog_path) if catalog_path else None
+    shards = ShardWriter(output_dir, consolidate) if consolidate else None
+    # los procesos del pool se lanzan recién con el primer PDF grande
+    pool = ProcessPoolExecutor(page_workers) if page_workers > 1 and split_pages else None
     log_path = os.path.join(output_dir, "errores_resoluciones.log")
     with open(log_path, "w", encoding="utf-8") as log:
         log.write("Log de errores al procesar resoluciones\n")
         log.write("=====================================\n\n")
 
+    run = RunStats()
     for filename in sorted(os.listdir(input_dir)):
         if not filename.lower().endswith(".pdf"):
             continue
         in_pdf = os.path.join(input_dir, filename)
         base = os.path.splitext(filename)[0]
         out_ndjson = os.path.join(output_dir, f"{base}.ndjson")
+        st = DocStats(filename)
         try:
-            process_pdf_to_ndjson(in_pdf, out_ndjson)
-            print(f"OK: {filename} -> {os.path.basename(out_ndjson)}")
+            process_pdf_to_ndjson(in_pdf, out_ndjson, st, cleaner, catalog, pool,
+                                  split_pages if pool is not None else 0, shards)
+            if st.counters.get("page_pool_errors"):
+                # un pool roto ya no acepta tareas: uno nuevo para los PDF que siguen
+                pool.shutdown()
+                pool = ProcessPoolExecutor(page_workers)
+            destino = os.path.basename(out_ndjson) if shards is None else f"shard {shards.codec}"
+            print(f"OK: {filename} -> {destino} ({st.total:.2f}s)")
         except Exception as e:
+            st.error = str(e)
             print(f"ERROR: {filename}: {e}")
             with open(log_path, "a", encoding="utf-8") as log:
                 log.write(f"Error procesando {filename}: {e}\n")
                 log.write(traceback.format_exc() + "\n")
+        run.add(st)
+    if pool is not None:
+        pool.shutdown()
+    if shards is not None:
+        shards.close()
+
+    report_path = os.path.join(output_dir, "run_report.json")
+    rep = run.write_report(report_path, report_top)
+    print(f"{rep['docs']} PDFs, {rep['pages']} páginas en {rep['wall_s']}s "
+          f"({rep['errores']} errores). Reporte: {report_path}")
+    if catalog is not None:
+        print(f"Catálogo {catalog_path}: {len(catalog)} resoluciones")
+        catalog.close()
+
+    if profile_top > 0:
+        prof_dir = os.path.join(output_dir, "perfiles")
+        os.makedirs(prof_dir, exist_ok=True)
+        tmp_out = os.path.join(prof_dir, "tmp.ndjson")
+        for d in run.slowest(profile_top):
+            out_base = os.path.join(prof_dir, os.path.splitext(d.filename)[0])
+            path = profile_call(process_pdf_to_ndjson, out_base,
+                                os.path.join(input_dir, d.filename), tmp_out, profiler=profiler,
+                                cleaner=cleaner, split_pages=0)  # en serie: el perfil ve todas las etapas
+            print(f"Perfil: {d.filename} ({d.total:.2f}s) -> {path}")
+        if os.path.exists(tmp_out):
+            os.remove(tmp_out)
+    return rep
 
 
 if __name__ == "__main__":
     input_path = os.path.expanduser("~/Desktop/Proyecto Resoluciones/Resoluciones/2025")
     output_path = os.path.expanduser("~/Desktop/Proyecto Resoluciones/Resoluciones_NDJSON/2025")
-    process_folder_to_ndjson(input_path, output_path)
+    catalog_path = os.path.expanduser("~/Desktop/Proyecto Resoluciones/catalogo.sqlite")
+    process_folder_to_ndjson(input_path, output_path, catalog_path=catalog_path)
@@ -0,0 +1,130 @@
+# pipeline_stats.py — temporizadores y contadores por etapa para la extracción PDF -> NDJSON
+import io
+import json
+import time
+import pstats
+import cProfile
+from contextlib import contextmanager
+from datetime import datetime
+
+STAGES = ["extract", "clean", "header", "split", "chunk", "pages_map", "write"]
+COUNTERS = ["pages", "chars", "chunks", "bytes"]
+
+
+class DocStats:
+    """Tiempos (s) por etapa y contadores de un PDF."""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.stages = {s: 0.0 for s in STAGES}
+        self.counters = {c: 0 for c in COUNTERS}
+        self.error = None
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - t0
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    @property
+    def total(self) -> float:
+        return sum(self.stages.values())
+
+    def to_dict(self) -> dict:
+        d = {
+            "archivo": self.filename,
+            "total_s": round(self.total, 4),
+            "stages_s": {s: round(v, 4) for s, v in self.stages.items()},
+            **self.counters,
+        }
+        if self.error:
+            d["error"] = self.error
+        return d
+
+
+class RunStats:
+    """Agrega los DocStats de una corrida de process_folder_to_ndjson."""
+
+    def __init__(self):
+        self.docs: list[DocStats] = []
+        self.started = datetime.now()
+        self._t0 = time.perf_counter()
+
+    def add(self, doc: DocStats):
+        self.docs.append(doc)
+
+    def slowest(self, n: int) -> list[DocStats]:
+        return sorted((d for d in self.docs if not d.error), key=lambda d: d.total, reverse=True)[:n]
+
+    def report(self, top_n: int = 10) -> dict:
+        stages = {s: 0.0 for s in STAGES}
+        counters = {c: 0 for c in COUNTERS}
+        for d in self.docs:
+            for s, v in d.stages.items():
+                stages[s] = stages.get(s, 0.0) + v
+            for c, v in d.counters.items():
+                counters[c] = counters.get(c, 0) + v
+        total = sum(stages.values())
+        wall = time.perf_counter() - self._t0
+        return {
+            "inicio": self.started.strftime("%Y-%m-%d %H:%M:%S"),
+            "wall_s": round(wall, 3),
+            "docs": len(self.docs),
+            "errores": sum(1 for d in self.docs if d.error),
+            **counters,
+            "pages_s": round(counters["pages"] / wall, 2) if wall else None,
+            "stages_s": {s: round(v, 4) for s, v in stages.items()},
+            "stages_pct": {s: round(v / total * 100, 1) if total else 0.0 for s, v in stages.items()},
+            "mas_lentos": [d.to_dict() for d in self.slowest(top_n)],
+            "documentos": [d.to_dict() for d in self.docs],
+        }
+
+    def write_report(self, path: str, top_n: int = 10) -> dict:
+        rep = self.report(top_n)
+        with open(path, "w", encoding="utf-8") as fw:
+            json.dump(rep, fw, ensure_ascii=False, indent=2)
+        return rep
+
+
+def profile_call(fn, out_base: str, *args, profiler: str = "cprofile", **kwargs) -> str:
+    """
+    Ejecuta fn(*args, **kwargs) bajo un perfilador y guarda el resultado:
+      - cprofile:    out_base.prof (+ out_base.txt con las 30 funciones más costosas)
+      - pyinstrument: out_base.html (si está instalado; si no, cae a cProfile)
+    Devuelve la ruta del archivo principal.
+    """
+    if profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("pyinstrument no está instalado, se usa cProfile")
+        else:
+            prof = Profiler()
+            prof.start()
+            try:
+                fn(*args, **kwargs)
+            finally:
+                prof.stop()
+            path = out_base + ".html"
+            with open(path, "w", encoding="utf-8") as fw:
+                fw.write(prof.output_html())
+            return path
+
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        fn(*args, **kwargs)
+    finally:
+        prof.disable()
+    path = out_base + ".prof"
+    prof.dump_stats(path)
+    buf = io.StringIO()
+    pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(30)
+    with open(out_base + ".txt", "w", encoding="utf-8") as fw:
+        fw.write(buf.getvalue())
+    return path
@@ -0,0 +1,227 @@
+# reso_ids.py — forma canónica de los códigos de resolución e índice id -> documentos/chunks
+import re
+import difflib
+from functools import lru_cache
+from typing import NamedTuple
+
+from text_norm import fold
+
+DEFAULT_PREFIX = ("UC", "CU", "RES")   # lo que se omite al escribir "RES 22 2025" o "22-2025"
+# partes conocidas de un prefijo, para separar las que llegan pegadas ("UCCURES" -> UC CU RES)
+PREFIX_PARTS = DEFAULT_PREFIX + ("FCH",)
+YEAR_MIN, YEAR_MAX = 1990, 2099
+FUZZY_PREFIX = 0.75   # similitud mínima del prefijo ("UC-CU-RSE") con el mismo número y año
+FUZZY_FULL = 0.9      # similitud mínima de la clave completa cuando no se reconoce número/año
+
+SEP_RE = re.compile(r"[^A-Z0-9]+")
+GLUED_RE = re.compile(r"([A-Z]{2,})(\d{2,})$|(\d{2,})([A-Z]{1,2})$")   # "RES022", "0053M"
+GLUED_YEAR_RE = re.compile(r"([A-Z]*)(\d{2,4})((?:19|20)\d{2})([A-Z]{0,2})$")   # "UCCURES0222025A"
+YEAR_SUFFIX_RE = re.compile(r"((?:19|20)\d{2})([A-Z]{1,2})$")   # "2025B"
+# palabras que acompañan al código en encabezados, nombres de archivo y consultas
+NOISE = frozenset("""RESOLUCION RESOLUCIONES RESOL MEMORANDO MEMORANDUM MEMO CODIGO NO NRO NUM NUMERO N
+DE DEL LA EL EN Y AL LO SE PDF DOWNLOAD""".split())
+# confusiones típicas de OCR: letras en posición de número y al revés
+OCR_DIGITS = str.maketrans("OQDILZSGB", "000112568")
+OCR_LETTERS = str.maketrans("012568", "OIZSGB")
+
+
+class ResoId(NamedTuple):
+    prefix: tuple          # ("UC", "CU", "RES")
+    numero: int | None
+    anio: int | None
+    suffix: tuple          # ("M",) en memorandos UC-FCH-2025-0053-M, ("A",) en UC-CU-RES-022-2025-A
+    anio_first: bool       # orden PREFIJO-AÑO-NÚMERO (memorandos)
+
+
+def _as_digits(tok: str) -> str | None:
+    """Token numérico, tolerando letras que el OCR confunde con dígitos ("O22" -> "022")."""
+    if tok.isdigit():
+        return tok
+    real = sum(c.isdigit() for c in tok)
+    if real and real * 2 >= len(tok):
+        mapped = tok.translate(OCR_DIGITS)
+        if mapped.isdigit():
+            return mapped
+    return None
+
+
+def _tokens(s: str) -> list[str]:
+    s = fold(str(s)).upper().replace("Ñ", "N")
+    out = []
+    for p in SEP_RE.split(s):
+        if not p or p in NOISE:
+            continue
+        if p.isdigit():
+            # número y año pegados ("0222025"); un número o año solo no llega a 6 cifras
+            m = GLUED_YEAR_RE.match(p) if len(p) >= 6 else None
+        else:
+            # año + sufijo ("2025B"); "25Z" es un número con un error de OCR, no número + sufijo
+            m = YEAR_SUFFIX_RE.match(p) or (None if _as_digits(p)
+                                            else GLUED_YEAR_RE.match(p) or GLUED_RE.match(p))
+        if m:
+            out.extend(g for g in m.groups() if g)
+        else:
+            out.append(p)
+    return out
+
+
+def _split_glued(tok: str) -> tuple | None:
+    """ "UCCURES" -> ("UC", "CU", "RES"); None si no se compone solo de PREFIX_PARTS."""
+    if not tok:
+        return ()
+    for part in PREFIX_PARTS:
+        if tok.startswith(part):
+            rest = _split_glued(tok[len(part):])
+            if rest is not None:
+                return (part,) + rest
+    return None
+
+
+def _canonical_prefix(toks: list[str]) -> tuple:
+    toks = [t.translate(OCR_LETTERS) for t in toks]
+    prefix = tuple(p for t in toks for p in (_split_glued(t) or (t,)))
+    # sin prefijo o con solo el final de UC-CU-RES ("RES 22 2025", "CU-RES-022-2025"): el completo
+    if prefix == DEFAULT_PREFIX[len(DEFAULT_PREFIX) - len(prefix):]:
+        return DEFAULT_PREFIX
+    return prefix
+
+
+@lru_cache(maxsize=65536)  # los chunks de una resolución repiten el mismo id_reso
+def parse_id(s: str | None) -> ResoId | None:
+    """
+    Descompone un código en prefijo, número, año y sufijo:
+        "UC-CU-RES-022-2025", "RESOLUCIÓN_UC-CU-RES-022-2025.pdf", "res 22 2025", "UCCURES0222025",
+        "UC-CU-RES-O22-2O25" (OCR)  -> ResoId(("UC","CU","RES"), 22, 2025, (), False)
+        "UC-CU-RES-022-2025-A"      -> ResoId(("UC","CU","RES"), 22, 2025, ("A",), False)
+        "UC-FCH-2025-0053-M"        -> ResoId(("UC","FCH"), 53, 2025, ("M",), True)
+    None si no hay número y año reconocibles.
+    """
+    if not s:
+        return None
+    toks = _tokens(s)
+    digits = [_as_digits(t) for t in toks]
+    years = [i for i, d in enumerate(digits) if d and len(d) == 4 and YEAR_MIN <= int(d) <= YEAR_MAX]
+    # el año del código es el primero con un número al lado; las fechas que siguen
+    # ("UC-CU-RES-144-2025 (12 de marzo de 2025)") no lo cambian
+    for y in years:
+        if y and digits[y - 1] is not None:
+            n, anio_first = y - 1, False
+        elif y + 1 < len(toks) and digits[y + 1] is not None:
+            n, anio_first = y + 1, True
+        elif y > 1 and len(toks[y - 1]) >= 3 and toks[y - 1].translate(OCR_DIGITS).isdigit() \
+                and _split_glued(toks[y - 2]):
+            # número leído todo como letras ("UC-CU-RES-OZZ-2025"): solo justo tras un prefijo,
+            # para que palabras como "IS" no pasen por números
+            digits[y - 1] = toks[y - 1].translate(OCR_DIGITS)
+            n, anio_first = y - 1, False
+        else:
+            continue
+        break
+    else:
+        return None
+    start = min(n, y)
+    # prefijo: las palabras seguidas justo antes del número ("ACTA 12 UC-CU-RES-..." -> UC CU RES)
+    first = start
+    while first and digits[first - 1] is None:
+        first -= 1
+    prefix = _canonical_prefix(toks[first:start])
+    # sufijo: letras sueltas justo después del código ("-M", "-A"); lo demás es texto aparte
+    suffix = []
+    for t, d in zip(toks[max(n, y) + 1:], digits[max(n, y) + 1:]):
+        if d is not None or len(t) > 2:
+            break
+        suffix.append(t.translate(OCR_LETTERS))
+    return ResoId(prefix, int(digits[n]), int(digits[y]), tuple(suffix), anio_first)
+
+
+def format_id(r: ResoId) -> str:
+    if r.anio_first:
+        return "-".join(list(r.prefix) + [str(r.anio), f"{r.numero:04d}"] + list(r.suffix))
+    return "-".join(list(r.prefix) + [f"{r.numero:03d}", str(r.anio)] + list(r.suffix))
+
+
+def canonical_id(s: str | None) -> str | None:
+    """
+    Clave canónica de un código de resolución, la misma venga del encabezado
+    (ID_RESO_RE), del nombre de archivo o de lo que escribe el usuario:
+        "uc-cu-res-22-2025" / "RESOLUCIÓN_UC-CU-RES-022-2025" / "RES 22 2025" / "UCCURES0222025"
+            -> "UC-CU-RES-022-2025"
+        "UC-CU-RES-022-2025-A" -> "UC-CU-RES-022-2025-A" (otra resolución que la 022)
+    Si no se reconoce número y año, el texto en mayúsculas sin separadores.
+    """
+    if not s:
+        return None
+    r = parse_id(s)
+    if r is None:
+        return re.sub(r"[^A-Z0-9]", "", fold(str(s)).upper()) or None
+    return format_id(r)
+
+
+def _compact(key: str) -> str:
+    return key.replace("-", "")
+
+
+class IdIndex:
+    """
+    Código de resolución -> valores (chunk_ids, filas, códigos...). add() guarda la
+    clave canónica; lookup() es un dict O(1) por la clave canónica de la consulta y,
+    solo si no hay coincidencia exacta:
+      1. mismo (número, año, sufijo) y un prefijo que termina como el real ("FCH 2025 0053 M"
+         -> UC-FCH-2025-0053-M) o se le parece (FUZZY_PREFIX)
+      2. sin número/año reconocibles: difflib sobre todas las claves (FUZZY_FULL)
+    Nunca cambia el número, el año ni el sufijo: una resolución 023 inexistente no devuelve la 022.
+    """
+
+    def __init__(self):
+        self.keys = {}        # clave canónica -> [valores]
+        self.by_num = {}      # (número, año, sufijo, anio_first) -> [(prefijo, clave)]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, s: str):
+        return canonical_id(s) in self.keys
+
+    def add(self, raw_id: str | None, value) -> str | None:
+        r = parse_id(raw_id)
+        key = format_id(r) if r else canonical_id(raw_id)
+        if not key:
+            return None
+        values = self.keys.get(key)
+        if values is None:
+            values = self.keys[key] = []
+            if r:
+                self.by_num.setdefault((r.numero, r.anio, r.suffix, r.anio_first), []).append((r.prefix, key))
+        if not values or values[-1] != value:
+            values.append(value)
+        return key
+
+    def resolve(self, query: str | None) -> list[str]:
+        """Claves canónicas del índice que corresponden a la consulta ([] si ninguna)."""
+        if not query:
+            return []
+        r = parse_id(query)
+        key = format_id(r) if r else canonical_id(query)
+        if key in self.keys:
+            return [key]
+        if r is None:
+            if not key:
+                return []
+            compact = {_compact(k): k for k in self.keys}
+            return [compact[m] for m in difflib.get_close_matches(key, compact, n=1, cutoff=FUZZY_FULL)]
+        cands = self.by_num.get((r.numero, r.anio, r.suffix, r.anio_first), [])
+        # prefijos sin separadores ("UCCURES" pegado = UC-CU-RES); vale que uno termine como el otro
+        # ("RES 22 2025", o palabras de más delante del código)
+        want = "".join(r.prefix)
+        tail = [k for p, k in cands if "".join(p).endswith(want) or want.endswith("".join(p))]
+        if tail:
+            return tail
+        scored = [(difflib.SequenceMatcher(None, want, "".join(p)).ratio(), k) for p, k in cands]
+        best = max((s for s, _ in scored), default=0.0)
+        return [k for s, k in scored if s == best and s >= FUZZY_PREFIX]
+
+    def lookup(self, query: str | None) -> list:
+        out = []
+        for key in self.resolve(query):
+            out.extend(self.keys[key])
+        return out
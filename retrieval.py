@@ -0,0 +1,176 @@
+# retrieval.py — índice en memoria sobre los NDJSON de pdf_to_ndjson
+import re
+import bisect
+import time
+import datetime as dt
+from collections import defaultdict
+
+from bm25_index import fold, tokenize, bm25_idf, K1, B
+from chunk_store import ChunkStore
+from reso_ids import IdIndex, canonical_id, parse_id
+
+DEFAULT_K = 8
+EXTRACTO_CHARS = 300
+# la consulta menciona una fecha o un período: el rango de /query-filters es intencional
+DATE_HINT_RE = re.compile(
+    r"\b(?:19|20)\d{2}\b|\d{1,2}[/-]\d{1,2}|\b(?:enero|febrero|marzo|abril|mayo|junio|julio|agosto|"
+    r"septiembre|setiembre|octubre|noviembre|diciembre|hoy|ayer|semana|mes|año|ano|anio)\b",
+    re.IGNORECASE,
+)
+
+
+def normalize_id(s: str | None) -> str | None:
+    # "uc-cu-res-22-2025" / "UC CU RES 022 2025" / "RESOLUCIÓN_UC-CU-RES-022-2025" -> "UC-CU-RES-022-2025"
+    return canonical_id(s)
+
+
+class ChunkIndex:
+    """
+    Índice invertido en memoria. Se construye una sola vez al arrancar el servicio
+    y permite filtrar por los campos de /query-filters antes de puntuar.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.postings = defaultdict(dict)  # término -> {chunk_id: tf}
+        self.doc_len = []
+        self.by_reso = IdIndex()           # id canónico -> [chunk_id], con búsqueda aproximada
+        self.by_tipo = defaultdict(list)   # "ordinaria"/"extraordinaria" -> [chunk_id]
+        self.sin_fecha = []                # chunks sin fecha_iso (no se descartan por rango)
+        self.fechas = []                   # [(fecha_iso, chunk_id)] ordenado
+
+        for cid, ch in enumerate(chunks):
+            toks = tokenize(ch.get("texto", ""))
+            self.doc_len.append(len(toks))
+            for t in toks:
+                tf = self.postings[t]
+                tf[cid] = tf.get(cid, 0) + 1
+            if ch.get("id_reso"):
+                self.by_reso.add(ch["id_reso"], cid)
+            elif ch.get("fuente_pdf") and parse_id(ch["fuente_pdf"]):
+                # solo sin código de encabezado: si no, un chunk quedaría bajo dos resoluciones
+                self.by_reso.add(ch["fuente_pdf"], cid)
+            if ch.get("tipo"):
+                self.by_tipo[fold(ch["tipo"])].append(cid)
+            if ch.get("fecha_iso"):
+                self.fechas.append((ch["fecha_iso"], cid))
+            else:
+                self.sin_fecha.append(cid)
+        self.fechas.sort()
+        self.avg_len = (sum(self.doc_len) / len(self.doc_len)) if self.doc_len else 0.0
+
+    @classmethod
+    def from_folder(cls, folder: str) -> "ChunkIndex":
+        # los chunks se guardan en columnas (ChunkStore) y se leen como vistas tipo dict
+        return cls(ChunkStore.from_folder(folder))
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def _in_range(self, inicio: str | None, fin: str | None) -> set[int]:
+        # búsqueda binaria sobre la lista ordenada de fechas ISO (comparables como texto)
+        lo = bisect.bisect_left(self.fechas, (inicio, -1)) if inicio else 0
+        hi = bisect.bisect_right(self.fechas, (fin, len(self.chunks))) if fin else len(self.fechas)
+        out = {cid for _, cid in self.fechas[lo:hi]}
+        out.update(self.sin_fecha)
+        return out
+
+    def candidates(self, filters: dict | None) -> set[int] | None:
+        """
+        Traduce la salida de /query-filters a un conjunto de chunk_ids admitidos.
+        None = sin restricción.
+          rango_fechas -> fecha_iso
+          id_resol     -> id_reso
+          tipo_session -> tipo
+        """
+        if not filters:
+            return None
+        allowed = None
+
+        id_resol = filters.get("id_resol")
+        if id_resol:
+            allowed = set(self.by_reso.lookup(id_resol))
+
+        tipo = filters.get("tipo_session")
+        if tipo:
+            ids = set(self.by_tipo.get(fold(tipo).strip(), []))
+            allowed = ids if allowed is None else allowed & ids
+
+        rango = filters.get("rango_fechas")
+        if isinstance(rango, dict) and (rango.get("fecha_inicio") or rango.get("fecha_fin")):
+            ids = self._in_range(rango.get("fecha_inicio"), rango.get("fecha_fin"))
+            allowed = ids if allowed is None else allowed & ids
+
+        return allowed
+
+    def search(self, query: str, filters: dict | None = None, k: int = DEFAULT_K) -> list[tuple[float, dict]]:
+        allowed = self.candidates(filters)
+        if allowed is not None and not allowed:
+            return []
+
+        n = len(self.chunks)
+        avgdl = self.avg_len or 1.0
+        scores = defaultdict(float)
+        for t in set(tokenize(query)):
+            post = self.postings.get(t)
+            if not post:
+                continue
+            idf = bm25_idf(n, len(post))
+            for cid, tf in post.items():
+                if allowed is not None and cid not in allowed:
+                    continue
+                norm = K1 * (1 - B + B * self.doc_len[cid] / avgdl)
+                scores[cid] += idf * tf * (K1 + 1) / (tf + norm)
+
+        # Sin coincidencias léxicas pero con un código (p. ej. "¿qué resuelve la
+        # UC-CU-RES-022-2025?"): los chunks de esa resolución en su orden natural. Con
+        # otros filtros (fechas, tipo) no: serían chunks cualquiera de ese rango.
+        if not scores and allowed and filters and filters.get("id_resol"):
+            return [(0.0, self.chunks[cid]) for cid in sorted(allowed)[:k]]
+
+        top = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:k]
+        return [(s, self.chunks[cid]) for cid, s in top]
+
+
+def drop_default_range(query: str, filters: dict | None, today: dt.date | None = None) -> dict | None:
+    """
+    Sin ninguna fecha en la pregunta, el prompt de /query-filters completa rango_fechas
+    con el año en curso entero. Ese rango no viene del usuario: se quita, si no una
+    pregunta sin fecha solo buscaría en el año actual (y nada si el corpus es anterior).
+    Un rango que no es el año en curso completo, o una pregunta con fecha, se respetan.
+    """
+    rango = (filters or {}).get("rango_fechas")
+    if not isinstance(rango, dict) or DATE_HINT_RE.search(query or ""):
+        return filters
+    year = (today or dt.date.today()).year
+    if rango.get("fecha_inicio") == f"{year}-01-01" and rango.get("fecha_fin") == f"{year}-12-31":
+        return {k: v for k, v in filters.items() if k != "rango_fechas"}
+    return filters
+
+
+def to_citation(score: float, ch: dict) -> dict:
+    texto = ch.get("texto", "")
+    return {
+        "id_reso": ch.get("id_reso"),
+        "seccion": ch.get("seccion"),
+        "fecha": ch.get("fecha"),
+        "fecha_iso": ch.get("fecha_iso"),
+        "pagina_inicio": ch.get("pagina_inicio"),
+        "pagina_fin": ch.get("pagina_fin"),
+        "fuente_pdf": ch.get("fuente_pdf"),
+        "texto": texto,
+        "extracto": texto[:EXTRACTO_CHARS],
+        "score": round(score, 4),
+    }
+
+
+def retrieve(index: ChunkIndex, query: str, filters: dict | None = None, k: int = DEFAULT_K) -> dict:
+    t0 = time.perf_counter()
+    hits = index.search(query, filters, k)
+    citations = [to_citation(s, ch) for s, ch in hits]
+    used_docs = list(dict.fromkeys(c["id_reso"] for c in citations if c["id_reso"]))
+    return {
+        "citations": citations,
+        "used_docs": used_docs,
+        "retrieval_ms": round((time.perf_counter() - t0) * 1000, 2),
+    }
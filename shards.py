@@ -0,0 +1,210 @@
+# shards.py — salida consolidada: un NDJSON comprimido por año con índice de offsets por resolución
+import os
+import json
+import gzip
+
+from reso_ids import IdIndex
+
+CODECS = {"gzip": ".ndjson.gz", "zstd": ".ndjson.zst"}
+SHARD_EXTS = tuple(CODECS.values())
+INDEX_EXT = ".idx"        # <anio>.ndjson.gz.idx: una línea JSON por resolución
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+SIN_ANIO = "sin_anio"
+COMPACT_RATIO = 0.25  # close() compacta el shard cuando las copias viejas pasan esta fracción
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def resolve_codec(codec: str) -> str:
+    if codec not in CODECS:
+        raise ValueError(f"Codec desconocido: {codec} (gzip | zstd)")
+    if codec == "zstd" and _zstd() is None:
+        print("zstandard no está instalado, se usa gzip")
+        return "gzip"
+    return codec
+
+
+def codec_of(path: str) -> str:
+    for codec, ext in CODECS.items():
+        if path.endswith(ext):
+            return codec
+    raise ValueError(f"No es un shard: {path}")
+
+
+def compress(data: bytes, codec: str, level: int | None = None) -> bytes:
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=level or GZIP_LEVEL, mtime=0)
+    return _zstd().ZstdCompressor(level=level or ZSTD_LEVEL).compress(data)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "gzip":
+        return gzip.decompress(data)
+    # ZstdCompressor.compress guarda el tamaño en el frame, así que alcanza con decompress
+    return _zstd().ZstdDecompressor().decompress(data)
+
+
+def parse_lines(data: bytes) -> list[dict]:
+    return [json.loads(line) for line in data.decode("utf-8").split("\n") if line.strip()]
+
+
+class ShardWriter:
+    """
+    Escribe las resoluciones en <output_dir>/<anio>.ndjson.gz (o .zst). Cada resolución
+    es un miembro gzip / frame zstd independiente, de modo que se puede descomprimir
+    sola, y el archivo completo sigue siendo un .gz válido (zcat, gzip.open).
+    Por cada una se agrega una línea al índice <shard>.idx:
+        {"fuente_pdf", "id_reso", "offset", "length", "records"}
+    Solo se agrega al final: si un PDF se vuelve a procesar, su última entrada en el
+    índice es la que vale. close() compacta los shards escritos cuyas copias viejas
+    pasan de COMPACT_RATIO del archivo.
+    """
+
+    def __init__(self, output_dir: str, codec: str = "gzip", level: int | None = None):
+        self.dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        self.codec = resolve_codec(codec)
+        self.level = level
+        self._files = {}  # ruta del shard -> (archivo, índice)
+
+    def shard_path(self, anio) -> str:
+        return os.path.join(self.dir, f"{anio or SIN_ANIO}{CODECS[self.codec]}")
+
+    def add(self, fuente_pdf: str, id_reso: str | None, anio, lines: list[str]) -> int:
+        """Agrega las líneas NDJSON (con "\\n") de una resolución; devuelve los bytes comprimidos."""
+        path = self.shard_path(anio)
+        files = self._files.get(path)
+        if files is None:
+            files = self._files[path] = (open(path, "ab"), open(path + INDEX_EXT, "a", encoding="utf-8"))
+        shard, index = files
+        data = compress("".join(lines).encode("utf-8"), self.codec, self.level)
+        offset = shard.seek(0, os.SEEK_END)
+        shard.write(data)
+        shard.flush()  # el índice nunca apunta a bytes que no están en disco
+        index.write(json.dumps({"fuente_pdf": fuente_pdf, "id_reso": id_reso, "offset": offset,
+                                "length": len(data), "records": len(lines)}, ensure_ascii=False) + "\n")
+        return len(data)
+
+    def close(self):
+        for path, (shard, index) in self._files.items():
+            shard.close()
+            index.close()
+            size = os.path.getsize(path)
+            live = sum(e["length"] for e in load_index(path).values())
+            if size - live > COMPACT_RATIO * size:
+                compact(path)
+        self._files.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_index(shard_path: str) -> dict[str, dict]:
+    """fuente_pdf -> entrada; la última entrada gana y se descartan las que pasan del fin del shard."""
+    entries = {}
+    idx_path = shard_path + INDEX_EXT
+    if not os.path.exists(idx_path):
+        return entries
+    size = os.path.getsize(shard_path)
+    with open(idx_path, "r", encoding="utf-8") as fr:
+        for line in fr:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                e = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # línea cortada por una escritura interrumpida
+            if e["offset"] + e["length"] <= size:
+                entries[e["fuente_pdf"]] = e
+    return entries
+
+
+def iter_shard_file(shard_path: str):
+    """
+    Registros vigentes de un shard, en orden de escritura. Lee y descomprime un miembro
+    (una resolución) a la vez, así la memoria no depende del tamaño del shard del año.
+    """
+    codec = codec_of(shard_path)
+    entries = sorted(load_index(shard_path).values(), key=lambda e: e["offset"])
+    with open(shard_path, "rb") as fr:
+        for e in entries:
+            fr.seek(e["offset"])
+            yield from parse_lines(decompress(fr.read(e["length"]), codec))
+
+
+def compact(shard_path: str) -> tuple[int, int]:
+    """Reescribe el shard solo con las entradas vigentes; devuelve (bytes antes, bytes después)."""
+    before = os.path.getsize(shard_path)
+    entries = sorted(load_index(shard_path).values(), key=lambda e: e["offset"])
+    tmp = shard_path + ".tmp"
+    with open(shard_path, "rb") as fr, open(tmp, "wb") as fw, \
+            open(tmp + INDEX_EXT, "w", encoding="utf-8") as fi:
+        for e in entries:
+            fr.seek(e["offset"])
+            chunk = fr.read(e["length"])
+            e = dict(e, offset=fw.tell())
+            fw.write(chunk)
+            fi.write(json.dumps(e, ensure_ascii=False) + "\n")
+    os.replace(tmp, shard_path)
+    os.replace(tmp + INDEX_EXT, shard_path + INDEX_EXT)
+    return before, os.path.getsize(shard_path)
+
+
+class ShardReader:
+    """
+    Acceso por resolución a los shards de una carpeta (recursivo). read() hace un seek
+    al offset del índice y descomprime solo ese miembro, sin leer el resto del shard.
+    """
+
+    def __init__(self, folder: str):
+        self.entries = {}  # fuente_pdf -> entrada del índice + "shard"
+        for root, _, files in os.walk(folder):
+            for filename in sorted(files):
+                if filename.endswith(SHARD_EXTS):
+                    path = os.path.join(root, filename)
+                    for fuente, e in load_index(path).items():
+                        self.entries[fuente] = dict(e, shard=path)
+        self.by_id = IdIndex()    # código canónico -> [fuente_pdf]
+        for fuente, e in self.entries.items():
+            self.by_id.add(e.get("id_reso"), fuente)
+        self._fh = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, fuente_pdf: str):
+        return fuente_pdf in self.entries
+
+    def keys(self):
+        return self.entries.keys()
+
+    def read(self, fuente_pdf: str) -> list[dict]:
+        e = self.entries[fuente_pdf]
+        fr = self._fh.get(e["shard"])
+        if fr is None:
+            fr = self._fh[e["shard"]] = open(e["shard"], "rb")
+        fr.seek(e["offset"])
+        return parse_lines(decompress(fr.read(e["length"]), codec_of(e["shard"])))
+
+    def find(self, id_reso: str) -> list[dict]:
+        """Registros de las resoluciones con ese id_reso (clave canónica, con la tolerancia de IdIndex)."""
+        out = []
+        for fuente in self.by_id.lookup(id_reso):
+            out.extend(self.read(fuente))
+        return out
+
+    def close(self):
+        for fr in self._fh.values():
+            fr.close()
+        self._fh.clear()
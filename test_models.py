@@ -1,8 +1,22 @@
-import requests
-from datetime import datetime
+# test_models.py — benchmark de regresión y rendimiento del endpoint /ask
+# Uso:
+#   python test_models.py --model openai/gpt-oss-20b --embed "littlejohn-ai/bge-m3-spa-law-qa HYDE Subqueries"
+#   python test_models.py --stub --concurrency 4 --repeat 5          # sin red, contra un servidor local de prueba
+#   python test_models.py --compare test_results/a.json test_results/b.json
 import os
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
 
 API_URL = "http://localhost:8099/ask"
+REQUEST_TIMEOUT = (5, 300)  # connect, read
 
 #Consultas test
 queries = {
@@ -29,35 +43,127 @@ queries = {
     }
 }
 
-#Nombre del archivo de salida
-MODEL = "openai/gpt-oss-20b"
-EMBED = "littlejohn-ai/bge-m3-spa-law-qa HYDE Subqueries"
-MODEL = MODEL.replace("/", "_")
-EMBED = EMBED.replace("/", "_")
 
-# Carpeta de salida
-output_dir = "./test_results"
-os.makedirs(output_dir, exist_ok=True)  # Crea la carpeta si no existe
+# ---------------- Medición ----------------
+def percentile(values: list[float], p: float) -> float | None:
+    if not values:
+        return None
+    vals = sorted(values)
+    k = (len(vals) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(vals) - 1)
+    return vals[lo] + (vals[hi] - vals[lo]) * (k - lo)
 
-# Archivo de salida
-OUTPUT_FILE = f"{output_dir}/test_results_{MODEL}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
 
-#Encabezado del archivo de salida
-contenido_md = "# 📄 Resultados de Consultas a la API\n\n"
-contenido_md += f"**Fecha de generación:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-contenido_md += f"## Modelo: {MODEL}\n\n"
-contenido_md += f"## Embeding: Embed-service {EMBED}\n\n"
+def count_tokens(data: dict) -> tuple[int, bool]:
+    """Tokens generados: usa usage.completion_tokens si la API lo envía; si no, estima (~4 chars/token)."""
+    usage = data.get("usage") or {}
+    if usage.get("completion_tokens"):
+        return int(usage["completion_tokens"]), False
+    return max(1, len(data.get("answer", "")) // 4), True
 
-# Procesar cada consulta
-for nombre, payload in queries.items():
+
+def run_query(url: str, nombre: str, payload: dict, timeout) -> dict:
+    t0 = time.perf_counter()
+    res = {"nombre": nombre, "query": payload["query"]}
     try:
-        response = requests.post(API_URL, json=payload)
+        response = requests.post(url, json=payload, timeout=timeout)
         response.raise_for_status()
         data = response.json()
+        elapsed = time.perf_counter() - t0
+        tokens, estimado = count_tokens(data)
+        res.update({
+            "ok": True,
+            "latency_s": elapsed,
+            "tokens": tokens,
+            "tokens_estimados": estimado,
+            "tokens_s": tokens / elapsed if elapsed > 0 else None,
+            "model": data.get("model"),  # el que informa el servidor, no la etiqueta --model
+            "data": data,
+        })
+    except Exception as e:
+        res.update({"ok": False, "latency_s": time.perf_counter() - t0, "error": str(e)})
+    return res
+
+
+def summarize(results: list[dict], wall_s: float) -> dict:
+    ok = [r for r in results if r["ok"]]
+    lat = [r["latency_s"] for r in ok]
+    tps = [r["tokens_s"] for r in ok if r.get("tokens_s")]
+    return {
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "error_rate": (len(results) - len(ok)) / len(results) if results else 0.0,
+        "p50_s": percentile(lat, 50),
+        "p95_s": percentile(lat, 95),
+        "p99_s": percentile(lat, 99),
+        "mean_tokens_s": sum(tps) / len(tps) if tps else None,
+        "throughput_rps": len(results) / wall_s if wall_s > 0 else None,
+        "wall_s": wall_s,
+    }
+
+
+def run_benchmark(url: str, query_set: dict, concurrency: int = 1, repeat: int = 1, timeout=REQUEST_TIMEOUT) -> dict:
+    jobs = [(nombre, payload) for _ in range(repeat) for nombre, payload in query_set.items()]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        results = list(ex.map(lambda j: run_query(url, j[0], j[1], timeout), jobs))
+    wall = time.perf_counter() - t0
+
+    por_consulta = {}
+    for nombre in query_set:
+        rs = [r for r in results if r["nombre"] == nombre]
+        por_consulta[nombre] = summarize(rs, sum(r["latency_s"] for r in rs))
+    return {"results": results, "summary": summarize(results, wall), "per_query": por_consulta}
+
+
+# ---------------- Reportes ----------------
+def server_models(results: list[dict]) -> list[str]:
+    """Modelos que informó /ask en las respuestas exitosas."""
+    return sorted({r["model"] for r in results if r["ok"] and r.get("model")})
+
+
+def fmt(x, unit="", nd=2):
+    return "-" if x is None else f"{x:.{nd}f}{unit}"
+
+
+def render_markdown(run: dict) -> str:
+    cfg = run["config"]
+    contenido_md = "# 📄 Resultados de Consultas a la API\n\n"
+    contenido_md += f"**Fecha de generación:** {cfg['fecha']}\n\n"
+    contenido_md += f"## Modelo: {cfg['model']}\n\n"
+    if cfg.get("server_models"):
+        contenido_md += f"Modelo informado por el servidor: {', '.join(cfg['server_models'])}"
+        contenido_md += " ⚠️ distinto de --model\n\n" if cfg.get("model_mismatch") else "\n\n"
+    contenido_md += f"## Embeding: Embed-service {cfg['embed']}\n\n"
+
+    s = run["summary"]
+    contenido_md += "## ⏱️ Rendimiento\n\n"
+    contenido_md += f"Concurrencia: {cfg['concurrency']} · Repeticiones: {cfg['repeat']} · URL: `{cfg['url']}`\n\n"
+    contenido_md += "| Consulta | p50 | p95 | p99 | tokens/s | errores |\n"
+    contenido_md += "|----------|-----|-----|-----|----------|---------|\n"
+    for nombre, q in list(run["per_query"].items()) + [("**total**", s)]:
+        contenido_md += (f"| {nombre} | {fmt(q['p50_s'], 's')} | {fmt(q['p95_s'], 's')} | {fmt(q['p99_s'], 's')} "
+                         f"| {fmt(q['mean_tokens_s'], '', 1)} | {q['errors']}/{q['requests']} |\n")
+    contenido_md += f"\nThroughput: {fmt(s['throughput_rps'], ' req/s')}\n\n---\n\n"
+
+    # Una respuesta por consulta (la primera exitosa)
+    vistos = set()
+    for r in run["results"]:
+        nombre = r["nombre"]
+        if nombre in vistos:
+            continue
+        if not r["ok"]:
+            if not any(x["ok"] for x in run["results"] if x["nombre"] == nombre):
+                contenido_md += f"Error en {nombre}: {r['error']}\n\n---\n\n"
+                vistos.add(nombre)
+            continue
+        vistos.add(nombre)
+        data = r["data"]
 
         # Sección de la consulta
         contenido_md += f"## 🔹 {nombre}\n\n"
-        contenido_md += f"**Pregunta:** {payload['query']}\n\n"
+        contenido_md += f"**Pregunta:** {r['query']}\n\n"
         contenido_md += f"**Respuesta:**\n\n```\n{data.get('answer','')}\n```\n\n"
 
         # Evidencias
@@ -79,12 +185,149 @@ for nombre, payload in queries.items():
             contenido_md += "\n"
 
         contenido_md += "---\n\n"
+    return contenido_md
 
-    except Exception as e:
-        contenido_md += f"Error en {nombre}: {e}\n\n---\n\n"
 
-# Guardar todo en un único archivo Markdown
-with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-    f.write(contenido_md)
+def compare_runs(paths: list[str]) -> str:
+    """Tabla comparativa (Markdown) de varios reportes JSON de este script."""
+    runs = []
+    for p in paths:
+        with open(p, "r", encoding="utf-8") as fr:
+            runs.append(json.load(fr))
+    md = "# 📊 Comparación de corridas\n\n"
+    md += "| Modelo | Embedding | Conc. | p50 | p95 | p99 | tokens/s | req/s | error % |\n"
+    md += "|--------|-----------|-------|-----|-----|-----|----------|-------|---------|\n"
+    for run in runs:
+        c, s = run["config"], run["summary"]
+        modelo = c["model"] + (f" (servidor: {', '.join(c['server_models'])})" if c.get("model_mismatch") else "")
+        md += (f"| {modelo} | {c['embed']} | {c['concurrency']} | {fmt(s['p50_s'], 's')} | {fmt(s['p95_s'], 's')} "
+               f"| {fmt(s['p99_s'], 's')} | {fmt(s['mean_tokens_s'], '', 1)} | {fmt(s['throughput_rps'])} "
+               f"| {fmt(s['error_rate'] * 100, '', 1)} |\n")
+
+    # Diferencia por consulta respecto a la primera corrida
+    if len(runs) > 1:
+        base = runs[0]["per_query"]
+        md += "\n## Δ p50 por consulta (vs. primera corrida)\n\n"
+        md += "| Consulta | " + " | ".join(r["config"]["model"] for r in runs[1:]) + " |\n"
+        md += "|----------|" + "|".join("---" for _ in runs[1:]) + "|\n"
+        for nombre, b in base.items():
+            celdas = []
+            for run in runs[1:]:
+                q = run["per_query"].get(nombre)
+                if not q or q["p50_s"] is None or b["p50_s"] is None:
+                    celdas.append("-")
+                else:
+                    celdas.append(f"{(q['p50_s'] - b['p50_s']) / b['p50_s'] * 100:+.1f}%")
+            md += f"| {nombre} | " + " | ".join(celdas) + " |\n"
+    return md
+
+
+# ---------------- Servidor de prueba (offline) ----------------
+def start_stub_server(latency_ms: float = 200.0, error_rate: float = 0.0, model: str = "stub"):
+    """
+    Levanta un /ask local que responde con una respuesta fija tras una latencia
+    aleatoria, para probar el harness sin modelo ni corpus.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            time.sleep(random.uniform(0.5, 1.5) * latency_ms / 1000)
+            if random.random() < error_rate:
+                self.send_response(500)
+                self.end_headers()
+                return
+            answer = f"Respuesta de prueba para: {body.get('query', '')}"
+            payload = json.dumps({
+                "answer": answer,
+                "citations": [{"id_reso": "UC-CU-RES-022-2025", "seccion": "resuelve",
+                               "fecha": "20 de marzo de 2025", "extracto": "Aprobar la reposición del título"}],
+                "used_docs": ["UC-CU-RES-022-2025"],
+                "usage": {"completion_tokens": len(answer) // 4},
+                "model": model,
+            }, ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/ask"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark del endpoint /ask")
+    ap.add_argument("--url", default=API_URL)
+    ap.add_argument("--model", default="openai/gpt-oss-20b")
+    ap.add_argument("--embed", default="littlejohn-ai/bge-m3-spa-law-qa HYDE Subqueries")
+    ap.add_argument("--concurrency", type=int, default=1)
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT[1], help="segundos de lectura por consulta")
+    ap.add_argument("--queries", help="JSON {nombre: {query: ...}} en lugar de las consultas por defecto")
+    ap.add_argument("--stub", action="store_true", help="usar un servidor /ask local de prueba")
+    ap.add_argument("--stub-latency-ms", type=float, default=200.0)
+    ap.add_argument("--stub-error-rate", type=float, default=0.0)
+    ap.add_argument("--compare", nargs="+", metavar="JSON", help="comparar reportes JSON previos")
+    ap.add_argument("--output-dir", default="./test_results")
+    args = ap.parse_args()
+
+    # Carpeta de salida
+    os.makedirs(args.output_dir, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    if args.compare:
+        md = compare_runs(args.compare)
+        out = f"{args.output_dir}/comparacion_{stamp}.md"
+        with open(out, "w", encoding="utf-8") as f:
+            f.write(md)
+        print(md)
+        print(f"=====Comparación guardada en {out}======")
+        return
+
+    query_set = queries
+    if args.queries:
+        with open(args.queries, "r", encoding="utf-8") as fr:
+            query_set = json.load(fr)
+
+    url = args.url
+    server = None
+    if args.stub:
+        server, url = start_stub_server(args.stub_latency_ms, args.stub_error_rate, args.model)
+
+    run = run_benchmark(url, query_set, args.concurrency, args.repeat, (REQUEST_TIMEOUT[0], args.timeout))
+    if server:
+        server.shutdown()
+    run["config"] = {
+        "fecha": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "model": args.model,
+        "embed": args.embed,
+        "url": url,
+        "concurrency": args.concurrency,
+        "repeat": args.repeat,
+        "stub": args.stub,
+        "server_models": server_models(run["results"]),
+    }
+    # --model y --embed son etiquetas: se marca si el servidor respondió con otro modelo
+    run["config"]["model_mismatch"] = any(m != args.model for m in run["config"]["server_models"])
+    if run["config"]["model_mismatch"]:
+        print(f"Aviso: --model {args.model} pero el servidor respondió con {', '.join(run['config']['server_models'])}")
+
+    #Nombre del archivo de salida
+    base = f"{args.output_dir}/test_results_{args.model.replace('/', '_')}_{stamp}"
+    with open(base + ".md", "w", encoding="utf-8") as f:
+        f.write(render_markdown(run))
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump(run, f, ensure_ascii=False, indent=2)
+
+    s = run["summary"]
+    print(f"p50 {fmt(s['p50_s'], 's')} · p95 {fmt(s['p95_s'], 's')} · p99 {fmt(s['p99_s'], 's')} · "
+          f"errores {s['errors']}/{s['requests']} · {fmt(s['throughput_rps'])} req/s")
+    print(f"=====Resultados guardados en {base}.md / .json======")
+
 
-print(f"=====Resultados guardados en {OUTPUT_FILE}======")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
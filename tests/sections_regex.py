@@ -0,0 +1,45 @@
+# sections_regex.py — split_sections por regex, anterior al SectionTokenizer de pdf_to_ndjson.
+# Referencia única para tests/test_sections.py y benchmarks/bench_sections.py.
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from pdf_to_ndjson import CONSIDERANDO_RE, RESUELVE_RE
+
+ENUM_ITEM_RE = re.compile(r"^\s*\d+\.\s+", re.MULTILINE)
+
+
+def split_sections_regex(full_text: str):
+    # split_sections antes del tokenizador (referencia)
+    cons = CONSIDERANDO_RE.search(full_text)
+    resv = RESUELVE_RE.search(full_text)
+    considering_text, resolving_text = "", ""
+    if cons and resv and cons.start() < resv.start():
+        considering_text = full_text[cons.end():resv.start()].strip()
+        resolving_text = full_text[resv.end():].strip()
+    elif resv:
+        resolving_text = full_text[resv.end():].strip()
+    elif cons:
+        considering_text = full_text[cons.end():].strip()
+
+    considering_parts = []
+    if considering_text:
+        considering_text = re.sub(r"\bQue\s*,?\s*", "Que, ", considering_text)
+        for p in re.split(r"(?:\n|^)\s*Que,\s*", considering_text):
+            p = p.strip()
+            if p:
+                considering_parts.append("Que, " + p)
+
+    resolving_parts = []
+    if resolving_text:
+        matches = list(ENUM_ITEM_RE.finditer(resolving_text))
+        if matches:
+            for i, m in enumerate(matches):
+                end = matches[i + 1].start() if i + 1 < len(matches) else len(resolving_text)
+                chunk = resolving_text[m.end():end].strip()
+                if chunk:
+                    resolving_parts.append(chunk)
+        else:
+            resolving_parts = [resolving_text.strip()]
+    return considering_parts, resolving_parts
@@ -0,0 +1,61 @@
+# test_reso_ids.py — forma canónica de los códigos de resolución (reso_ids.canonical_id / IdIndex)
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from reso_ids import IdIndex, canonical_id
+
+
+@pytest.mark.parametrize("raw", [
+    "UC-CU-RES-022-2025",
+    "uc-cu-res-22-2025",
+    "RES 22 2025",                                 # prefijo parcial: se completa
+    "CU-RES-022-2025",
+    "22-2025",
+    "UCCURES0222025",                              # prefijo pegado: se separa
+    "UCCU-RES-022-2025",
+    "RESOLUCIÓN_UC-CU-RES-022-2025_download.pdf",
+    "UC-CU-RES-O22-2O25",                          # OCR
+    "UC-CU-RES-0222025",                           # número y año pegados
+])
+def test_variantes_misma_clave(raw):
+    assert canonical_id(raw) == "UC-CU-RES-022-2025"
+
+
+@pytest.mark.parametrize("raw", ["UC-CU-RES-022-2025-A", "uc cu res 22 2025 a", "UCCURES0222025A",
+                                 "UC-CU-RES-022-2025A"])
+def test_sufijo_se_conserva(raw):
+    assert canonical_id(raw) == "UC-CU-RES-022-2025-A"
+
+
+@pytest.mark.parametrize("raw", [
+    "UC-CU-RES-144-2025 (12 de marzo de 2025)",
+    "RESOLUCIÓN_UC-CU-RES-144-2025_12-03-2025.pdf",
+])
+def test_fecha_posterior_no_cambia_el_codigo(raw):
+    assert canonical_id(raw) == "UC-CU-RES-144-2025"
+
+
+def test_sufijo_pegado_al_anio():
+    assert canonical_id("UC-CU-RES-022-2025B") == "UC-CU-RES-022-2025-B"
+
+
+def test_palabras_no_pasan_por_numeros():
+    assert canonical_id("IS 2025") != "UC-CU-RES-015-2025"
+    assert canonical_id("UC-CU-RES-OZZ-2025") == "UC-CU-RES-022-2025"
+
+
+def test_memorando():
+    assert canonical_id("UC-FCH-2025-0053-M") == "UC-FCH-2025-0053-M"
+    assert canonical_id("UCFCH 2025 53 M") == "UC-FCH-2025-0053-M"
+
+
+def test_id_index_no_confunde_resoluciones():
+    ids = IdIndex()
+    ids.add("UC-CU-RES-022-2025", "a")
+    ids.add("UC-CU-RES-022-2025-A", "b")
+    assert ids.lookup("RES 22 2025") == ["a"]
+    assert ids.lookup("UCCURES0222025A") == ["b"]
+    assert ids.lookup("UC-CU-RES-023-2025") == []
@@ -0,0 +1,68 @@
+# test_sections.py — SectionTokenizer (pdf_to_ndjson) frente a la implementación anterior por regex
+import os
+import sys
+import random
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import pdf_to_ndjson as p2n
+from pdf_to_ndjson import SectionTokenizer, chunk_pages, chunk_long
+from sections_regex import split_sections_regex
+
+
+def split_pages(pages):
+    c, r = p2n.split_sections_pages(pages)
+    return [p.texto for p in c], [p.texto for p in r]
+
+
+CASOS = [
+    "CONSIDERANDO:\nQue, el consejo aprueba.\nQue el informe\nsigue aquí.\nRESUELVE:\n1. Aprobar.\n2. Notificar.",
+    "CONSIDERANDO\nQue: con dos puntos.\nQueel texto pegado.\nRESUELVE\nsin numeración\nen dos líneas",
+    "CONSIDERANDO:\nQue, termina en Que\nQue, se une con la anterior.\nRESUELVE:\n1. Uno.",
+    "CONSIDERANDO:\nQue, termina en Que,\n,\nQue, coma sola.\nREſUELVE:\n1. Con s larga.",
+    "CONSIDERANDO: Que, en la misma línea. RESUELVE: 1. ítem en línea",
+    "RESUELVE:\nPreámbulo.\n1.\nTexto del ítem uno.\n2.",
+    "RESUELVE:\n1.\n   sangría después del número\n2. Dos.",
+    "Sin encabezados.\nQue, nada.",
+    "CONSIDERANDO:\n\n  Que, con sangría.\n\n\nQue , con espacio.\nRESUELTO:\n 1. Resuelto.\n10. Diez.",
+]
+
+
+@pytest.mark.parametrize("texto", CASOS)
+def test_igual_que_regex(texto):
+    assert split_pages([texto]) == split_sections_regex(texto.strip())
+
+
+def _linea(rng):
+    return rng.choice([
+        "", " ", "Que, el consejo resuelve", "Que el informe", "Que", "Que,", ",", "Queel texto",
+        "Que: dos puntos", "  Que sangría", "1. Aprobar", "2.", "10. diez", "3.texto", " 4. sangría",
+        "CONSIDERANDO:", "RESUELVE:", "REſUELVE", "RESUELTO", "texto libre", "más texto Que",
+        "Artículo 1. del estatuto", "fin de línea.",
+    ])
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_aleatorio_por_paginas(seed):
+    rng = random.Random(seed)
+    lines = [_linea(rng) for _ in range(rng.randint(1, 40))]
+    # cortes de página arbitrarios: el resultado no depende de cómo llegan las páginas
+    cuts = sorted(rng.sample(range(len(lines) + 1), min(len(lines) + 1, rng.randint(0, 4))))
+    pages = ["\n".join(lines[a:b]) for a, b in zip([0] + cuts, cuts + [len(lines)])]
+    assert split_pages(pages) == split_sections_regex("\n".join(pages).strip())
+
+
+def test_paginas_de_los_chunks():
+    largo = " ".join(f"palabra{i}" for i in range(300))  # ~3200 caracteres, cruza de página
+    pages = ["CONSIDERANDO:\nQue, primero.", "Que, " + largo[:1200], largo[1200:] + "\nRESUELVE:\n1. Ítem."]
+    tok = SectionTokenizer()
+    for pg, txt in enumerate(pages, start=1):
+        tok.feed_page(pg, txt)
+    considering, resolving = tok.close()
+    # el primero es el "Que, :" que deja "CONSIDERANDO:" (ver SectionTokenizer)
+    assert [p.texto[:7] for p in considering] == ["Que, :", "Que, pr", "Que, pa"]
+    assert [(p.pagina_inicio, p.pagina_fin) for p in considering] == [(1, 1), (1, 1), (2, 3)]
+    assert [(p.pagina_inicio, p.pagina_fin) for p in resolving] == [(3, 3)]
+    chunks = chunk_long(considering[2].texto)
+    assert chunk_pages(considering[2], chunks, tok) == [(2, 2), (2, 3), (3, 3), (3, 3)]
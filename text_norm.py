@@ -0,0 +1,8 @@
+# text_norm.py — normalización de texto compartida (sin dependencias del resto del proyecto)
+import unicodedata
+
+
+def fold(s: str) -> str:
+    # minúsculas y sin tildes: "Isaías" -> "isaias"
+    s = unicodedata.normalize("NFKD", s.lower())
+    return "".join(c for c in s if not unicodedata.combining(c))
@@ -0,0 +1,155 @@
+# vector_index.py — búsqueda vectorial con NumPy y prefiltrado por metadatos
+import datetime as dt
+
+import numpy as np
+
+from text_norm import fold
+from reso_ids import IdIndex, canonical_id
+
+SECCIONES = ["considerando", "resuelve"]
+TIPOS = ["ordinaria", "extraordinaria"]
+SIN_FECHA = -1
+BLOCK_ROWS = 65536  # filas por bloque al desquantizar int8
+_EPOCH = dt.date(1970, 1, 1)
+
+
+def iso_to_days(fecha_iso: str | None) -> int:
+    if not fecha_iso:
+        return SIN_FECHA
+    try:
+        return (dt.date.fromisoformat(fecha_iso) - _EPOCH).days
+    except ValueError:
+        return SIN_FECHA
+
+
+def _code(value, table: list[str]) -> int:
+    # -1 = desconocido
+    if not value:
+        return -1
+    value = fold(value)
+    return table.index(value) if value in table else -1
+
+
+class VectorIndex:
+    """
+    Embeddings normalizados en una matriz contigua (n, dim) y columnas paralelas
+    de metadatos. Los filtros de /query-filters se aplican como máscaras booleanas
+    y el top-k sale de un único producto matriz-vector + argpartition.
+    """
+
+    def __init__(self, vectors: np.ndarray, records: list[dict], quantize: bool = False):
+        if len(vectors) != len(records):
+            raise ValueError(f"{len(vectors)} vectores para {len(records)} chunks")
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+
+        self.quantized = quantize
+        if quantize:
+            # int8 simétrico por fila: v ≈ q * scale
+            scale = np.abs(vectors).max(axis=1) / 127.0
+            scale[scale == 0] = 1.0
+            self.matrix = np.round(vectors / scale[:, None]).astype(np.int8)
+            self.scale = scale.astype(np.float32)
+        else:
+            self.matrix = np.ascontiguousarray(vectors)
+            self.scale = None
+
+        self.records = records
+        self.anio = np.array([r.get("anio") or 0 for r in records], dtype=np.int16)
+        self.fecha = np.array([iso_to_days(r.get("fecha_iso")) for r in records], dtype=np.int32)
+        self.seccion = np.array([_code(r.get("seccion"), SECCIONES) for r in records], dtype=np.int8)
+        self.tipo = np.array([_code(r.get("tipo"), TIPOS) for r in records], dtype=np.int8)
+
+        # id_reso canónico -> código entero (tabla en Python, columna en NumPy); reso_ids
+        # resuelve las variantes de /query-filters ("RES 22 2025") a esos códigos
+        self.reso_codes = {}
+        self.reso_ids = IdIndex()
+        codes = np.empty(len(records), dtype=np.int32)
+        for i, r in enumerate(records):
+            key = canonical_id(r.get("id_reso"))
+            if key and key not in self.reso_codes:
+                self.reso_codes[key] = len(self.reso_codes)
+                self.reso_ids.add(r.get("id_reso"), self.reso_codes[key])
+            codes[i] = self.reso_codes[key] if key else -1
+        self.id_reso = codes
+
+    @classmethod
+    def from_store(cls, records: list[dict], store, quantize: bool = False) -> "VectorIndex":
+        """Une los chunks NDJSON con sus vectores del EmbeddingStore (omite los no embebidos)."""
+        records = [r for r in records if r.get("sha1") in store]
+        vectors = store.get([r["sha1"] for r in records]) if records else np.zeros((0, store.dim or 0))
+        return cls(vectors, records, quantize)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes + (self.scale.nbytes if self.scale is not None else 0)
+
+    def mask(self, filters: dict | None, seccion: str | None = None) -> np.ndarray | None:
+        """Máscara booleana de filas admitidas; None = sin restricción."""
+        m = None
+
+        def both(a, b):
+            return b if a is None else a & b
+
+        def code_mask(col, value, table):
+            # un valor fuera de la tabla no admite ninguna fila (como ChunkIndex), no las de código -1
+            c = _code(value, table)
+            return col == c if c >= 0 else np.zeros(len(self.records), dtype=bool)
+
+        if filters:
+            id_resol = filters.get("id_resol")
+            if id_resol:
+                codes = self.reso_ids.lookup(id_resol)
+                m = both(m, np.isin(self.id_reso, codes) if codes else np.zeros(len(self.records), dtype=bool))
+            tipo = filters.get("tipo_session")
+            if tipo:
+                m = both(m, code_mask(self.tipo, tipo.strip(), TIPOS))
+            rango = filters.get("rango_fechas")
+            if isinstance(rango, dict) and (rango.get("fecha_inicio") or rango.get("fecha_fin")):
+                # igual que ChunkIndex: los chunks sin fecha no se descartan por rango
+                r = self.fecha != SIN_FECHA
+                if rango.get("fecha_inicio"):
+                    r &= self.fecha >= iso_to_days(rango["fecha_inicio"])
+                if rango.get("fecha_fin"):
+                    r &= self.fecha <= iso_to_days(rango["fecha_fin"])
+                m = both(m, r | (self.fecha == SIN_FECHA))
+        if seccion:
+            m = both(m, code_mask(self.seccion, seccion, SECCIONES))
+        return m
+
+    def _scores(self, q: np.ndarray, rows: np.ndarray | None) -> np.ndarray:
+        mat = self.matrix if rows is None else self.matrix[rows]
+        if not self.quantized:
+            return mat @ q
+        scale = self.scale if rows is None else self.scale[rows]
+        out = np.empty(len(mat), dtype=np.float32)
+        for i in range(0, len(mat), BLOCK_ROWS):
+            block = mat[i:i + BLOCK_ROWS].astype(np.float32)
+            out[i:i + BLOCK_ROWS] = block @ q
+        return out * scale
+
+    def search(self, query_vec: np.ndarray, k: int = 8, filters: dict | None = None,
+               seccion: str | None = None) -> list[tuple[float, dict]]:
+        q = np.asarray(query_vec, dtype=np.float32).ravel()
+        q = q / (np.linalg.norm(q) or 1.0)
+        m = self.mask(filters, seccion)
+        rows = None if m is None else np.flatnonzero(m)
+        if k <= 0 or not len(self.records) or (rows is not None and not len(rows)):
+            return []
+
+        if rows is not None and len(rows) > len(self.records) // 2:
+            # filtro poco selectivo: más barato puntuar todo que copiar las filas
+            scores = np.where(m, self._scores(q, None), -np.inf)
+            k = min(k, len(rows))
+            rows = None
+        else:
+            scores = self._scores(q, rows)
+            k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        ids = top if rows is None else rows[top]
+        return [(float(scores[t]), self.records[i]) for t, i in zip(top, ids)]